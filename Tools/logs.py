@@ -1,27 +1,207 @@
 # Tools/logs.py
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import atexit
 import logging
-import mysql.connector
-from config import db_config
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from config import settings
+from utils.db_utils import get_connection
+from utils.fork_safety import reset_lock_after_fork
 
 logger = logging.getLogger(__name__)
 
-def save_log(log_type: str, message: str, process: str="JD_Analysis"):
+INSERT_LOG_SQL = "INSERT INTO `logs` (`log_type`, `process`, `message`) VALUES (%s, %s, %s)"
+_WAKEUP = object()  # queued by LogSink.shutdown so the writer stops waiting for a full batch
+
+
+def _write_logs(rows: list):
+    """Writes (log_type, process, message) rows in one multi-row insert and commit."""
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.executemany(INSERT_LOG_SQL, rows)
+        conn.commit()
+
+
+class LogSink:
+    """
+    Background writer for the 'logs' table.
+
+    save_log only enqueues; a daemon thread drains the queue and writes rows with one
+    multi-row insert whenever batch_size rows are waiting or flush_interval seconds have
+    passed. The queue is bounded: when it is full, new records are dropped (and counted)
+    rather than blocking the caller. Pending rows are flushed at interpreter exit.
+    """
+    def __init__(self, max_queue: int = 10000, batch_size: int = 200, flush_interval: float = 1.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: tuple) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                stopping = self._stop.is_set()
+                if remaining <= 0 and not stopping:
+                    break
+                try:
+                    # When stopping, take what is queued without waiting for the batch to fill
+                    batch.append(self._queue.get_nowait() if stopping or remaining <= 0
+                                 else self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list):
+        rows = [row for row in batch if row is not _WAKEUP]
+        try:
+            if rows:
+                _write_logs(rows)
+                with self._lock:
+                    self.written += len(rows)
+                    self.batches += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += len(rows)
+            # If logging to DB fails, at least log to console
+            logger.error(f"Failed to write {len(rows)} rows to logs table: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything enqueued so far has been written (or failed). Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        """Writes what is still queued (waiting at most timeout seconds) and stops the thread."""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKEUP)  # the thread may be waiting on an empty queue
+        except queue.Full:
+            pass  # then it is not waiting
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "queued": self._queue.qsize(),
+            }
+
+
+_sink = None
+_sink_pid = None
+_sink_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_sink_lock")
+def get_log_sink():
+    """Returns this process's LogSink (started lazily, and again after a fork), or None when disabled."""
+    global _sink, _sink_pid
+    if not settings.LOG_SINK_ENABLED:
+        return None
+    if _sink is None or _sink_pid != os.getpid():
+        with _sink_lock:
+            if _sink is None or _sink_pid != os.getpid():
+                _sink = LogSink(
+                    max_queue=settings.LOG_SINK_MAX_QUEUE,
+                    batch_size=settings.LOG_SINK_BATCH_SIZE,
+                    flush_interval=settings.LOG_SINK_FLUSH_INTERVAL,
+                )
+                _sink_pid = os.getpid()
+                atexit.register(_sink.shutdown)
+    return _sink
+
+
+_held = None  # rows save_log holds back in this process, see hold_logs()
+
+
+@contextmanager
+def hold_logs():
     """
-    Inserts a row into the 'logs' table with (log_type, process, message).
+    Collects the rows save_log would write during the block into the yielded list instead. An
+    ingestion worker process exits through os._exit, so its own LogSink is never flushed; it
+    hands the rows back to the parent (ResumeArtifact.log_rows, replay_logs). If the block
+    raises, the rows are written to the table right away.
     """
+    global _held
+    rows = _held = []
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO `logs` (`log_type`, `process`, `message`) VALUES (%s, %s, %s)",
-            (log_type, process, message)
-        )
-        conn.commit()
-        cursor.close()
-        conn.close()
-        logger.info(f"[LOGGED] {process} - {log_type}: {message}")
+        yield rows
+    except BaseException:
+        if rows:
+            try:
+                _write_logs(rows)
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} rows to logs table: {e}")
+        raise
+    finally:
+        _held = None
+
+
+def _store(rows: list):
+    sink = get_log_sink()
+    if sink is not None:
+        for row in rows:
+            if not sink.submit(tuple(row)) and sink.dropped % 1000 == 1:
+                logger.warning(f"Log queue full; {sink.dropped} log records dropped so far")
+        return
+    try:
+        _write_logs([tuple(row) for row in rows])
     except Exception as e:
         # If logging to DB fails, at least log to console
-        logger.exception(f"Failed to write to logs table: {e}")
\ No newline at end of file
+        logger.exception(f"Failed to write to logs table: {e}")
+
+
+def replay_logs(rows: list):
+    """Writes rows collected by hold_logs() in another process (through the LogSink when enabled)."""
+    if rows:
+        _store(rows)
+
+
+def save_log(log_type: str, message: str, process: str="JD_Analysis"):
+    """
+    Queues a row for the 'logs' table with (log_type, process, message).
+    Never blocks on the database; rows are written in batches by the LogSink thread.
+    """
+    logger.info(f"[LOGGED] {process} - {log_type}: {message}")
+    if _held is not None:
+        _held.append((log_type, process, message))
+        return
+    _store([(log_type, process, message)])
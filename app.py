@@ -8,6 +8,9 @@ from flask_cors import CORS
 
 from routes.jd_routes import jd_bp
 from routes.score_routes import score_bp
+from routes.job_routes import job_bp
+from routes.metrics_routes import metrics_bp
+from routes.ready_routes import ready_bp
 
 # ---------- Logging ----------
 
@@ -21,6 +24,9 @@ CORS(app)
 # Register Blueprints
 app.register_blueprint(jd_bp, url_prefix='')
 app.register_blueprint(score_bp, url_prefix='')
+app.register_blueprint(job_bp, url_prefix='')
+app.register_blueprint(metrics_bp, url_prefix='')
+app.register_blueprint(ready_bp, url_prefix='')
 
 @app.route('/health', methods=['GET'])
 def health_check():
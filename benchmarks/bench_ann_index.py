@@ -0,0 +1,120 @@
+# benchmarks/bench_ann_index.py
+"""
+Recall vs. latency of the AnnIndex backends (utils/ann_index.py) against the exact flat baseline,
+on synthetic clustered unit vectors (resume embeddings are clustered by field, not uniform).
+
+    python benchmarks/bench_ann_index.py --vectors 100000 --dim 768 --queries 200
+
+Reports build time, index memory, batched search latency per query and recall@k relative to flat,
+then the same for searches restricted to a random subset of ids (one resume folder in a shared index).
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from utils.ann_index import AnnIndex
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dim)).astype('float32')
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.35 * rng.normal(size=(n, dim)).astype('float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build(kind: str, vectors: np.ndarray, add_batch: int, **params):
+    start = time.perf_counter()
+    index = AnnIndex(vectors.shape[1], kind, **params)
+    ids = np.arange(len(vectors), dtype='int64')
+    # Add in chunks, the way the resume index grows
+    for s in range(0, len(vectors), add_batch):
+        index.add_with_ids(vectors[s:s + add_batch], ids[s:s + add_batch])
+    index.train()
+    return index, time.perf_counter() - start
+
+
+def timed_search(index: AnnIndex, queries: np.ndarray, k: int, repeat: int, allowed_ids=None):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, ids = index.search(queries, k, allowed_ids=allowed_ids)
+        best = min(best, time.perf_counter() - start)
+    return ids, best
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--pq-m", type=int, default=32)
+    parser.add_argument("--add-batch", type=int, default=10000)
+    parser.add_argument("--subset", type=int, nargs="+", default=[200, 5000],
+                        help="sizes of the id subsets for the filtered searches")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_vectors(args.vectors, args.dim, args.clusters, rng)
+    queries = synthetic_vectors(args.queries, args.dim, args.clusters, rng)
+    print(f"{args.vectors} vectors x {args.dim} dims, {args.queries} queries (one batch), k={args.k}")
+
+    flat, flat_build = build("flat", vectors, args.add_batch)
+    truth, flat_time = timed_search(flat, queries, args.k, args.repeat)
+
+    print(f"{'index':>10} {'search param':>14} {'build_s':>8} {'memory_mb':>10} {'us/query':>9} {'recall@k':>9}")
+
+    def report(name, param, index, build_s, elapsed, found):
+        print(f"{name:>10} {param:>14} {build_s:>8.2f} {index.memory_bytes() / 2**20:>10.1f} "
+              f"{elapsed / len(queries) * 1e6:>9.1f} {recall(found, truth):>9.3f}")
+
+    report("flat", "-", flat, flat_build, flat_time, truth)
+    for kind in ("ivf", "ivfpq"):
+        index, build_s = build(kind, vectors, args.add_batch, nlist=args.nlist, pq_m=args.pq_m)
+        for nprobe in args.nprobe:
+            index.set_search_params(nprobe=nprobe)
+            found, elapsed = timed_search(index, queries, args.k, args.repeat)
+            report(kind, f"nprobe={nprobe}", index, build_s, elapsed, found)
+    index, build_s = build("hnsw", vectors, args.add_batch)
+    for ef in args.ef_search:
+        index.set_search_params(ef_search=ef)
+        found, elapsed = timed_search(index, queries, args.k, args.repeat)
+        report("hnsw", f"ef={ef}", index, build_s, elapsed, found)
+
+    # Filtered searches at the default search parameters; truth is the exact top k within the subset
+    indexes = {"flat": (flat, flat_build)}
+    for kind in ("ivf", "ivfpq", "hnsw"):
+        indexes[kind] = build(kind, vectors, args.add_batch, nlist=args.nlist, pq_m=args.pq_m)
+    for size in args.subset:
+        allowed = rng.choice(len(vectors), min(size, len(vectors)), replace=False).astype('int64')
+        truth, _ = timed_search(flat, queries, args.k, 1, allowed_ids=allowed)
+        for kind, (index, build_s) in indexes.items():
+            found, elapsed = timed_search(index, queries, args.k, args.repeat, allowed_ids=allowed)
+            report(kind, f"subset={len(allowed)}", index, build_s, elapsed, found)
+
+    # Batched vs. one-at-a-time queries on the flat baseline
+    start = time.perf_counter()
+    for q in queries:
+        flat.search(q, args.k)
+    single = time.perf_counter() - start
+    print(f"flat, one query per call: {single / len(queries) * 1e6:.1f} us/query "
+          f"({single / flat_time:.1f}x the batched time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# benchmarks/bench_end_to_end.py
+"""
+End-to-end benchmark of the resume pipeline against local fakes: synthetic resume and JD PDFs,
+a fake Gemini model and embedder with configurable latency and error injection, and an
+in-memory MySQL stand-in behind the real connection pool. Reports throughput, p50/p95/p99
+latency and peak RSS for ingestion, index builds, JD analysis, BM25 ranking, retrieval,
+scoring and the result writes. Caches start cold in a temporary directory.
+
+    python benchmarks/bench_end_to_end.py --resumes 200 --jds 5 --llm-latency 0.05
+    python benchmarks/bench_end_to_end.py --json results.json
+    python benchmarks/bench_end_to_end.py --baseline results.json --max-regression 0.25
+
+With --baseline the run exits non-zero when any stage's throughput falls, or its p95 latency
+grows, by more than --max-regression relative to the saved results. Ingestion worker processes
+only parse PDFs; the LLM extraction fallback (and so the fake model) runs in this process.
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import json
+import logging
+import math
+import resource
+import shutil
+import tempfile
+import threading
+import time
+
+import google.generativeai as genai
+import mysql.connector
+
+from benchmarks.corpus import synthetic_corpus, synthetic_jds, write_pdf_corpus
+from benchmarks.fakes import FakeDatabase, FakeEmbedder, FakeGenerativeModel
+from config import settings
+from services.jd_service import analyze_jd, save_jd_to_db
+from services.score_service import (
+    build_resume_scoring_text, get_scoring_engine, iter_ingested_resumes, jd_query_terms, pack_resume_batches,
+    persist_recommendations, resume_batch_id, retrieve_resume_candidates,
+    score_resume_batch_with_retry, score_resume_with_gemini_flash,
+)
+from utils import embeddings
+from utils.embeddings import ResumeIndex, load_category_index, refresh_resume_index
+from utils.lexical_index import LexicalIndex, refresh_lexical_index
+from utils.llm_usage import get_llm_usage_stats
+from utils.pdf_utils import read_pdf_content
+
+CATEGORIES = ["Data Engineering", "Nursing", "Nursing Education", "Software Engineering",
+              "Research Science", "Analytics", "Higher Education"]
+COLUMNS = ("stage", "ops", "errors", "wall_s", "ops_per_s", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRss:
+    """`with PeakRss() as rss:` samples this process's resident set size; rss.peak_mb afterwards."""
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.peak = max(self.peak, _rss_bytes())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+        return False
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / 2 ** 20
+
+
+class StageResult:
+    """Latencies (seconds per operation) and error count of one stage; items overrides the op count."""
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.items = None
+        self.wall = 0.0
+        self.peak_rss_mb = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def row(self) -> dict:
+        ops = self.items if self.items is not None else len(self.latencies) + self.errors
+        return {
+            "stage": self.name,
+            "ops": ops,
+            "errors": self.errors,
+            "wall_s": round(self.wall, 4),
+            "ops_per_s": round(ops / self.wall, 2) if self.wall else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+def measure(name: str, fn, *args):
+    """Runs fn(result, *args) under wall-clock and RSS measurement; returns (StageResult, fn's return)."""
+    result = StageResult(name)
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        value = fn(result, *args)
+        result.wall = time.perf_counter() - start
+    result.peak_rss_mb = rss.peak_mb
+    return result, value
+
+
+def _ingest_seconds(artifact) -> float:
+    """Time one resume spent in the instrumented ingestion stages (recorded where it ran)."""
+    stages = artifact.metrics.get("ats_stage_duration_seconds", {})
+    return sum(total for _, total in stages.values())
+
+
+def bench_ingestion(result, paths, workers):
+    artifacts = {}
+    for path, artifact, error in iter_ingested_resumes(paths, workers=workers):
+        if error is not None:
+            result.errors += 1
+            continue
+        artifacts[path] = artifact
+        result.observe(_ingest_seconds(artifact))
+    return artifacts
+
+
+def bench_category_index(result):
+    start = time.perf_counter()
+    idx = load_category_index()
+    result.observe(time.perf_counter() - start)
+    result.items = len(idx.names)
+    embeddings._category_index = idx  # analyze_jd shortlists categories from it
+    return idx
+
+
+def bench_resume_index(result, resumes_dir):
+    start = time.perf_counter()
+    idx, _ = refresh_resume_index(ResumeIndex(dimension=0), resumes_dir)
+    result.observe(time.perf_counter() - start)
+    result.items = len(idx.manifest)
+    embeddings._resume_index = idx  # retrieval searches the shared index
+    return idx
+
+
+def bench_lexical_index(result, resumes_dir):
+    start = time.perf_counter()
+    idx = LexicalIndex()
+    refresh_lexical_index(idx, resumes_dir)
+    result.observe(time.perf_counter() - start)
+    result.items = len(idx)
+    return idx
+
+
+def bench_jd_analysis(result, jd_paths, db):
+    jds = []
+    for path in jd_paths:
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            jd_text = read_pdf_content(f.read())
+        info = analyze_jd(jd_text)
+        save_jd_to_db(jd_text, info["categories"], info["qualifications"], info["requirements"])
+        result.observe(time.perf_counter() - start)
+        if not info["categories"]:
+            result.errors += 1
+        jds.append((max(db.job_descriptions), jd_text, info))
+    return jds
+
+
+def bench_bm25_rank(result, jds, paths, lexical_index, top_k):
+    """Ranks the corpus for each JD by BM25; with top_k the best matches go on to retrieval."""
+    kept = {}
+    for jd_id, _, info in jds:
+        start = time.perf_counter()
+        hits, unindexed = lexical_index.search(jd_query_terms(info["requirements"], info["qualifications"]),
+                                               top_k, paths=paths)
+        result.observe(time.perf_counter() - start)
+        kept[jd_id] = [path for path, _ in hits] + unindexed if top_k and hits else paths
+    return kept
+
+
+def bench_retrieval(result, jds, candidates, top_k):
+    kept = {}
+    for jd_id, jd_text, _ in jds:
+        paths = candidates[jd_id]
+        start = time.perf_counter()
+        kept[jd_id], _ = retrieve_resume_candidates(jd_text, paths, top_k=top_k or len(paths))
+        result.observe(time.perf_counter() - start)
+    return kept if top_k else candidates
+
+
+def _timed(score_fn, result):
+    def call(**kwargs):
+        start = time.perf_counter()
+        try:
+            return score_fn(**kwargs)
+        finally:
+            result.observe(time.perf_counter() - start)
+    return call
+
+
+def bench_scoring(result, jds, kept, artifacts, concurrency, batch_size):
+    """Scores each JD's retrieved resumes as iter_scored_resumes does; latency is per LLM request."""
+    scored = {}
+    batched = batch_size > 1
+    engine = get_scoring_engine(
+        _timed(score_resume_batch_with_retry if batched else score_resume_with_gemini_flash, result),
+        max_concurrency=concurrency, requests_per_minute=0)
+    result.items = 0
+    for jd_id, _, info in jds:
+        jd_kwargs = {
+            "jd_category": ", ".join(info["categories"]),
+            "jd_requirements": info["requirements"],
+            "jd_qualifications": info["qualifications"],
+        }
+        texts = [(path, resume_batch_id(path), build_resume_scoring_text(artifacts[path].details, artifacts[path].text))
+                 for path in kept[jd_id] if path in artifacts]
+        if batched:
+            tasks = ((batch, dict(jd_kwargs, resumes=[(rid, text) for _, rid, text in batch]))
+                     for batch in pack_resume_batches(iter(texts), settings.SCORING_BATCH_TOKEN_BUDGET, batch_size))
+        else:
+            tasks = ((path, dict(jd_kwargs, resume_text=text)) for path, _, text in texts)
+        results = []
+        for key, outcome, error in engine.run(tasks):
+            outcomes = ([(key, outcome, error)] if not batched else
+                        [(path, None if error else outcome.get(rid), error) for path, rid, _ in key])
+            for path, score, err in outcomes:
+                result.items += 1
+                if err is not None or not score:
+                    result.errors += 1
+                    continue
+                artifact = artifacts[path]
+                artifact.score = score
+                results.append(artifact.to_result())
+        scored[jd_id] = results
+    return scored
+
+
+def bench_persist(result, scored, artifacts):
+    result.items = 0
+    for jd_id, results in scored.items():
+        start = time.perf_counter()
+        result.items += persist_recommendations(
+            jd_id, results,
+            {path: a.details for path, a in artifacts.items()},
+            {path: a.content_hash for path, a in artifacts.items()},
+        )
+        result.observe(time.perf_counter() - start)
+
+
+def install_fakes(args, workdir):
+    """Points Gemini, MySQL and every on-disk cache at local stand-ins; returns (model, embedder, db)."""
+    model = FakeGenerativeModel(args.llm_latency, args.llm_jitter, args.llm_error_rate,
+                                args.llm_garbage_rate, seed=args.seed)
+    embedder = FakeEmbedder(args.embed_dimension, args.embed_latency, args.embed_error_rate, seed=args.seed)
+    db = FakeDatabase(args.db_latency, categories=CATEGORIES)
+    genai.GenerativeModel = lambda *a, **k: model
+    genai.embed_content = embedder.embed_content
+    mysql.connector.connect = db.connect
+    settings.METRICS_ENABLED = True  # ingestion latencies come from the stage timers
+    settings.PDF_CACHE_DIR = os.path.join(workdir, "cache", "pdf_text")
+    settings.EMBEDDING_CACHE_PATH = os.path.join(workdir, "cache", "embeddings.sqlite3")
+    settings.SCORE_CACHE_PATH = os.path.join(workdir, "cache", "scores.sqlite3")
+    settings.RESUME_INDEX_DIR = os.path.join(workdir, "cache", "resume_index")
+    settings.LEXICAL_INDEX_PATH = os.path.join(workdir, "cache", "lexical_index.json")
+    return model, embedder, db
+
+
+def compare(rows: list, baseline: dict, max_regression: float) -> list:
+    """Stages whose throughput dropped or p95 latency grew by more than max_regression."""
+    previous = {row["stage"]: row for row in baseline.get("stages", [])}
+    regressions = []
+    for row in rows:
+        old = previous.get(row["stage"])
+        if not old:
+            continue
+        if old["ops_per_s"] and row["ops_per_s"] < old["ops_per_s"] * (1 - max_regression):
+            regressions.append(f"{row['stage']}: throughput {old['ops_per_s']} -> {row['ops_per_s']} ops/s")
+        if old["p95_ms"] and row["p95_ms"] > old["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{row['stage']}: p95 {old['p95_ms']} -> {row['p95_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--jds", type=int, default=3)
+    parser.add_argument("--long-fraction", type=float, default=0.2, help="share of long academic CVs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.01)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-garbage-rate", type=float, default=0.0)
+    parser.add_argument("--embed-latency", type=float, default=0.01, help="fake embedding latency per request")
+    parser.add_argument("--embed-error-rate", type=float, default=0.0)
+    parser.add_argument("--embed-dimension", type=int, default=256)
+    parser.add_argument("--db-latency", type=float, default=0.001, help="fake MySQL round trip in seconds")
+    parser.add_argument("--ingest-workers", type=int, default=settings.RESUME_INGEST_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=settings.SCORING_MAX_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=settings.SCORING_BATCH_SIZE)
+    parser.add_argument("--lexical-top-k", type=int, default=0, help="keep only the top-k BM25 matches per JD")
+    parser.add_argument("--top-k", type=int, default=0, help="score only the top-k retrieved resumes per JD")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--keep", action="store_true", help="keep the generated corpus and caches")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    workdir = tempfile.mkdtemp(prefix="ats-bench-")
+    try:
+        model, embedder, db = install_fakes(args, workdir)
+        resumes_dir = os.path.join(workdir, "resumes")
+        start = time.perf_counter()
+        paths = write_pdf_corpus(os.path.join(resumes_dir, "bench"),
+                                 synthetic_corpus(args.resumes, args.seed, args.long_fraction))
+        jd_paths = write_pdf_corpus(os.path.join(workdir, "jds"), synthetic_jds(args.jds, args.seed), prefix="jd")
+        print(f"{args.resumes} resume and {args.jds} JD PDFs written in {time.perf_counter() - start:.1f}s; "
+              f"fake LLM {args.llm_latency}s +/- {args.llm_jitter}s (errors {args.llm_error_rate}), "
+              f"embeddings {args.embed_latency}s, DB round trip {args.db_latency}s, "
+              f"{args.ingest_workers} ingest workers, scoring concurrency {args.concurrency}, "
+              f"batch size {args.batch_size}")
+
+        stages = []
+        ingestion, artifacts = measure("ingestion", bench_ingestion, paths, args.ingest_workers)
+        stages.append(ingestion)
+        category_build, _ = measure("category_index_build", bench_category_index)
+        stages.append(category_build)
+        resume_build, _ = measure("resume_index_build", bench_resume_index, resumes_dir)
+        stages.append(resume_build)
+        lexical_build, lexical_index = measure("lexical_index_build", bench_lexical_index, resumes_dir)
+        stages.append(lexical_build)
+        jd_analysis, jds = measure("jd_analysis", bench_jd_analysis, jd_paths, db)
+        stages.append(jd_analysis)
+        bm25_rank, candidates = measure("bm25_rank", bench_bm25_rank, jds, paths, lexical_index, args.lexical_top_k)
+        stages.append(bm25_rank)
+        retrieval, kept = measure("retrieval", bench_retrieval, jds, candidates, args.top_k)
+        stages.append(retrieval)
+        scoring, scored = measure("scoring", bench_scoring, jds, kept, artifacts, args.concurrency, args.batch_size)
+        stages.append(scoring)
+        persist, _ = measure("persist", bench_persist, scored, artifacts)
+        stages.append(persist)
+
+        rows = [stage.row() for stage in stages]
+        print(f"{COLUMNS[0]:<22}" + "".join(f"{c:>12}" for c in COLUMNS[1:]))
+        for row in rows:
+            print(f"{row['stage']:<22}" + "".join(f"{row[c]:>12}" for c in COLUMNS[1:]))
+        usage = get_llm_usage_stats()["total"]
+        scale = 2 ** 20 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+        self_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        children_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+        print(f"fake LLM calls in this process {model.calls}, embedding requests {embedder.calls}, "
+              f"LLM tokens ~{usage['input_tokens']} in / ~{usage['output_tokens']} out")
+        print(f"fake DB {db.stats()}")
+        workers_note = f", largest ingest worker {children_mb:.1f} MB" if args.ingest_workers > 1 else ""
+        print(f"peak RSS: this process {self_mb:.1f} MB{workers_note}")
+
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"args": vars(args), "stages": rows}, f, indent=2)
+        if baseline is not None:
+            regressions = compare(rows, baseline, args.max_regression)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            if regressions:
+                sys.exit(1)
+            print(f"no stage regressed by more than {args.max_regression:.0%}")
+    finally:
+        if args.keep:
+            print(f"corpus and caches kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
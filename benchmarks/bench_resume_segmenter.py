@@ -0,0 +1,133 @@
+# benchmarks/bench_resume_segmenter.py
+"""
+Micro-benchmark: the single-pass resume segmenter (utils/resume_sections.py) vs. the previous
+nine-pass regex extractor, over a synthetic corpus. Reports CPU time per resume and how many
+resumes would still need the LLM fallback in extract_candidate_details.
+
+    python benchmarks/bench_resume_segmenter.py --resumes 2000
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import re
+import time
+
+from benchmarks.corpus import synthetic_corpus
+from utils.resume_sections import segment_resume
+
+FIELDS = ("name", "email", "phone", "linkedin_url", "current_location", "years_of_experience",
+          "education_level", "last_position_title", "skills")
+
+
+def legacy_regex_extract_basic(resume_text: str) -> dict:
+    """The extractor segment_resume replaced, kept verbatim as the baseline."""
+    details = {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "linkedin_url": None,
+        "current_location": None,
+        "years_of_experience": None,
+        "education_level": None,
+        "last_position_title": None,
+        "skills": []
+    }
+    m_email = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+", resume_text)
+    if m_email:
+        details["email"] = m_email.group(0).lower()
+    m_phone = re.search(r"(\+?1[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}", resume_text)
+    if m_phone:
+        details["phone"] = m_phone.group(0)
+    m_link = re.search(r"https?://(www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+", resume_text)
+    if m_link:
+        details["linkedin_url"] = m_link.group(0)
+    else:
+        m_href = re.search(r'href=["\'](https?://(www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+)["\']', resume_text, flags=re.IGNORECASE)
+        if m_href:
+            details["linkedin_url"] = m_href.group(1)
+    for line in resume_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        words = line.split()
+        if len(words) >= 2 and all(w[0].isupper() for w in words if w[0].isalpha()):
+            details["name"] = line
+            break
+    m_yoe = re.search(r"(\d{1,2})\+?\s+years? (of )?experience", resume_text, flags=re.IGNORECASE)
+    if m_yoe:
+        details["years_of_experience"] = int(m_yoe.group(1))
+    m_edu = re.search(
+        r"(Ph\.?D\.?|Doctorate|M\.?S\.?|MSc|MBA|B\.?S\.?|BA|BSc|"
+        r"M\.?A\.?|Master of Science|Master of Arts|Bachelor of Science|Bachelor of Arts)",
+        resume_text, flags=re.IGNORECASE
+    )
+    if m_edu:
+        details["education_level"] = m_edu.group(0)
+    sections = resume_text.splitlines()
+    for idx, line in enumerate(sections):
+        if re.search(r"\bExperience\b|\bWork History\b|\bProfessional Experience\b", line, flags=re.IGNORECASE):
+            for next_line in sections[idx+1:]:
+                nl = next_line.strip()
+                if nl:
+                    details["last_position_title"] = nl
+                    break
+            break
+    for line in sections[:10]:
+        m_loc = re.search(r"[A-Za-z]+,\s*[A-Z]{2}", line)
+        if m_loc:
+            details["current_location"] = m_loc.group(0)
+            break
+    skills = []
+    for idx, line in enumerate(sections):
+        if re.search(r"\bSkills\b|\bTechnical Skills\b", line, flags=re.IGNORECASE):
+            for sub_line in sections[idx+1:]:
+                if not sub_line.strip():
+                    break
+                if re.search(r"\bExperience\b|\bWork History\b", sub_line, flags=re.IGNORECASE):
+                    break
+                for p in re.split(r"[,;]", sub_line):
+                    p = p.strip()
+                    if p and len(p) < 40:
+                        skills.append(p)
+            break
+    details["skills"] = list(dict.fromkeys(skills))
+    return details
+
+
+def needs_llm_fallback(details: dict) -> bool:
+    """Mirrors the missing-field check in extract_candidate_details."""
+    absent = details.get("absent", set())
+    return any(
+        key not in absent and (details.get(key) is None or (key == "skills" and not details.get(key)))
+        for key in FIELDS
+    )
+
+
+def run(extract, corpus, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        results = [extract(text) for text in corpus]
+    cpu = (time.process_time() - start) / repeat
+    return cpu, sum(needs_llm_fallback(r) for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--long-fraction", type=float, default=0.2, help="share of long academic CVs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.resumes, seed=args.seed, long_fraction=args.long_fraction)
+    chars = sum(len(t) for t in corpus)
+    print(f"{len(corpus)} synthetic resumes, {chars / len(corpus):.0f} chars on average")
+    print(f"{'extractor':>28} {'us/resume':>10} {'llm_fallbacks':>14}")
+    for name, extract in (("legacy nine-pass regex", legacy_regex_extract_basic),
+                          ("single-pass segmenter", segment_resume)):
+        cpu, fallbacks = run(extract, corpus, args.repeat)
+        print(f"{name:>28} {cpu / len(corpus) * 1e6:>10.1f} {fallbacks:>14}")
+
+
+if __name__ == "__main__":
+    main()
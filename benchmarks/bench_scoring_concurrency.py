@@ -0,0 +1,66 @@
+# benchmarks/bench_scoring_concurrency.py
+"""
+Wall time of scoring a folder of resumes vs. ScoringEngine concurrency, against a local
+fake model with injected latency.
+
+    python benchmarks/bench_scoring_concurrency.py --resumes 100 --latency 0.2
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
+import functools
+import time
+
+from benchmarks.fakes import FakeGenerativeModel
+from config import settings
+from services.scoring_engine import ScoringEngine
+from services.score_service import score_resume_with_gemini_flash
+
+
+def run_once(n_resumes, concurrency, model, requests_per_minute=0):
+    engine = ScoringEngine(
+        functools.partial(score_resume_with_gemini_flash, model=model),
+        max_concurrency=concurrency,
+        requests_per_minute=requests_per_minute,
+    )
+    tasks = ((i, {
+        "jd_category": "Data Engineering",
+        "jd_requirements": "Python, SQL, Spark",
+        "jd_qualifications": "BS in Computer Science",
+        "resume_text": f"Resume {i}: Python SQL Spark Airflow",
+    }) for i in range(n_resumes))
+    ok = failed = 0
+    start = time.perf_counter()
+    for _, _, error in engine.run(tasks):
+        if error is None:
+            ok += 1
+        else:
+            failed += 1
+    return time.perf_counter() - start, ok, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--rpm", type=float, default=0, help="token-bucket quota, requests per minute")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    # Measure model calls, not score cache hits
+    settings.SCORE_CACHE_ENABLED = False
+
+    print(f"{args.resumes} resumes, fake latency {args.latency}s +/- {args.jitter}s, "
+          f"error rate {args.error_rate}, rpm {args.rpm or 'unlimited'}")
+    print(f"{'concurrency':>11} {'wall_s':>8} {'resumes/s':>10} {'ok':>5} {'failed':>6} {'speedup':>8}")
+    baseline = None
+    for concurrency in args.concurrency:
+        model = FakeGenerativeModel(args.latency, args.jitter, args.error_rate)
+        wall, ok, failed = run_once(args.resumes, concurrency, model, args.rpm)
+        baseline = baseline or wall
+        print(f"{concurrency:>11} {wall:>8.2f} {args.resumes / wall:>10.1f} {ok:>5} {failed:>6} {baseline / wall:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
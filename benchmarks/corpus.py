@@ -0,0 +1,110 @@
+# benchmarks/corpus.py
+"""
+Synthetic resume and job description text (and PDFs of it) for benchmarks. Output is
+deterministic for a seed.
+"""
+import os
+import random
+import textwrap
+
+FIRST_NAMES = ["Alex", "Jordan", "Priya", "Wei", "Maria", "Samuel", "Aisha", "Liam", "Noor", "Elena"]
+LAST_NAMES = ["Kim", "Patel", "Garcia", "Okafor", "Nguyen", "Schmidt", "Rossi", "Haddad", "Silva", "Cohen"]
+CITIES = ["Rochester, NY", "Austin, TX", "Boston, MA", "Greensboro, NC", "Seattle, WA", "Denver, CO"]
+TITLES = ["Data Engineer", "Staff Nurse", "Assistant Professor", "Software Engineer", "Research Scientist",
+          "Clinical Nurse Specialist", "Analytics Manager", "Nurse Educator"]
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "AWS", "Docker", "Kubernetes", "Tableau", "Patient Care",
+          "Curriculum Design", "Statistics", "R", "Grant Writing", "EHR Systems", "Critical Care", "ETL"]
+DEGREES = ["Ph.D. in Nursing", "Master of Science in Data Science", "Bachelor of Science in Computer Science",
+           "MBA", "BSN", "MSN"]
+FILLER = ("Led cross-functional initiatives to improve outcomes, mentoring staff and collaborating with "
+          "stakeholders on process improvements across multiple departments and sites.")
+
+
+def synthetic_resume_text(rng: random.Random, length_factor: int = 1) -> str:
+    """
+    One plain-text resume with contact block, headings and bulleted experience.
+    length_factor scales the number of experience entries and publications (academic CVs are long).
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{rng.randint(1, 999)}@example.com | ({rng.randint(200, 999)}) "
+        f"{rng.randint(200, 999)}-{rng.randint(1000, 9999)} | {rng.choice(CITIES)}",
+    ]
+    if rng.random() < 0.5:
+        lines.append(f"https://www.linkedin.com/in/{name.replace(' ', '-').lower()}")
+    lines += ["", "Summary", f"{rng.choice(TITLES)} with {rng.randint(1, 25)}+ years of experience. {FILLER}", ""]
+    lines += ["Technical Skills", ", ".join(rng.sample(SKILLS, 8)), ""]
+    lines += ["Professional Experience"]
+    for _ in range(3 * length_factor):
+        lines += [rng.choice(TITLES), f"Company {rng.randint(1, 500)}, {rng.choice(CITIES)}",
+                  f"{rng.randint(1995, 2020)} - {rng.randint(2021, 2025)}"]
+        lines += [f"• {FILLER}" for _ in range(rng.randint(2, 5))]
+    lines += ["", "Education", rng.choice(DEGREES), f"University {rng.randint(1, 80)}, {rng.randint(1990, 2022)}", ""]
+    if length_factor > 1:
+        lines += ["PUBLICATIONS"]
+        lines += [f"{rng.choice(LAST_NAMES)}, A. ({rng.randint(1990, 2024)}). {FILLER} Journal {rng.randint(1, 40)}, "
+                  f"{rng.randint(1, 12)}({rng.randint(1, 6)}), {rng.randint(1, 300)}-{rng.randint(301, 600)}."
+                  for _ in range(40 * length_factor)]
+    return "\n".join(lines)
+
+
+def synthetic_corpus(n: int, seed: int = 0, long_fraction: float = 0.2) -> list:
+    """n resume texts; long_fraction of them are long academic-style CVs."""
+    rng = random.Random(seed)
+    return [synthetic_resume_text(rng, length_factor=8 if rng.random() < long_fraction else 1) for _ in range(n)]
+
+
+def synthetic_jd_text(rng: random.Random) -> str:
+    title = rng.choice(TITLES)
+    return "\n".join([
+        f"Job Title: {title}",
+        "Requirements",
+        ", ".join(rng.sample(SKILLS, 6)),
+        "Qualifications",
+        rng.choice(DEGREES),
+        FILLER,
+    ])
+
+
+JD_BOILERPLATE = [
+    "Benefits",
+    "Medical, dental and vision coverage, 401(k) match and paid time off.",
+    "We are an equal opportunity employer and consider all applicants without regard to race, color, "
+    "religion, sex or national origin.",
+]
+
+
+def synthetic_jds(n: int, seed: int = 0) -> list:
+    """n job description texts, each with a benefits/EEO tail like real postings."""
+    rng = random.Random(seed)
+    return ["\n".join([synthetic_jd_text(rng)] + JD_BOILERPLATE) for _ in range(n)]
+
+
+PDF_LINES_PER_PAGE = 64
+PDF_LINE_CHARS = 100
+
+
+def write_pdf(path: str, text: str):
+    """Writes text to a PDF with PyMuPDF, wrapped at PDF_LINE_CHARS, PDF_LINES_PER_PAGE lines per page."""
+    import fitz  # PyMuPDF
+    lines = [wrapped for line in text.splitlines()
+             for wrapped in (textwrap.wrap(line, PDF_LINE_CHARS) or [""])] or [""]
+    doc = fitz.open()
+    try:
+        for start in range(0, len(lines), PDF_LINES_PER_PAGE):
+            doc.new_page().insert_text((36, 48), "\n".join(lines[start:start + PDF_LINES_PER_PAGE]), fontsize=9)
+        doc.save(path)
+    finally:
+        doc.close()
+
+
+def write_pdf_corpus(directory: str, texts: list, prefix: str = "resume") -> list:
+    """Writes one PDF per text into directory; returns their absolute paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, text in enumerate(texts):
+        path = os.path.abspath(os.path.join(directory, f"{prefix}_{i:05d}.pdf"))
+        write_pdf(path, text)
+        paths.append(path)
+    return paths
@@ -0,0 +1,275 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for the Gemini SDK and MySQL used by the benchmarks. They inject latency and
+errors but never touch the network.
+"""
+import json
+import random
+import re
+import threading
+import time
+import zlib
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+# Values the fake model "extracts" for missing resume fields
+FAKE_CANDIDATE_FIELDS = {
+    "name": "Fake Candidate",
+    "current_location": "Rochester, NY",
+    "years_of_experience": 5,
+    "education_level": "MSN",
+    "last_position_title": "Staff Nurse",
+    "skills": ["Python", "SQL"],
+}
+
+
+class FakeGenerativeModel:
+    """
+    Mimics genai.GenerativeModel.generate_content. Resume extraction prompts get the requested
+    fields, JD analysis prompts get one of the offered categories, and scoring prompts get scores
+    (batched prompts, "### Resume id: ...", a JSON array). Each call sleeps for latency +/- jitter
+    seconds, fails with probability error_rate and returns unparseable text with
+    probability garbage_rate.
+    """
+    def __init__(self, latency: float = 0.2, jitter: float = 0.0, error_rate: float = 0.0,
+                 garbage_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.garbage_rate = garbage_rate
+        self.model_name = "fake-scorer"  # keeps fake scores apart from real ones in the score cache
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            fail = self._rng.random() < self.error_rate
+            garbage = self._rng.random() < self.garbage_rate
+            score = self._rng.randint(0, 10)
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("injected fake model error")
+        if garbage:
+            return FakeResponse("Sorry, I cannot help with that.")
+        if "specialized in parsing resumes" in prompt:
+            fields = re.search(r"following fields \(if present\) in valid JSON format: (.*)", prompt)
+            names = re.findall(r'"(\w+)"', fields.group(1)) if fields else []
+            return FakeResponse(json.dumps({name: FAKE_CANDIDATE_FIELDS.get(name) for name in names}))
+        if "job description analyzer" in prompt:
+            # Same JD, same answer; different JDs spread over the offered categories
+            pick = zlib.crc32(prompt.encode("utf-8"))
+            options = re.search(r"following options: (.*?)\), qualifications", prompt)
+            choices = options.group(1).split(", ") if options else ["General"]
+            return FakeResponse(json.dumps({
+                "category": choices[pick % len(choices)],
+                "qualifications": "Degree in a related field",
+                "requirements": f"Python, SQL, communication (posting {pick % 10000})",
+            }))
+        result = {
+            "category_score": score,
+            "requirements_score": score,
+            "qualifications_score": score,
+            "final_score": score,
+            "reason": "fake model",
+        }
+        resume_ids = re.findall(r"^### Resume id: (\S+)$", prompt, flags=re.MULTILINE)
+        if resume_ids:
+            return FakeResponse(json.dumps([dict(result, resume_id=rid) for rid in resume_ids]))
+        return FakeResponse(json.dumps(result))
+
+
+class FakeEmbedder:
+    """
+    Mimics genai.embed_content with deterministic hashed bag-of-words vectors, so texts that
+    share words get similar embeddings. Each call sleeps for latency seconds and fails with
+    probability error_rate.
+    """
+    def __init__(self, dimension: int = 64, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.dimension = dimension
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def vector(self, text: str) -> list:
+        vec = [0.0] * self.dimension
+        for word in re.findall(r"[a-z]{3,}", text.lower()):
+            vec[zlib.crc32(word.encode("utf-8")) % self.dimension] += 1.0
+        return vec
+
+    def embed_content(self, model=None, content=None, task_type=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.error_rate
+        time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("injected fake embedding error")
+        if isinstance(content, (list, tuple)):
+            return {"embedding": [self.vector(text) for text in content]}
+        return {"embedding": self.vector(content)}
+
+
+class FakeDatabase:
+    """
+    In-memory stand-in for the MySQL server, installed as mysql.connector.connect so the real
+    connection pool and cursor instrumentation stay in the measured path. It understands the
+    statements the pipeline sends (categories, job descriptions, candidate and jd_score upserts,
+    logs); anything else is counted in `unhandled` and returns no rows. Every statement and
+    commit sleeps for latency seconds, standing in for a network round trip.
+    """
+    def __init__(self, latency: float = 0.0, categories: list = ()):
+        self.latency = latency
+        self.statements = 0
+        self.unhandled = 0
+        self.connections = 0
+        self.categories = {name: i for i, name in enumerate(categories, 1)}
+        self.job_descriptions = {}  # jd_id -> (jd_text, category_detected, qualifications, requirements)
+        self.candidates = {}  # email -> (candidate_id, name)
+        self.scores = {}  # (jd_id, candidate_id) -> (jd_id, candidate_id, category, qualifications, requirements, final, reason, hash, version)
+        self.logs = 0
+        self._lock = threading.Lock()
+
+    def connect(self, **config):
+        with self._lock:
+            self.connections += 1
+        return FakeConnection(self)
+
+    def _insert_candidates(self, params):
+        for i in range(0, len(params), 8):
+            name, email = params[i], (params[i + 1] or "").lower().strip()
+            if email not in self.candidates:
+                self.candidates[email] = (len(self.candidates) + 1, name)
+
+    def run(self, sql: str, params, round_trip: bool = True) -> tuple:
+        """Executes one statement; returns (rows, lastrowid). executemany rows share one round trip."""
+        q = " ".join(str(sql).split())
+        params = tuple(params or ())
+        if round_trip:
+            time.sleep(self.latency)
+        with self._lock:
+            self.statements += int(round_trip)
+            if q.startswith("SELECT category_id, name FROM category"):
+                return [(cid, name) for name, cid in self.categories.items()], None
+            if q.startswith("SELECT name FROM category"):
+                return [(name,) for name in self.categories], None
+            if q.startswith("SELECT category_id FROM category"):
+                cid = self.categories.get(params[0])
+                return ([(cid,)] if cid else []), None
+            if q.startswith("INSERT INTO category"):
+                cid = self.categories.setdefault(params[0], len(self.categories) + 1)
+                return [], cid
+            if q.startswith("INSERT INTO `job_description`"):
+                jd_id = len(self.job_descriptions) + 1
+                self.job_descriptions[jd_id] = params[:4]
+                return [], jd_id
+            if q.startswith("SELECT jd_text, category_detected"):
+                row = self.job_descriptions.get(int(params[0]))  # MySQL coerces "7" to 7
+                return ([row] if row else []), None
+            if q.startswith("INSERT INTO `candidate`"):
+                self._insert_candidates(params)
+                return [], None
+            if q.startswith("SELECT candidate_id FROM candidate"):
+                entry = self.candidates.get(params[0].lower())
+                return ([(entry[0],)] if entry else []), None
+            if q.startswith("SELECT candidate_email, candidate_id FROM candidate"):
+                return [(e, self.candidates[e][0]) for e in params if e in self.candidates], None
+            if "information_schema.COLUMNS" in q:
+                return [("resume_hash",), ("score_version",)], None
+            if q.startswith("INSERT INTO jd_score"):
+                width = 7 + ("resume_hash" in q) + ("score_version" in q)
+                for i in range(0, len(params), width):
+                    row = params[i:i + width] + (None,) * (9 - width)
+                    self.scores[(row[0], row[1])] = row
+                return [], None
+            if "FROM jd_score s" in q:
+                by_id = {cid: (email, name) for email, (cid, name) in self.candidates.items()}
+                return [(r[7], by_id[r[1]][0], by_id[r[1]][1], r[2], r[4], r[3], r[5], r[6])
+                        for (jd_id, cid), r in self.scores.items()
+                        if jd_id == params[0] and r[7] is not None and r[8] == params[1] and cid in by_id], None
+            if q.startswith("INSERT INTO `logs`"):
+                self.logs += 1
+                return [], None
+            self.unhandled += 1
+            return [], None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "statements": self.statements,
+                "unhandled": self.unhandled,
+                "connections": self.connections,
+                "job_descriptions": len(self.job_descriptions),
+                "candidates": len(self.candidates),
+                "scores": len(self.scores),
+                "logs": self.logs,
+            }
+
+
+class FakeCursor:
+    COLUMNS = {"SELECT jd_text": ("jd_text", "category_detected", "qualifications", "requirements")}
+
+    def __init__(self, db: FakeDatabase, dictionary: bool = False):
+        self.db = db
+        self.dictionary = dictionary
+        self.rows = []
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        self.rows, self.lastrowid = self.db.run(sql, params)
+        if self.dictionary:
+            head = " ".join(str(sql).split())
+            columns = next((cols for prefix, cols in self.COLUMNS.items() if head.startswith(prefix)), None)
+            if columns:
+                self.rows = [dict(zip(columns, row)) for row in self.rows]
+        self.rowcount = len(self.rows)
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        for i, params in enumerate(seq_params):
+            self.db.run(sql, params, round_trip=i == 0)
+        self.rows, self.rowcount = [], len(seq_params)
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """What FakeDatabase.connect returns; has the parts of a mysql.connector connection the pool uses."""
+    in_transaction = False
+
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+
+    def cursor(self, dictionary: bool = False, **kwargs):
+        return FakeCursor(self.db, dictionary=dictionary)
+
+    def commit(self):
+        time.sleep(self.db.latency)
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def close(self):
+        pass
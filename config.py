@@ -2,16 +2,124 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import os
+from dotenv import load_dotenv
 
-import google.generativeai as genai
+# Load .env before Settings reads the environment (GEMINI_API_KEY included)
+load_dotenv()
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
 class Settings:
     # Gemini API key (stored in environment variable GEMINI_API_KEY)
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 
+    # On-disk cache for extracted PDF text (see utils/pdf_cache.py)
+    PDF_CACHE_ENABLED: bool = os.getenv("PDF_CACHE_ENABLED", "1") == "1"
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "pdf_text"))
+    PDF_CACHE_MAX_BYTES: int = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    # Worker processes used to parse and extract resumes in parallel (1 = serial)
+    RESUME_INGEST_WORKERS: int = int(os.getenv("RESUME_INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+    # Concurrent LLM scoring calls, and the provider quota they are paced to (0 = unlimited)
+    SCORING_MAX_CONCURRENCY: int = int(os.getenv("SCORING_MAX_CONCURRENCY", "8"))
+    SCORING_REQUESTS_PER_MINUTE: float = float(os.getenv("SCORING_REQUESTS_PER_MINUTE", "0"))
+
+    # Resumes packed into one scoring request (1 = one request per resume), and the
+    # estimated resume-text tokens allowed per batched request
+    SCORING_BATCH_SIZE: int = int(os.getenv("SCORING_BATCH_SIZE", "1"))
+    SCORING_BATCH_TOKEN_BUDGET: int = int(os.getenv("SCORING_BATCH_TOKEN_BUDGET", "24000"))
+
+    # Characters kept per resume section in the text sent to the scorer
+    SCORING_SECTION_MAX_CHARS: int = int(os.getenv("SCORING_SECTION_MAX_CHARS", "3000"))
+
+    # Estimated-token budget for the document text each prompt type embeds (0 = no cap). The text is
+    # always cleaned of boilerplate and repeated lines first; see utils/prompt_compaction.py
+    PROMPT_BUDGET_EXTRACTION_TOKENS: int = int(os.getenv("PROMPT_BUDGET_EXTRACTION_TOKENS", "1500"))
+    PROMPT_BUDGET_JD_TOKENS: int = int(os.getenv("PROMPT_BUDGET_JD_TOKENS", "3000"))
+    PROMPT_BUDGET_SCORING_TOKENS: int = int(os.getenv("PROMPT_BUDGET_SCORING_TOKENS", "3000"))
+
+    # Texts sent per embedding request (provider batch limit)
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+
+    # Local embedding store keyed by (embedding model, sha256 of text)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "embeddings.sqlite3"))
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+    # JD classification: take the category index's top match when it has at least this cosine
+    # similarity and beats the runner-up by the margin; otherwise let the LLM pick from the top-k
+    CATEGORY_MIN_SIMILARITY: float = float(os.getenv("CATEGORY_MIN_SIMILARITY", "0.5"))
+    CATEGORY_CONFIDENCE_MARGIN: float = float(os.getenv("CATEGORY_CONFIDENCE_MARGIN", "0.05"))
+    CATEGORY_SHORTLIST_K: int = int(os.getenv("CATEGORY_SHORTLIST_K", "5"))
+
+    # Shared MySQL connection pool (utils/db_utils.py)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE_SECONDS: float = float(os.getenv("DB_POOL_RECYCLE_SECONDS", "3600"))
+    DB_POOL_PING_INTERVAL: float = float(os.getenv("DB_POOL_PING_INTERVAL", "30"))
+
+    # Background writer for the 'logs' table (Tools/logs.py); 0 writes synchronously
+    LOG_SINK_ENABLED: bool = os.getenv("LOG_SINK_ENABLED", "1") == "1"
+    LOG_SINK_MAX_QUEUE: int = int(os.getenv("LOG_SINK_MAX_QUEUE", "10000"))
+    LOG_SINK_BATCH_SIZE: int = int(os.getenv("LOG_SINK_BATCH_SIZE", "200"))
+    LOG_SINK_FLUSH_INTERVAL: float = float(os.getenv("LOG_SINK_FLUSH_INTERVAL", "1.0"))
+
+    # Local store of LLM scores keyed by (model, prompt version, JD hash, resume text hash)
+    SCORE_CACHE_ENABLED: bool = os.getenv("SCORE_CACHE_ENABLED", "1") == "1"
+    SCORE_CACHE_PATH: str = os.getenv("SCORE_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "scores.sqlite3"))
+    SCORE_CACHE_MAX_ENTRIES: int = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "100000"))
+    SCORE_CACHE_TTL_SECONDS: float = float(os.getenv("SCORE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Background scoring jobs (/jobs/recommended): worker threads, and how long finished jobs stay pollable
+    SCORING_JOB_WORKERS: int = int(os.getenv("SCORING_JOB_WORKERS", "2"))
+    SCORING_JOB_RETENTION_SECONDS: float = float(os.getenv("SCORING_JOB_RETENTION_SECONDS", "3600"))
+    SCORING_JOB_MAX_RETAINED: int = int(os.getenv("SCORING_JOB_MAX_RETAINED", "1000"))
+
+    # Two-stage /recommended: keep only the folder's top-K resumes by JD embedding similarity (and at
+    # least this similarity) before LLM scoring. 0 / empty = score every resume; requests may override.
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "0"))
+    RETRIEVAL_MIN_SIMILARITY: float = float(os.getenv("RETRIEVAL_MIN_SIMILARITY")) if os.getenv("RETRIEVAL_MIN_SIMILARITY") else None
+
+    # FAISS backends: flat (exact), ivf, ivfpq or hnsw - see utils/ann_index.py. Changing the resume
+    # index type or build parameters rebuilds it from the (cached) embeddings on next load.
+    RESUME_INDEX_TYPE: str = os.getenv("RESUME_INDEX_TYPE", "flat")
+    CATEGORY_INDEX_TYPE: str = os.getenv("CATEGORY_INDEX_TYPE", "flat")
+    ANN_NLIST: int = int(os.getenv("ANN_NLIST", "256"))
+    ANN_NPROBE: int = int(os.getenv("ANN_NPROBE", "16"))
+    ANN_PQ_M: int = int(os.getenv("ANN_PQ_M", "16"))
+    ANN_HNSW_M: int = int(os.getenv("ANN_HNSW_M", "32"))
+    ANN_EF_CONSTRUCTION: int = int(os.getenv("ANN_EF_CONSTRUCTION", "200"))
+    ANN_EF_SEARCH: int = int(os.getenv("ANN_EF_SEARCH", "128"))
+
+    # Per-stage latency histograms and counters, exposed at /metrics (utils/metrics.py). 0 turns
+    # recording into a no-op and the endpoint off.
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "1") == "1"
+
+    # Local BM25 index over extracted resume text (utils/lexical_index.py): ranks a folder against the
+    # JD's requirement/qualification keywords without API calls. LEXICAL_PREFILTER_TOP_K > 0 keeps only
+    # that many resumes per folder before embedding retrieval and LLM scoring (requests may override).
+    LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", os.path.join(BASE_DIR, ".cache", "lexical_index.json"))
+    LEXICAL_PREFILTER_TOP_K: int = int(os.getenv("LEXICAL_PREFILTER_TOP_K", "0"))
+    BM25_K1: float = float(os.getenv("BM25_K1", "1.2"))
+    BM25_B: float = float(os.getenv("BM25_B", "0.75"))
+
+    # Background warm-up from a worker's first request (services/warmup_service.py): loads the heavy
+    # modules and the listed indexes in a daemon thread; /ready answers 503 until it has finished.
+    # 0 = build on first use.
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "1") == "1"
+    WARMUP_COMPONENTS: list = [c.strip() for c in os.getenv(
+        "WARMUP_COMPONENTS", "imports,category_index,resume_index,lexical_index").split(",") if c.strip()]
+
+    # A resume the index could not embed (provider error) is tried again after this many seconds;
+    # unreadable or empty resumes are only tried again once the file changes.
+    RESUME_INDEX_RETRY_SECONDS: float = float(os.getenv("RESUME_INDEX_RETRY_SECONDS", "300"))
+
+    # Where the FAISS resume index and its manifest are persisted
+    RESUME_INDEX_DIR: str = os.getenv("RESUME_INDEX_DIR", os.path.join(BASE_DIR, ".cache", "resume_index"))
+
 settings = Settings()
-# Configure Gemini SDK
-genai.configure(api_key=settings.GEMINI_API_KEY)
+# The Gemini SDK is imported and configured on first use (utils.genai_client.get_genai)
 
 # Database connection parameters (from environment or defaults)
 db_config = {
@@ -19,4 +127,4 @@ db_config = {
     "user":     os.getenv("MYSQL_USER", "root"),
     "password": os.getenv("MYSQL_PASSWORD", ""),
     "database": os.getenv("MYSQL_DATABASE", "LLM_Resume")
-}
\ No newline at end of file
+}
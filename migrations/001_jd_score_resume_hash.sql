@@ -0,0 +1,5 @@
+-- migrations/001_jd_score_resume_hash.sql
+-- Incremental /recommended scoring (services/score_service.py): the content hash of the resume a
+-- jd_score row was scored from. Rows without it are always rescored. Apply once, with a user
+-- allowed to run DDL; the app only checks for the column and never alters the schema itself.
+ALTER TABLE `jd_score` ADD COLUMN `resume_hash` CHAR(64) NULL;
@@ -0,0 +1,6 @@
+-- migrations/002_jd_score_score_version.sql
+-- Incremental /recommended scoring (services/score_service.py): the scoring model and prompt
+-- version a jd_score row was produced with (score_version()). A stored score is only reused for
+-- an unchanged resume when this matches the current one; until the column exists every resume
+-- is rescored. Apply after 001, with a user allowed to run DDL.
+ALTER TABLE `jd_score` ADD COLUMN `score_version` VARCHAR(128) NULL;
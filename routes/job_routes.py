@@ -0,0 +1,60 @@
+# routes/job_routes.py
+import os, sys, logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from flask import Blueprint, request, jsonify, url_for
+from services.job_service import get_job_queue
+from routes.score_routes import retrieval_params
+from Tools.logs import save_log
+
+logger = logging.getLogger(__name__)
+job_bp = Blueprint('job_bp', __name__)
+
+@job_bp.route('/jobs/recommended', methods=['POST'])
+def submit_recommendation_job():
+    """
+    Queues a /recommended run and returns its job id right away (202).
+    Takes jd_id, resume_folder and optional incremental, top_k, min_similarity and lexical_top_k
+    from the JSON body (which must be an object) or the query string.
+    Submitting the same jd_id/resume_folder while a job for it is pending returns that job (200).
+    """
+    params = request.args
+    if request.is_json:
+        params = request.get_json(silent=True)
+        if not isinstance(params, dict):
+            msg = "Request body must be a JSON object"
+            save_log("ERROR", msg, process="Score_Recommendation")
+            return jsonify({'error': msg}), 400
+    jd_id = params.get('jd_id')
+    resume_folder = params.get('resume_folder')
+    if not jd_id or not resume_folder:
+        msg = "Missing jd_id or resume_folder parameter"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    if isinstance(jd_id, bool) or not isinstance(jd_id, (int, str)) or not isinstance(resume_folder, str):
+        msg = "jd_id must be a string or integer and resume_folder a string"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    incremental = str(params.get('incremental', '1')).lower() not in ('0', 'false')
+    try:
+        retrieval = retrieval_params(params)
+    except ValueError as e:
+        msg = f"Invalid top_k, min_similarity or lexical_top_k: {e}"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+
+    job, created = get_job_queue().submit(jd_id, resume_folder, incremental, **retrieval)
+    if created:
+        save_log("INFO", f"Queued scoring job {job.id} for jd_id={jd_id}", process="Score_Recommendation")
+    body = job.to_dict(include_results=False)
+    body["coalesced"] = not created
+    body["status_url"] = url_for('job_bp.get_recommendation_job', job_id=job.id)
+    return jsonify(body), (202 if created else 200)
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_recommendation_job(job_id):
+    """Job status and progress; ranked partial results while running, the full response once done."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': f"Job {job_id} not found"}), 404
+    return jsonify(job.to_dict(include_results=request.args.get('results', '1') != '0'))
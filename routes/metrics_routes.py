@@ -0,0 +1,35 @@
+# routes/metrics_routes.py
+import os, sys, logging, time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from flask import Blueprint, Response, g, jsonify, request
+from config import settings
+from utils.metrics import HTTP_SECONDS
+from services.metrics_service import render_metrics
+
+logger = logging.getLogger(__name__)
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.before_app_request
+def _start_request_timer():
+    if settings.METRICS_ENABLED:
+        g.metrics_start = time.perf_counter()
+
+
+@metrics_bp.after_app_request
+def _observe_request(response):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - start, endpoint, request.method, str(response.status_code))
+    return response
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-stage latency histograms, LLM/cache/DB counters and pool, cache, log and job gauges (Prometheus text)."""
+    if not settings.METRICS_ENABLED:
+        return jsonify({'error': "Metrics are disabled (METRICS_ENABLED=0)"}), 404
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,26 @@
+# routes/ready_routes.py
+import os, sys, logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from flask import Blueprint, jsonify
+from services.warmup_service import get_warmup_status, start_warmup
+
+logger = logging.getLogger(__name__)
+ready_bp = Blueprint('ready_bp', __name__)
+
+
+@ready_bp.before_app_request
+def _ensure_warmup():
+    # Warm-up starts with the first request a process serves (the readiness probe, normally), never
+    # at import: a gunicorn --preload master imports the app and then forks, and its worker threads
+    # would not survive the fork. No-op once started in this process.
+    start_warmup()
+
+
+@ready_bp.route('/ready', methods=['GET'])
+def ready():
+    """
+    Readiness probe: 503 while the background warm-up is still loading modules and indexes, 200
+    once it has finished. Components that failed are listed and will be built on first use.
+    """
+    status = get_warmup_status()
+    return jsonify(status), 200 if status["ready"] else 503
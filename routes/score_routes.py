@@ -1,16 +1,45 @@
 # routes/score_routes.py
-import os, sys, logging
+import os, sys, json, logging, math
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from flask import Blueprint, request, jsonify
-from utils.db_utils import get_connection
-from services.score_service import recommend_resumes_by_embedding
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services.score_service import run_recommendation, iter_recommendation, rank_folder_lexically
 from Tools.logs import save_log
-from utils.candidate_utils import extract_candidate_details, upsert_candidate
-from utils.pdf_utils import read_pdf_content  # Adjust the import if your util is named differently
 
 logger = logging.getLogger(__name__)
 score_bp = Blueprint('score_bp', __name__)
 
+def _count_param(params, name: str):
+    raw = params.get(name)
+    if raw in (None, ''):
+        return None
+    # Query strings give str, JSON bodies any type; nothing is silently truncated
+    if isinstance(raw, float) and raw.is_integer():
+        raw = int(raw)
+    if isinstance(raw, bool) or not isinstance(raw, (int, str)):
+        raise ValueError(f"{name} must be a whole number")
+    value = int(raw)
+    if value < 0:
+        raise ValueError(f"{name} must be >= 0")
+    return value
+
+
+def retrieval_params(params) -> dict:
+    """
+    Optional two-stage scoring parameters: top_k (int >= 0), min_similarity (float) and
+    lexical_top_k (int >= 0, the BM25 prefilter). Raises ValueError on malformed values.
+    """
+    parsed = {"top_k": _count_param(params, 'top_k'), "min_similarity": None,
+              "lexical_top_k": _count_param(params, 'lexical_top_k')}
+    raw = params.get('min_similarity')
+    if raw not in (None, ''):
+        if isinstance(raw, bool) or not isinstance(raw, (int, float, str)):
+            raise ValueError("min_similarity must be a number")
+        parsed["min_similarity"] = float(raw)
+        if not math.isfinite(parsed["min_similarity"]):
+            raise ValueError("min_similarity must be a finite number")
+    return parsed
+
+
 @score_bp.route('/recommended', methods=['GET'])
 def recommended():
     jd_id = request.args.get('jd_id')
@@ -24,98 +53,119 @@ def recommended():
         save_log("ERROR", msg, process="Score_Recommendation")
         return jsonify({'error': msg}), 400
     try:
-        # Fetch JD details from DB
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT jd_text, category_detected, qualifications, requirements
-            FROM job_description
-            WHERE jd_id = %s
-        """, (jd_id,))
-        row = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        retrieval = retrieval_params(request.args)
+    except ValueError as e:
+        msg = f"Invalid top_k, min_similarity or lexical_top_k: {e}"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    try:
+        # incremental=0 rescores the whole folder instead of only new or changed resumes;
+        # top_k / min_similarity only send the folder's closest resumes by embedding to the LLM,
+        # lexical_top_k its best BM25 matches
+        return jsonify(run_recommendation(
+            jd_id, resume_folder, incremental=request.args.get('incremental', '1') != '0', **retrieval
+        ))
+    except LookupError as e:
+        msg = str(e)
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 404
+    except Exception as e:
+        msg = f"Unhandled exception in /recommended: {e}"
+        logger.exception(msg)
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 500
 
-        if not row:
-            msg = f"Job description {jd_id} not found"
-            save_log("ERROR", msg, process="Score_Recommendation")
-            return jsonify({'error': msg}), 404
 
-        jd_text = row['jd_text']
-        category = row.get('category_detected', '') or ''
-        qualifications = row.get('qualifications', '') or ''
-        requirements = row.get('requirements', '') or ''
+@score_bp.route('/recommended/lexical', methods=['GET'])
+def recommended_lexical():
+    """
+    Ranks resume_folder against the JD by BM25 over the extracted resume text, using the JD's
+    requirement and qualification keywords. Makes no LLM or embedding calls; top_k limits the
+    results.
+    """
+    jd_id = request.args.get('jd_id')
+    resume_folder = request.args.get('resume_folder')
+    if not jd_id or not resume_folder:
+        msg = "Missing jd_id or resume_folder parameter"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    try:
+        top_k = _count_param(request.args, 'top_k')
+    except ValueError as e:
+        msg = f"Invalid top_k: {e}"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    try:
+        return jsonify(rank_folder_lexically(jd_id, resume_folder, top_k=top_k))
+    except LookupError as e:
+        msg = str(e)
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 404
+    except Exception as e:
+        msg = f"Unhandled exception in /recommended/lexical: {e}"
+        logger.exception(msg)
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 500
+
 
-        from services.score_service import score_all_resumes_in_folder
-        recommendations = score_all_resumes_in_folder(
-            jd_text, resume_folder, category, qualifications, requirements
-        )
-        # --- DB insert block ---
-        conn = get_connection()
-        cursor = conn.cursor()
-        for rec in recommendations:
-            candidate_email = rec.get("candidate_email", "")
-            candidate_id = None
+def _format_event(event: str, data: dict, sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
 
-            # Try to upsert candidate by parsing resume if possible
-            if candidate_email and rec.get("resume_path"):
-                try:
-                    with open(rec["resume_path"], "rb") as f:
-                        file_bytes = f.read()
-                    resume_text = read_pdf_content(file_bytes)
-                    cand_info = extract_candidate_details(resume_text)
-                    candidate_id = upsert_candidate(cand_info, rec["resume_path"])
-                except Exception as e:
-                    logger.error(f"Failed candidate upsert: {e}")
-                    save_log("ERROR", f"Failed candidate upsert: {e}", process="Score_Recommendation")
-            else:
-                # Fallback: lookup by email
-                try:
-                    cursor.execute("SELECT candidate_id FROM candidate WHERE candidate_email=%s", (candidate_email,))
-                    c_row = cursor.fetchone()
-                    if c_row:
-                        candidate_id = c_row[0]
-                except Exception as e:
-                    logger.error(f"Failed candidate lookup: {e}")
 
-            cursor.execute("""
-                INSERT INTO jd_score (
-                    jd_id, candidate_id, category_score,
-                    qualifications_score, requirements_score, final_score, reason
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    category_score=VALUES(category_score),
-                    qualifications_score=VALUES(qualifications_score),
-                    requirements_score=VALUES(requirements_score),
-                    final_score=VALUES(final_score),
-                    reason=VALUES(reason)
-            """, (
-                jd_id,
-                candidate_id,
-                rec.get("category_score"),
-                rec.get("qualifications_score"),
-                rec.get("requirements_score"),
-                rec.get("final_score"),
-                rec.get("reason", ""),
-            ))
-        conn.commit()
-        cursor.close()
-        conn.close()
-        # --- END DB insert block ---
-        save_log("INFO", f"Completed embedding recommendation for jd_id={jd_id}", process="Score_Recommendation")
-        fit_summaries = [r.get('fit_summary', '') for r in recommendations if 'fit_summary' in r][:3]
-        summary = " | ".join(fit_summaries) if fit_summaries else "No resumes scored for this job description."
-        return jsonify({
-            "job_id": jd_id,
-            "resume_folder": resume_folder,
-            "results": recommendations,
-            "count": len(recommendations),
-            "summary": summary
-        })
+@score_bp.route('/recommended/stream', methods=['GET'])
+def recommended_stream():
+    """
+    Streaming /recommended: one event per resume as soon as it is scored, then a final "summary"
+    event with the ranked results (see iter_recommendation for the event types).
+    Sends NDJSON by default; Server-Sent Events with format=sse or Accept: text/event-stream.
+    """
+    jd_id = request.args.get('jd_id')
+    resume_folder = request.args.get('resume_folder')
+    if not jd_id or not resume_folder:
+        msg = "Missing jd_id or resume_folder parameter"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    try:
+        retrieval = retrieval_params(request.args)
+    except ValueError as e:
+        msg = f"Invalid top_k, min_similarity or lexical_top_k: {e}"
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 400
+    sse = request.args.get('format') == 'sse' or request.accept_mimetypes.best == 'text/event-stream'
 
+    events = iter_recommendation(jd_id, resume_folder,
+                                 incremental=request.args.get('incremental', '1') != '0', **retrieval)
+    try:
+        # Runs the JD lookup, so a missing JD is still a plain 404
+        first = next(events)
+    except LookupError as e:
+        msg = str(e)
+        save_log("ERROR", msg, process="Score_Recommendation")
+        return jsonify({'error': msg}), 404
     except Exception as e:
-        msg = f"Unhandled exception in /recommended: {e}"
+        msg = f"Unhandled exception in /recommended/stream: {e}"
         logger.exception(msg)
         save_log("ERROR", msg, process="Score_Recommendation")
         return jsonify({'error': msg}), 500
+
+    def generate():
+        yield _format_event(*first, sse)
+        try:
+            for event, data in events:
+                yield _format_event(event, data, sse)
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            msg = f"Unhandled exception in /recommended/stream: {e}"
+            logger.exception(msg)
+            save_log("ERROR", msg, process="Score_Recommendation")
+            yield _format_event("error", {"error": msg}, sse)
+        finally:
+            events.close()  # a disconnected client stops the pipeline
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -6,44 +6,111 @@ The function analyze_jd is the sole analysis function. analyze_jd_with_gpt is ke
 """
 import os, sys
 
-import requests
-import google.generativeai as genai
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from utils.category_utils import get_or_create_category_id
 import os
 import logging
-import mysql.connector
 import json
 from utils.db_utils import get_connection
 from Tools.logs import save_log
-from utils.embeddings import embed_text
+from config import settings
+from utils.genai_client import get_genai
+from utils.prompt_compaction import compact_jd_text
+from utils.llm_usage import record_llm_call
+from utils.metrics import LLM_CALLS, LLM_FAILURES, STAGE_ERRORS, stage_timer
 
 logger = logging.getLogger(__name__)
 
-from utils.embeddings import get_category_index
+def _load_all_category_names() -> list:
+    """Load all category names from DB."""
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT name FROM category")
+        return [row[0] for row in cur.fetchall()]
+
+
+def shortlist_categories(jd_text: str, k: int = None):
+    """
+    Searches the FAISS category index with the JD embedding.
+    Returns (names, confident): the top-k category names, best first, and whether the top match
+    clears CATEGORY_MIN_SIMILARITY and beats the runner-up by CATEGORY_CONFIDENCE_MARGIN.
+    Returns ([], False) when the index is unavailable.
+    """
+    from utils.embeddings import embed_text, get_category_index  # loads numpy/faiss on first use
+    k = k or settings.CATEGORY_SHORTLIST_K
+    index = get_category_index()
+    if index is None or index.index.ntotal == 0:
+        return [], False
+    try:
+        matches = index.search(embed_text(jd_text), k=max(k, 2))
+    except Exception as e:
+        logger.warning(f"JD embedding for category shortlist failed: {e}")
+        return [], False
+    if not matches:
+        return [], False
+    names = [index.names.get(cid) for cid, _ in matches]
+    names = [n for n in names if n][:k]
+    top = matches[0][1]
+    runner_up = matches[1][1] if len(matches) > 1 else -1.0
+    confident = top >= settings.CATEGORY_MIN_SIMILARITY and top - runner_up >= settings.CATEGORY_CONFIDENCE_MARGIN
+    return names, confident
+
+
+def _parse_llm_json(content: str) -> dict:
+    import re
+    try:
+        return json.loads(content)
+    except Exception:
+        # Try to extract JSON block from output if there's extra text
+        match = re.search(r'\{.*?\}', content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group())
+            except Exception:
+                return {}
+        return {}
+
 
 def analyze_jd(jd_text: str) -> dict:
     """
-    Classify a job description into a single best-fit category using Gemini Pro LLM prompting.
+    Classify a job description into a single best-fit category and extract its qualifications and requirements.
+
+    The JD embedding is first matched against the category index. A confident match is taken as
+    the category and Gemini only extracts qualifications/requirements; otherwise Gemini chooses
+    among the top-k shortlisted categories. The full category table is only sent to the LLM when
+    the index is unavailable.
     Returns {"categories": [name1], "qualifications": "", "requirements": ""}
     """
     try:
-        # Load all category names from DB
-        conn = mysql.connector.connect(**{
-            "host": os.getenv('MYSQL_HOST', 'localhost'),
-            "user": os.getenv('MYSQL_USER', 'root'),
-            "password": os.getenv('MYSQL_PASSWORD', ''),
-            "database": os.getenv('MYSQL_DATABASE', 'LLM_Resume')
-        })
-        cur = conn.cursor()
-        cur.execute("SELECT name FROM category")
-        categories = [row[0] for row in cur.fetchall()]
-        cur.close()
-        conn.close()
+        shortlist, confident = shortlist_categories(jd_text)
+        # Boilerplate-free, budgeted JD text for the prompt; the embedding above uses the full text
+        prompt_jd_text = compact_jd_text(jd_text, settings.PROMPT_BUDGET_JD_TOKENS)
+
+        if confident:
+            logger.info(f"JD category '{shortlist[0]}' decided by embedding index")
+            prompt = f"""
+You are a job description analyzer. The job category has already been determined as "{shortlist[0]}". Given the following job description, extract its qualifications and requirements.
+
+Respond ONLY with a JSON object in the format:
+{{
+  "qualifications": "...",
+  "requirements": "..."
+}}
+
+Job Description:
+\"\"\"
+{prompt_jd_text}
+\"\"\"
+"""
+        else:
+            if shortlist:
+                logger.info(f"JD category shortlist for LLM: {shortlist}")
+                categories = shortlist
+            else:
+                categories = _load_all_category_names()
 
-        # Prepare prompt with category options
-        category_options = ", ".join(categories)
-        prompt = f"""
+            # Prepare prompt with category options
+            category_options = ", ".join(categories)
+            prompt = f"""
 You are a job description analyzer. Given the following job description, extract the single best-fit job category (choose one category from the following options: {category_options}), qualifications, and requirements.
 
 Respond ONLY with a JSON object in the format:
@@ -55,32 +122,30 @@ Respond ONLY with a JSON object in the format:
 
 Job Description:
 \"\"\"
-{jd_text}
+{prompt_jd_text}
 \"\"\"
 """
 
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        content = response.text.strip()
-        logger.info(f"Gemini raw response: {content}")
-        import re
+        model = get_genai().GenerativeModel("gemini-2.0-flash")
+        LLM_CALLS.inc("jd_analysis")
         try:
-            result = json.loads(content)
+            with stage_timer("llm_jd_analysis"):
+                response = model.generate_content(prompt)
         except Exception:
-            # Try to extract JSON block from output if there's extra text
-            match = re.search(r'\{.*?\}', content, re.DOTALL)
-            if match:
-                try:
-                    result = json.loads(match.group())
-                except Exception:
-                    result = {}
-            else:
-                result = {}
+            LLM_FAILURES.inc("jd_analysis")
+            raise
+        content = response.text.strip()
+        record_llm_call("jd_analysis", prompt, response, content)
+        logger.info(f"Gemini raw response: {content}")
+        result = _parse_llm_json(content)
+        if confident:
+            result["category"] = shortlist[0]
         categories = [result["category"]] if "category" in result else []
         qualifications = result.get("qualifications", "")
         requirements = result.get("requirements", "")
         return {"categories": categories, "qualifications": qualifications, "requirements": requirements}
     except Exception as e:
+        STAGE_ERRORS.inc("llm_jd_analysis")
         logger.error(f"JD Gemini flash classification failed: {e}")
         save_log("ERROR", str(e), process="JD_Analysis")
         return {"categories": [], "qualifications": "", "requirements": ""}
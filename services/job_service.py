@@ -0,0 +1,208 @@
+# services/job_service.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from services.score_service import rank_results, run_recommendation
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+class ScoringJob:
+    """
+    One background /recommended run. Progress and partial results are updated from the worker
+    thread as each resume finishes; readers take a consistent snapshot with to_dict().
+    """
+    def __init__(self, jd_id, resume_folder: str, incremental: bool = True,
+                 top_k: int = None, min_similarity: float = None, lexical_top_k: int = None):
+        self.id = uuid.uuid4().hex
+        self.jd_id = jd_id
+        self.resume_folder = resume_folder
+        self.incremental = incremental
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.lexical_top_k = lexical_top_k
+        self.status = QUEUED
+        self.total = None
+        self.processed = 0
+        self.failed = 0
+        self.pruned = 0
+        self.partial = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> tuple:
+        return (str(self.jd_id), self.resume_folder, self.incremental, self.top_k, self.min_similarity,
+                self.lexical_top_k)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def start(self, data: dict):
+        """on_start callback: the number of resumes this run will report on."""
+        with self._lock:
+            self.total = data.get("total")
+            self.pruned = data.get("pruned", 0)
+
+    def record(self, path, result, error):
+        """on_result callback for the scoring pipeline."""
+        with self._lock:
+            self.processed += 1
+            if error is not None:
+                self.failed += 1
+            elif result is not None:
+                self.partial.append(result)
+
+    def to_dict(self, include_results: bool = True) -> dict:
+        with self._lock:
+            body = {
+                "job_id": self.id,
+                "jd_id": self.jd_id,
+                "resume_folder": self.resume_folder,
+                "incremental": self.incremental,
+                "top_k": self.top_k,
+                "min_similarity": self.min_similarity,
+                "lexical_top_k": self.lexical_top_k,
+                "status": self.status,
+                "total": self.total,
+                "processed": self.processed,
+                "failed": self.failed,
+                "pruned": self.pruned,
+                "progress": (self.processed / self.total) if self.total else (1.0 if self.finished else 0.0),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+            if self.error is not None:
+                body["error"] = self.error
+            if include_results:
+                if self.result is not None:
+                    body["result"] = self.result
+                else:
+                    body["partial_results"] = rank_results(self.partial)
+            return body
+
+
+class JobQueue:
+    """
+    In-process queue of ScoringJobs run by a fixed pool of worker threads.
+
+    Submitting a job with the same jd_id, resume_folder and options as one already queued or running returns
+    the existing job instead of starting a second one. Finished jobs stay pollable for
+    retention_seconds and at most max_retained of them are kept. Jobs live in this process
+    only: behind several server processes, poll the same process that accepted the job.
+    """
+    def __init__(self, runner=run_recommendation, workers: int = 2,
+                 retention_seconds: float = 3600.0, max_retained: int = 1000):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.retention_seconds = retention_seconds
+        self.max_retained = max_retained
+        self._jobs = {}
+        self._active = {}  # job key -> job id, for queued and running jobs
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scoring-job")
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, jd_id, resume_folder: str, incremental: bool = True,
+               top_k: int = None, min_similarity: float = None, lexical_top_k: int = None):
+        """Returns (job, created); created is False when an identical job was already pending."""
+        job = ScoringJob(jd_id, resume_folder, incremental, top_k=top_k, min_similarity=min_similarity,
+                         lexical_top_k=lexical_top_k)
+        with self._lock:
+            self._prune()
+            active_id = self._active.get(job.key)
+            if active_id is not None:
+                self.coalesced += 1
+                return self._jobs[active_id], False
+            self._jobs[job.id] = job
+            self._active[job.key] = job.id
+            self.submitted += 1
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ScoringJob):
+        with job._lock:
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = self.runner(job.jd_id, job.resume_folder, incremental=job.incremental,
+                                 on_start=job.start, on_result=job.record,
+                                 top_k=job.top_k, min_similarity=job.min_similarity,
+                                 lexical_top_k=job.lexical_top_k)
+            with job._lock:
+                job.result = result
+                job.status = SUCCEEDED
+                job.finished_at = time.time()  # with the status: _prune relies on finished_at of finished jobs
+        except Exception as e:
+            logger.exception(f"Scoring job {job.id} for jd_id={job.jd_id} failed")
+            with job._lock:
+                job.error = str(e)
+                job.status = FAILED
+                job.finished_at = time.time()
+        finally:
+            with self._lock:
+                if self._active.get(job.key) == job.id:
+                    del self._active[job.key]
+
+    def _prune(self):
+        # Caller holds self._lock
+        now = time.time()
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at)
+        expired = [j for j in finished if now - j.finished_at > self.retention_seconds]
+        excess = len(finished) - len(expired) - self.max_retained
+        if excess > 0:
+            expired += [j for j in finished if j not in expired][:excess]
+        for j in expired:
+            self._jobs.pop(j.id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_status = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                by_status[job.status] += 1
+            return dict(by_status, submitted=self.submitted, coalesced=self.coalesced, workers=self.workers)
+
+
+_queue = None
+_queue_pid = None
+_queue_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_queue_lock")
+def get_job_queue() -> JobQueue:
+    """Returns this process's JobQueue (created on first use, and again after a fork)."""
+    global _queue, _queue_pid
+    if _queue is None or _queue_pid != os.getpid():
+        with _queue_lock:
+            if _queue is None or _queue_pid != os.getpid():
+                _queue = JobQueue(
+                    workers=settings.SCORING_JOB_WORKERS,
+                    retention_seconds=settings.SCORING_JOB_RETENTION_SECONDS,
+                    max_retained=settings.SCORING_JOB_MAX_RETAINED,
+                )
+                _queue_pid = os.getpid()
+    return _queue
+
+
+def get_job_queue_stats() -> dict:
+    """Job counts of this process's queue ({} when no job was ever submitted here)."""
+    if _queue is None or _queue_pid != os.getpid():
+        return {}
+    return _queue.stats()
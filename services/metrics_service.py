@@ -0,0 +1,127 @@
+# services/metrics_service.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+from utils.metrics import get_metrics_registry
+from utils.db_utils import get_pool_stats
+from utils.pdf_cache import get_pdf_cache
+from utils.llm_usage import get_llm_usage_stats
+from Tools.logs import get_log_sink
+from services.score_service import get_score_cache_stats
+from services.job_service import get_job_queue_stats
+from services.warmup_service import get_warmup_status
+
+logger = logging.getLogger(__name__)
+
+
+def _family(name: str, kind: str, documentation: str, stats: dict, fields: dict, **labels):
+    """One metric family from a stats() dict: fields maps stats key -> label value for `field`."""
+    return (name, kind, documentation,
+            [(dict(labels, field=label), stats.get(key)) for key, label in fields.items() if key in stats])
+
+
+def collect_db_pool():
+    stats = get_pool_stats()
+    return [
+        ("ats_db_pool_connections", "gauge", "MySQL pool connections by state",
+         [({"state": "open"}, stats["open"]), ({"state": "idle"}, stats["idle"]), ({"state": "in_use"}, stats["in_use"])]),
+        ("ats_db_pool_size", "gauge", "Maximum MySQL pool connections", [({}, stats["size"])]),
+        _family("ats_db_pool_events_total", "counter",
+                "MySQL pool checkouts, connects, recycles, leaked connections and waits", stats,
+                {"checkouts": "checkouts", "created": "created", "recycled": "recycled", "leaked": "leaked",
+                 "health_check_failures": "health_check_failures", "timeouts": "timeouts", "waits": "waits"}),
+        ("ats_db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection",
+         [({}, stats["wait_seconds_total"])]),
+    ]
+
+
+def collect_caches():
+    caches = {"score": get_score_cache_stats()}
+    # Not imported yet means nothing was embedded in this process; a scrape should not load faiss
+    embeddings = sys.modules.get("utils.embeddings")
+    embedding_cache = embeddings.get_embedding_cache() if embeddings is not None else None
+    if embedding_cache is not None:
+        caches["embedding"] = embedding_cache.stats()
+    pdf_cache = get_pdf_cache()
+    if pdf_cache is not None:
+        caches["pdf_text"] = pdf_cache.stats()
+    entries, evictions = [], []
+    for cache, stats in caches.items():
+        if not stats:
+            continue
+        if "entries" in stats:
+            entries.append(({"cache": cache, "unit": "entries"}, stats["entries"]))
+        if "bytes" in stats:
+            entries.append(({"cache": cache, "unit": "bytes"}, stats["bytes"]))
+        evictions.append(({"cache": cache}, stats.get("evictions")))
+    return [
+        ("ats_cache_size", "gauge", "Cache size in entries or bytes", entries),
+        ("ats_cache_evictions_total", "counter", "Cache entries evicted (this process)", evictions),
+    ]
+
+
+def collect_log_sink():
+    sink = get_log_sink()
+    if sink is None:
+        return []
+    stats = sink.stats()
+    return [
+        _family("ats_log_sink_records_total", "counter", "Rows handled by the background log writer", stats,
+                {"enqueued": "enqueued", "written": "written", "failed": "failed", "dropped": "dropped"}),
+        ("ats_log_sink_batches_total", "counter", "Multi-row log inserts written", [({}, stats["batches"])]),
+        ("ats_log_sink_queued", "gauge", "Log rows waiting to be written", [({}, stats["queued"])]),
+    ]
+
+
+def collect_jobs():
+    stats = get_job_queue_stats()
+    if not stats:
+        return []
+    return [
+        ("ats_jobs", "gauge", "Background scoring jobs retained, by status",
+         [({"status": status}, stats[status]) for status in ("queued", "running", "succeeded", "failed")]),
+        _family("ats_jobs_submitted_total", "counter", "Background scoring job submissions", stats,
+                {"submitted": "submitted", "coalesced": "coalesced"}),
+    ]
+
+
+def collect_llm_usage():
+    usage = get_llm_usage_stats()
+    usage.pop("total", None)
+    tokens, compaction = [], []
+    for prompt_type, bucket in sorted(usage.items()):
+        tokens.append(({"prompt_type": prompt_type, "direction": "input"}, bucket["input_tokens"]))
+        tokens.append(({"prompt_type": prompt_type, "direction": "output"}, bucket["output_tokens"]))
+        if bucket["compacted"]:
+            compaction.append(({"prompt_type": prompt_type, "stage": "before"}, bucket["tokens_before_compaction"]))
+            compaction.append(({"prompt_type": prompt_type, "stage": "after"}, bucket["tokens_after_compaction"]))
+    return [
+        ("ats_llm_tokens_total", "counter", "LLM tokens (provider counts, else ~4 chars/token estimates)", tokens),
+        ("ats_prompt_compaction_tokens_total", "counter", "Estimated prompt text tokens before and after compaction",
+         compaction),
+    ]
+
+
+def collect_warmup():
+    status = get_warmup_status()
+    if not status.get("enabled"):
+        return []
+    components = status["components"]
+    return [
+        ("ats_warmup_ready", "gauge", "1 once the background warm-up has finished", [({}, status["ready"])]),
+        ("ats_warmup_component_ready", "gauge", "1 when a warm-up component loaded successfully",
+         [({"component": name}, c["state"] == "ready") for name, c in components.items()]),
+        ("ats_warmup_component_seconds", "gauge", "Time a warm-up component took to load",
+         [({"component": name}, c["seconds"]) for name, c in components.items()]),
+    ]
+
+
+COLLECTORS = (collect_db_pool, collect_caches, collect_log_sink, collect_jobs, collect_llm_usage, collect_warmup)
+
+
+def render_metrics() -> str:
+    """This process's metrics in the Prometheus text exposition format."""
+    registry = get_metrics_registry()
+    for collector in COLLECTORS:
+        registry.register_collector(collector)
+    return registry.render()
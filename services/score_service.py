@@ -2,11 +2,27 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import logging
-from utils.embeddings import embed_text, get_resume_index
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from config import settings
+from services.scoring_engine import ScoringEngine
+from utils.resume_files import RESUMES_DIR
+from utils.lexical_index import get_lexical_index, tokenize
 from utils.pdf_utils import read_pdf_content
-from utils.candidate_utils import extract_candidate_details
-from Tools.logs import save_log
+from utils.pdf_cache import content_hash
+from utils.resume_artifact import ResumeArtifact
+from utils.resume_sections import render_sections
+from utils.prompt_compaction import fit_sections
+from utils.llm_usage import estimate_tokens, get_llm_usage, record_llm_call
+from utils.metrics import (LLM_CALLS, LLM_FAILURES, STAGE_ERRORS, count_cache, get_metrics_registry,
+                           stage_timer)
+from utils.candidate_utils import extract_candidate_details, extract_regex_details, fill_missing_details
+from utils.fork_safety import reset_lock_after_fork
+from Tools.logs import hold_logs, replay_logs, save_log
 from utils.candidate_utils import save_score_to_jd_score
+from utils.candidate_utils import upsert_candidates_bulk, lookup_candidate_ids, BULK_CHUNK_SIZE
 logger = logging.getLogger(__name__)
 from utils.db_utils import get_connection
 
@@ -36,10 +52,82 @@ def extract_keywords(text):
 
 
 import json
-import google.generativeai as genai
+import hashlib
+from utils.genai_client import get_genai
+from utils.sqlite_cache import SqliteCache
 
-def score_resume_with_gemini_flash(jd_category, jd_requirements, jd_qualifications, resume_text):
-    model = genai.GenerativeModel("gemini-2.0-flash")
+SCORING_MODEL = "gemini-2.0-flash"
+# Bump whenever either scoring prompt changes meaning, so cached scores from the old prompt are ignored
+SCORE_PROMPT_VERSION = "v1"
+
+_score_cache = None
+def get_score_cache():
+    """Returns the process-wide LLM score store, or None when disabled."""
+    global _score_cache
+    if not settings.SCORE_CACHE_ENABLED:
+        return None
+    if _score_cache is None:
+        _score_cache = SqliteCache(settings.SCORE_CACHE_PATH, max_entries=settings.SCORE_CACHE_MAX_ENTRIES,
+                                   ttl_seconds=settings.SCORE_CACHE_TTL_SECONDS or None)
+    return _score_cache
+
+def get_score_cache_stats() -> dict:
+    """Hit/miss counters and size of the score store ({} when disabled)."""
+    cache = get_score_cache()
+    return cache.stats() if cache is not None else {}
+
+def _model_name(model) -> str:
+    name = getattr(model, "model_name", None) if model is not None else None
+    return (name or SCORING_MODEL).split("/")[-1]
+
+def score_version(model_name: str = None) -> str:
+    """Model and prompt version a score was produced with; stored scores are reused only while it is current."""
+    return f"{model_name or SCORING_MODEL}:{SCORE_PROMPT_VERSION}"
+
+def score_cache_key(jd_category, jd_requirements, jd_qualifications, resume_text, model_name: str = None) -> str:
+    """
+    Cache key for one score: model, prompt version, hash of the JD sections and hash of the exact
+    resume text sent to the model. Any change to one of them is a miss.
+    """
+    jd_hash = hashlib.sha256(
+        json.dumps([jd_category, jd_requirements, jd_qualifications], default=str).encode("utf-8")
+    ).hexdigest()
+    resume_hash = hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+    return f"{score_version(model_name)}:{jd_hash}:{resume_hash}"
+
+def _cached_scores(keys: list) -> dict:
+    cache = get_score_cache()
+    if cache is None or not keys:
+        return {}
+    try:
+        found = {k: json.loads(v) for k, v in cache.get_many(keys).items()}
+        count_cache("score", len(found), len(keys) - len(found))
+        return found
+    except Exception as e:
+        logger.warning(f"Score cache lookup failed: {e}")
+        return {}
+
+def _store_scores(items: dict):
+    cache = get_score_cache()
+    if cache is None or not items:
+        return
+    try:
+        cache.put_many({k: json.dumps(v).encode("utf-8") for k, v in items.items()})
+    except Exception as e:
+        logger.warning(f"Score cache write failed: {e}")
+
+def score_resume_with_gemini_flash(jd_category, jd_requirements, jd_qualifications, resume_text, model=None):
+    """
+    Scores one resume against the JD sections. `model` may be any object with a Gemini-style
+    generate_content(prompt) method (e.g. a local fake for tests and benchmarks).
+    Scores are served from the score cache when the same JD, resume text, model and prompt
+    version were scored before.
+    """
+    cache_key = score_cache_key(jd_category, jd_requirements, jd_qualifications, resume_text, _model_name(model))
+    cached = _cached_scores([cache_key])
+    if cache_key in cached:
+        return cached[cache_key]
+    model = model or get_genai().GenerativeModel(SCORING_MODEL)
     prompt = f"""
 Given the following job description details and a candidate's resume, score how well the candidate matches each section on a scale from 0 to 10 (0 = no match, 10 = perfect match). Give only numbers and a short reason.
 
@@ -64,83 +152,977 @@ Return the result in JSON like this:
   "reason": "Short summary why"
 }}
 """
-    response = model.generate_content(prompt)
-    text_response = response.text
+    LLM_CALLS.inc("scoring")
     try:
-        result = json.loads(text_response)
+        with stage_timer("llm_scoring"):
+            response = model.generate_content(prompt)
+        text_response = response.text
+        record_llm_call("scoring", prompt, response, text_response)
+        try:
+            result = json.loads(text_response)
+        except Exception:
+            import re
+            match = re.search(r'\{.*\}', text_response, re.DOTALL)
+            if match:
+                result = json.loads(match.group(0))
+            else:
+                raise ValueError("Could not parse Gemini output as JSON.")
     except Exception:
-        import re
-        match = re.search(r'\{.*\}', text_response, re.DOTALL)
-        if match:
-            result = json.loads(match.group(0))
-        else:
-            raise ValueError("Could not parse Gemini output as JSON.")
+        LLM_FAILURES.inc("scoring")
+        raise
+    _store_scores({cache_key: result})
     return result
 
 
+def score_resumes_batch_with_gemini_flash(jd_category, jd_requirements, jd_qualifications, resumes, model=None):
+    """
+    Scores several resumes against the JD sections in a single request.
+    `resumes` is a list of (resume_id, resume_text). Returns {resume_id: result} for every
+    entry the model answered; raises ValueError when the response is not a usable JSON array.
+    Resumes already in the score cache are answered from it and left out of the prompt.
+    """
+    model_name = _model_name(model)
+    keys = {
+        resume_id: score_cache_key(jd_category, jd_requirements, jd_qualifications, resume_text, model_name)
+        for resume_id, resume_text in resumes
+    }
+    cached = _cached_scores(list(keys.values()))
+    hits = {resume_id: cached[key] for resume_id, key in keys.items() if key in cached}
+    resumes = [(resume_id, resume_text) for resume_id, resume_text in resumes if resume_id not in hits]
+    if not resumes:
+        return hits
+    model = model or get_genai().GenerativeModel(SCORING_MODEL)
+    resume_blocks = "\n\n".join(
+        f"### Resume id: {resume_id}\n{resume_text}" for resume_id, resume_text in resumes
+    )
+    prompt = f"""
+Given the following job description details and several candidate resumes, score how well each candidate matches each section on a scale from 0 to 10 (0 = no match, 10 = perfect match). Give only numbers and a short reason.
+
+Job Category:
+{jd_category}
+
+Job Requirements:
+{jd_requirements}
+
+Job Qualifications:
+{jd_qualifications}
+
+Resumes:
+{resume_blocks}
+
+Return ONLY a JSON array with exactly one object per resume, using the resume id given above:
+[
+  {{
+    "resume_id": "id",
+    "category_score": number,
+    "requirements_score": number,
+    "qualifications_score": number,
+    "final_score": number,
+    "reason": "Short summary why"
+  }}
+]
+"""
+    LLM_CALLS.inc("scoring_batch")
+    try:
+        with stage_timer("llm_scoring_batch"):
+            response = model.generate_content(prompt)
+        text_response = response.text
+        record_llm_call("scoring_batch", prompt, response, text_response)
+        try:
+            parsed = json.loads(text_response)
+        except Exception:
+            import re
+            match = re.search(r'\[.*\]', text_response, re.DOTALL)
+            if not match:
+                raise ValueError("Could not parse Gemini batch output as a JSON array.")
+            parsed = json.loads(match.group(0))
+        if not isinstance(parsed, list):
+            raise ValueError("Gemini batch output is not a JSON array.")
+        wanted = {resume_id for resume_id, _ in resumes}
+        results = {}
+        for item in parsed:
+            if isinstance(item, dict) and str(item.get("resume_id")) in wanted:
+                results[str(item["resume_id"])] = item
+        if not results:
+            raise ValueError("Gemini batch output contained none of the requested resume ids.")
+    except Exception:
+        LLM_FAILURES.inc("scoring_batch")
+        raise
+    _store_scores({keys[resume_id]: result for resume_id, result in results.items()})
+    results.update(hits)
+    return results
+
+
+def score_resume_batch_with_retry(jd_category, jd_requirements, jd_qualifications, resumes, model=None):
+    """
+    Batch scoring with automatic split-and-retry. When a batch response fails to parse, the batch
+    is halved and each half retried; resumes the model skipped are retried on their own, and a
+    single resume falls back to score_resume_with_gemini_flash.
+    Returns {resume_id: result or Exception}, so one bad resume never fails its neighbours.
+    """
+    if len(resumes) == 1:
+        resume_id, resume_text = resumes[0]
+        try:
+            return {resume_id: score_resume_with_gemini_flash(
+                jd_category, jd_requirements, jd_qualifications, resume_text, model=model
+            )}
+        except Exception as e:
+            return {resume_id: e}
+
+    try:
+        outcomes = score_resumes_batch_with_gemini_flash(
+            jd_category, jd_requirements, jd_qualifications, resumes, model=model
+        )
+    except Exception as e:
+        logger.warning(f"Batch of {len(resumes)} resumes failed ({e}); splitting and retrying")
+        mid = len(resumes) // 2
+        outcomes = score_resume_batch_with_retry(
+            jd_category, jd_requirements, jd_qualifications, resumes[:mid], model=model
+        )
+        outcomes.update(score_resume_batch_with_retry(
+            jd_category, jd_requirements, jd_qualifications, resumes[mid:], model=model
+        ))
+        return outcomes
+
+    missing = [r for r in resumes if r[0] not in outcomes]
+    if missing:
+        outcomes.update(score_resume_batch_with_retry(
+            jd_category, jd_requirements, jd_qualifications, missing, model=model
+        ))
+    return outcomes
+
+
+def pack_resume_batches(resumes, token_budget: int, max_batch_size: int):
+    """
+    Groups an iterable of (key, resume_id, resume_text) into lists whose combined resume text stays
+    within token_budget and whose length is at most max_batch_size. An oversized resume gets its own batch.
+    """
+    batch, batch_tokens = [], 0
+    for item in resumes:
+        tokens = estimate_tokens(item[2])
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_batch_size):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def resume_batch_id(resume_path: str) -> str:
+    """Stable short id for a resume inside batched prompts."""
+    return hashlib.sha1(resume_path.encode("utf-8")).hexdigest()[:10]
+
+
+def _ingest_resume(abs_path: str) -> ResumeArtifact:
+    """Ingestion stage for one resume, inline: read the PDF, extract its text and candidate details."""
+    with open(abs_path, 'rb') as f:
+        pdf_bytes = f.read()
+    text = read_pdf_content(pdf_bytes)
+    info = extract_candidate_details(text)  # Should return dict with 'experience', 'projects', 'skills', etc
+    return ResumeArtifact(abs_path, content_hash(pdf_bytes), text, info)
+
+
+def _parse_resume(abs_path: str) -> ResumeArtifact:
+    """
+    The CPU-bound half of ingestion, run in an ingestion worker process: PDF text and the regex
+    pass over it. It must stay a picklable top-level function and never touch the Gemini client;
+    the fields regex could not find (artifact.missing_fields) are filled in the parent. The stage
+    metrics and 'logs' rows travel back on the artifact (metrics, log_rows), since the worker's
+    counters and LogSink are its own.
+    """
+    registry = get_metrics_registry()
+    metrics_before = registry.snapshot()
+    with hold_logs() as log_rows:
+        with open(abs_path, 'rb') as f:
+            pdf_bytes = f.read()
+        text = read_pdf_content(pdf_bytes)
+        info, missing_fields = extract_regex_details(text)
+    artifact = ResumeArtifact(abs_path, content_hash(pdf_bytes), text, info)
+    artifact.missing_fields = missing_fields
+    artifact.metrics = registry.since(metrics_before)
+    artifact.log_rows = log_rows
+    return artifact
+
+
+def _complete_details(artifact: ResumeArtifact) -> ResumeArtifact:
+    artifact.details = fill_missing_details(artifact.text, artifact.details, artifact.missing_fields)
+    artifact.missing_fields = []
+    return artifact
+
+
+def _init_ingest_worker(overrides: dict):
+    # Settings changed at runtime (tests, benchmarks) do not survive a fresh interpreter
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+_ingest_pool = None
+_ingest_pool_key = None
+_ingest_pool_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_ingest_pool_lock")
+def get_ingest_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    This process's long-lived ingestion pool (created on first use, and again when the size
+    changes, after a fork or when a worker died). Workers are started by a forkserver (spawn
+    where that is unavailable), never forked from the server itself, so they inherit none of its
+    threads, held locks, gRPC channels or indexes. They get a copy of the current settings.
+    """
+    global _ingest_pool, _ingest_pool_key
+    key = (os.getpid(), workers)
+    with _ingest_pool_lock:
+        if _ingest_pool is None or _ingest_pool_key != key:
+            if _ingest_pool is not None and _ingest_pool_key[0] == os.getpid():
+                _ingest_pool.shutdown(wait=False, cancel_futures=True)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            overrides = {name: getattr(settings, name) for name in dir(settings) if name.isupper()}
+            _ingest_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                               initializer=_init_ingest_worker, initargs=(overrides,))
+            _ingest_pool_key = key
+        return _ingest_pool
+
+
+def _discard_ingest_pool(pool: ProcessPoolExecutor):
+    global _ingest_pool
+    with _ingest_pool_lock:
+        if _ingest_pool is pool:
+            _ingest_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_ingested_resumes(paths: list, workers: int = None):
+    """
+    Yields (abs_path, artifact, error) for each resume as soon as its ingestion finishes.
+    With workers > 1, PDF parsing and the regex pass fan out over the shared ingestion process
+    pool and the LLM extraction fallback runs on up to `workers` threads here; otherwise
+    everything runs inline.
+    """
+    if workers is None:
+        workers = settings.RESUME_INGEST_WORKERS
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        for path in paths:
+            try:
+                yield path, _ingest_resume(path), None
+            except Exception as e:
+                yield path, None, e
+        return
+
+    pool = get_ingest_pool(workers)
+    extractor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-extract")
+    parsing = {pool.submit(_parse_resume, path): path for path in paths}
+    filling = {}
+    try:
+        while parsing or filling:
+            done, _ = wait(list(parsing) + list(filling), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in filling:
+                    path = filling.pop(future)
+                    try:
+                        yield path, future.result(), None
+                    except Exception as e:
+                        yield path, None, e
+                    continue
+                path = parsing.pop(future)
+                try:
+                    artifact = future.result()
+                except BrokenProcessPool as e:
+                    _discard_ingest_pool(pool)  # a worker died; the next request gets a fresh pool
+                    yield path, None, e
+                    continue
+                except Exception as e:
+                    yield path, None, e
+                    continue
+                # counted in the worker process
+                get_metrics_registry().merge(artifact.metrics)
+                replay_logs(artifact.log_rows)
+                if artifact.missing_fields:
+                    filling[extractor.submit(_complete_details, artifact)] = path
+                else:
+                    yield path, artifact, None
+    finally:
+        # Don't keep parsing or calling the LLM if the consumer stopped early; the pool stays up
+        for future in parsing:
+            future.cancel()
+        extractor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_resume_scoring_text(info: dict, resume_text: str = "") -> str:
+    """
+    Text sent to the scorer. Uses the section-structured rendering when extraction segmented the
+    resume (see utils.resume_sections), keeping the most useful sections within
+    PROMPT_BUDGET_SCORING_TOKENS; otherwise concatenates all main resume sections.
+    """
+    if "sections" in info:
+        sections = info["sections"]
+        if sections:
+            sections = fit_sections(sections, settings.PROMPT_BUDGET_SCORING_TOKENS,
+                                    max_section_chars=settings.SCORING_SECTION_MAX_CHARS)
+        return render_sections(sections, fallback_text=resume_text,
+                               max_section_chars=settings.SCORING_SECTION_MAX_CHARS)
+    return " ".join([
+        normalize_section(info.get("experience", "")),
+        normalize_section(info.get("projects", "")),
+        normalize_section(info.get("skills", "")),
+        normalize_section(info.get("summary", "")),
+        normalize_section(info.get("education", "")),
+        normalize_section(info.get("certifications", "")),
+        normalize_section(info.get("other", "")),
+    ]).strip()
+
+
+def get_scoring_engine(score_fn=None, max_concurrency: int = None, requests_per_minute: float = None) -> ScoringEngine:
+    """Builds a ScoringEngine using the configured concurrency limit and provider quota."""
+    return ScoringEngine(
+        score_fn or score_resume_with_gemini_flash,
+        max_concurrency=max_concurrency or settings.SCORING_MAX_CONCURRENCY,
+        requests_per_minute=(requests_per_minute if requests_per_minute is not None
+                             else settings.SCORING_REQUESTS_PER_MINUTE),
+    )
+
+
+def list_resume_files(folder_path: str) -> list:
+    """Absolute paths of the PDFs in resumes/<folder_path>."""
+    import glob
+    resume_dir = os.path.abspath(os.path.join(os.getcwd(), "resumes", folder_path))
+    return [os.path.abspath(p) for p in glob.glob(os.path.join(resume_dir, "*.pdf"))]
+
+
+def score_resume_artifacts_in_folder(
+        folder_path: str,
+        jd_category: str,
+        jd_qualifications: str,
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None,
+        on_result=None
+    ) -> list:
+    """
+    Parses and scores every resume in the folder once, returning the scored ResumeArtifacts
+    sorted by final_score. See score_resume_artifacts.
+    """
+    return score_resume_artifacts(
+        list_resume_files(folder_path), jd_category, jd_qualifications, jd_requirements,
+        ingest_workers=ingest_workers, engine=engine, batch_size=batch_size, on_result=on_result
+    )
+
+
+def score_resume_artifacts(
+        pdf_files: list,
+        jd_category: str,
+        jd_qualifications: str,
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None,
+        on_result=None
+    ) -> list:
+    """
+    Parses and scores the given resume PDFs once, returning the scored ResumeArtifacts sorted by
+    final_score. See iter_scored_resumes.
+    When given, on_result(path, result, error) is called as each resume finishes, with its
+    result dict or the exception that stopped it (used for job progress).
+    """
+    scored = []
+    for abs_path, artifact, error in iter_scored_resumes(
+            pdf_files, jd_category, jd_qualifications, jd_requirements,
+            ingest_workers=ingest_workers, engine=engine, batch_size=batch_size):
+        if error is None:
+            scored.append(artifact)
+        if on_result is not None:
+            on_result(abs_path, artifact.to_result() if error is None else None, error)
+    scored.sort(key=lambda a: a.score.get('final_score') if a.score.get('final_score') is not None else 0, reverse=True)
+    return scored
+
+
+def iter_scored_resumes(
+        pdf_files: list,
+        jd_category: str,
+        jd_qualifications: str,
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None
+    ):
+    """
+    Generator behind every scoring entry point. Yields (abs_path, artifact, error) for each resume
+    as soon as it is scored (or fails), in completion order, so the first result never waits for
+    the rest of the folder. Resumes are parsed in parallel (see iter_ingested_resumes) and scored
+    concurrently by a ScoringEngine as they become available. With batch_size > 1 several
+    resumes share one request (see score_resume_batch_with_retry), bounded by
+    SCORING_BATCH_TOKEN_BUDGET. Closing the generator early stops ingestion and scoring.
+    """
+    artifacts = {}
+    failed_ingest = []
+    batch_size = batch_size or settings.SCORING_BATCH_SIZE
+    batched = batch_size > 1
+    engine = engine or get_scoring_engine(score_resume_batch_with_retry if batched else None)
+    jd_kwargs = {
+        "jd_category": jd_category,
+        "jd_requirements": jd_requirements,
+        "jd_qualifications": jd_qualifications,
+    }
+
+    def ingested():
+        for abs_path, artifact, error in iter_ingested_resumes(pdf_files, workers=ingest_workers):
+            if error is not None:
+                failed_ingest.append((abs_path, None, error))
+                continue
+            artifacts[abs_path] = artifact
+            yield abs_path, resume_batch_id(abs_path), build_resume_scoring_text(artifact.details, artifact.text)
+
+    def scoring_tasks():
+        if not batched:
+            for abs_path, _, resume_text in ingested():
+                yield abs_path, dict(jd_kwargs, resume_text=resume_text)
+            return
+        for batch in pack_resume_batches(ingested(), settings.SCORING_BATCH_TOKEN_BUDGET, batch_size):
+            yield batch, dict(jd_kwargs, resumes=[(resume_id, text) for _, resume_id, text in batch])
+
+    def per_resume_outcomes():
+        # Closed explicitly so a consumer that stops early (a disconnected stream) cancels the
+        # queued scoring calls and the ingestion pool right away
+        runs = engine.run(scoring_tasks())
+        try:
+            for key, outcome, error in runs:
+                # Ingestion failures are collected while the engine pulls tasks; report them as they surface
+                while failed_ingest:
+                    yield failed_ingest.pop(0)
+                if not batched:
+                    yield key, outcome, error
+                    continue
+                for abs_path, resume_id, _ in key:
+                    result = error or outcome.get(resume_id) or ValueError("No score returned")
+                    if isinstance(result, Exception):
+                        yield abs_path, None, result
+                    else:
+                        yield abs_path, result, None
+        finally:
+            runs.close()
+        while failed_ingest:
+            yield failed_ingest.pop(0)
+
+    outcomes = per_resume_outcomes()
+    try:
+        for abs_path, gemini_result, error in outcomes:
+            if error is not None:
+                logger.error(f"Failed to process resume '{abs_path}': {error}")
+                save_log("ERROR", f"Resume load error: {error}", process="JD_Analysis")
+                yield abs_path, None, error
+                continue
+            artifact = artifacts.pop(abs_path)
+            artifact.score = gemini_result
+            yield abs_path, artifact, None
+    finally:
+        outcomes.close()
+    cache_stats = get_score_cache_stats()
+    if cache_stats:
+        logger.info(f"Score cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.0%} hit rate), {cache_stats['entries']} entries")
+    usage = get_llm_usage().stats()["total"]
+    logger.info(f"LLM usage so far: {usage['calls']} calls, ~{usage['input_tokens']} input / "
+                f"~{usage['output_tokens']} output tokens")
+
+
 def score_all_resumes_in_folder(
         jd_text: str,
         folder_path: str,
         jd_category: str,
         jd_qualifications: str,
-        jd_requirements: str
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None
     ) -> list:
     """
     Scores all resumes in the given folder against the JD components using Gemini 1.5 Flash via Vertex AI.
+    Returns result dicts sorted by final_score; see score_resume_artifacts_in_folder.
     """
-    import glob
-    results = []
-    resume_dir = os.path.abspath(os.path.join(os.getcwd(), "resumes", folder_path))
-    pdf_files = glob.glob(os.path.join(resume_dir, "*.pdf"))
-    for path in pdf_files:
-        abs_path = os.path.abspath(path)
+    artifacts = score_resume_artifacts_in_folder(
+        folder_path, jd_category, jd_qualifications, jd_requirements,
+        ingest_workers=ingest_workers, engine=engine, batch_size=batch_size
+    )
+    return [a.to_result() for a in artifacts]
+
+
+def iter_score_all_resumes_in_folder(
+        jd_text: str,
+        folder_path: str,
+        jd_category: str,
+        jd_qualifications: str,
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None
+    ):
+    """
+    Generator version of score_all_resumes_in_folder: yields each resume's result dict as soon
+    as it is scored, in completion order (unsorted). Failed resumes are logged and skipped.
+    """
+    for _, artifact, error in iter_scored_resumes(
+            list_resume_files(folder_path), jd_category, jd_qualifications, jd_requirements,
+            ingest_workers=ingest_workers, engine=engine, batch_size=batch_size):
+        if error is None:
+            yield artifact.to_result()
+
+
+def rank_results(results: list) -> list:
+    """Sorts /recommended result dicts by final_score, highest first (unscored last)."""
+    return sorted(
+        results,
+        key=lambda r: float(r["final_score"]) if r.get("final_score") is not None else 0.0,
+        reverse=True,
+    )
+
+
+# Added by migrations/: the resume's content hash and the score_version() of each jd_score row
+TRACKING_COLUMNS = ("resume_hash", "score_version")
+
+_tracking_columns = None
+def jd_score_tracking_columns(cursor) -> tuple:
+    """
+    Which of TRACKING_COLUMNS jd_score has (see migrations/); incremental scoring needs all of
+    them, otherwise every resume is scored as before. Checked once per process.
+    """
+    global _tracking_columns
+    if _tracking_columns is None:
+        cursor.execute("""
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jd_score'
+              AND COLUMN_NAME IN ('resume_hash', 'score_version')
+        """)
+        present = {row[0] for row in cursor.fetchall()}
+        _tracking_columns = tuple(c for c in TRACKING_COLUMNS if c in present)
+        missing = [c for c in TRACKING_COLUMNS if c not in present]
+        if missing:
+            logger.warning(f"jd_score is missing {', '.join(missing)} (see migrations/); incremental scoring disabled")
+    return _tracking_columns
+
+
+def load_stored_scores(jd_id) -> dict:
+    """
+    Previous /recommended results for a JD that carry the hash of the resume they were scored
+    from and were produced by the current score_version(), as {resume_hash: result dict}.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if jd_score_tracking_columns(cursor) != TRACKING_COLUMNS:
+            return {}
+        cursor.execute("""
+            SELECT s.resume_hash, c.candidate_email, c.candidate_name, s.category_score,
+                   s.requirements_score, s.qualifications_score, s.final_score, s.reason
+            FROM jd_score s
+            JOIN candidate c ON c.candidate_id = s.candidate_id
+            WHERE s.jd_id = %s AND s.resume_hash IS NOT NULL AND s.score_version = %s
+        """, (jd_id, score_version()))
+        stored = {}
+        for resume_hash, email, name, category, requirements, qualifications, final, reason in cursor.fetchall():
+            stored[resume_hash] = {
+                'candidate_email': email,
+                'candidate_name': name or email,
+                'category_score': float(category) if category is not None else None,
+                'requirements_score': float(requirements) if requirements is not None else None,
+                'qualifications_score': float(qualifications) if qualifications is not None else None,
+                'final_score': float(final) if final is not None else None,
+                'reason': reason,
+            }
+        return stored
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _file_content_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def plan_incremental_scoring(jd_id, paths: list):
+    """
+    Splits the resume paths into those unchanged since they were last scored for this JD with
+    the current model and prompt (matched to stored jd_score rows by content hash and
+    score_version) and those that still need scoring.
+    Returns (reused, pending): stored result dicts pointed at their current path, and the paths
+    to score. Unreadable files go to pending, where the scoring pass logs them.
+    """
+    stored = load_stored_scores(jd_id)
+    reused, pending = [], []
+    for path in paths:
         try:
-            with open(abs_path, 'rb') as f:
-                pdf_bytes = f.read()
-            text = read_pdf_content(pdf_bytes)
-            info = extract_candidate_details(text)  # Should return dict with 'experience', 'projects', 'skills', etc
-
-            # Concatenate all main sections for full resume text
-            full_resume_text = " ".join([
-                normalize_section(info.get("experience", "")),
-                normalize_section(info.get("projects", "")),
-                normalize_section(info.get("skills", "")),
-                normalize_section(info.get("summary", "")),
-                normalize_section(info.get("education", "")),
-                normalize_section(info.get("certifications", "")),
-                normalize_section(info.get("other", "")),
-            ]).strip()
-
-            gemini_result = score_resume_with_gemini_flash(
-                jd_category=jd_category,
-                jd_requirements=jd_requirements,
-                jd_qualifications=jd_qualifications,
-                resume_text=full_resume_text
-            )
-
-            results.append({
-                'candidate_email': info.get('email'),
-                'candidate_name': info.get('name') or info.get('email'),
-                'resume_path': abs_path,
-                'resume_filename': os.path.basename(abs_path),
-                'category_score': gemini_result.get('category_score'),
-                'requirements_score': gemini_result.get('requirements_score'),
-                'qualifications_score': gemini_result.get('qualifications_score'),
-                'final_score': gemini_result.get('final_score'),
-                'reason': gemini_result.get('reason')
-            })
-
-            conn = get_connection()
-            cursor = conn.cursor(dictionary=True)
-           
-        except Exception as e:
-            logger.error(f"Failed to process resume '{abs_path}': {e}")
-            save_log("ERROR", f"Resume load error: {e}", process="JD_Analysis")
-    results.sort(key=lambda x: x['final_score'] if x['final_score'] is not None else 0, reverse=True)
-    return results
+            resume_hash = _file_content_hash(path) if stored else None
+        except OSError:
+            resume_hash = None
+        if resume_hash in stored:
+            reused.append(dict(stored.pop(resume_hash),
+                               resume_path=path, resume_filename=os.path.basename(path)))
+        else:
+            pending.append(path)
+    logger.info(f"Incremental scoring for jd_id={jd_id}: {len(reused)} unchanged, {len(pending)} to score")
+    return reused, pending
+
+
+def score_folder_incrementally(
+        jd_id,
+        folder_path: str,
+        jd_category: str,
+        jd_qualifications: str,
+        jd_requirements: str,
+        ingest_workers: int = None,
+        engine: ScoringEngine = None,
+        batch_size: int = None,
+        on_result=None
+    ):
+    """
+    Scores only the resumes in the folder that are new or changed since they were last scored
+    for this JD (see plan_incremental_scoring).
+    Returns (artifacts, reused): the freshly scored ResumeArtifacts and the stored result dicts
+    of unchanged resumes. on_result is reported for reused and scored resumes alike.
+    """
+    reused, pending = plan_incremental_scoring(jd_id, list_resume_files(folder_path))
+    if on_result is not None:
+        for result in reused:
+            on_result(result["resume_path"], result, None)
+    artifacts = score_resume_artifacts(
+        pending, jd_category, jd_qualifications, jd_requirements,
+        ingest_workers=ingest_workers, engine=engine, batch_size=batch_size, on_result=on_result
+    )
+    return artifacts, reused
+
+
+def load_job_description(jd_id):
+    """Returns the job_description row (jd_text, category_detected, qualifications, requirements) or None."""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT jd_text, category_detected, qualifications, requirements
+            FROM job_description
+            WHERE jd_id = %s
+        """, (jd_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _needs_indexing(idx, path: str) -> bool:
+    """True for an unindexed resume under the resumes directory the index has not tried in its current state."""
+    path = os.path.abspath(path)
+    if not path.startswith(RESUMES_DIR + os.sep):
+        return False
+    try:
+        return not idx.attempted(os.path.relpath(path, RESUMES_DIR), os.stat(path))
+    except OSError:
+        return False
+
+
+def retrieve_resume_candidates(jd_text: str, paths: list, top_k: int = None, min_similarity: float = None):
+    """
+    First stage of two-stage scoring: keeps the top_k resumes among `paths` by cosine similarity
+    of their index embedding to the JD (and only those scoring at least min_similarity).
+    Resumes the index does not know yet are always kept, so nothing is dropped unseen; if the
+    index or the JD embedding is unavailable every resume is kept.
+    Returns (kept_paths, stats) with stats {"top_k", "min_similarity", "candidates", "retrieved",
+    "unindexed", "pruned"}; similarities are in stats["similarity"] as {path: score}.
+    """
+    stats = {"top_k": top_k, "min_similarity": min_similarity, "candidates": len(paths),
+             "retrieved": 0, "unindexed": 0, "pruned": 0, "similarity": {}}
+    if not paths or (not top_k and min_similarity is None):
+        return paths, stats
+    from utils.embeddings import embed_text, get_resume_index, reload_resume_index  # numpy/faiss on first use
+    idx = get_resume_index()
+    if idx is None or idx.index.ntotal == 0:
+        logger.warning("Resume index unavailable; scoring every resume")
+        return paths, stats
+    try:
+        vec = embed_text(jd_text)
+    except Exception as e:
+        logger.warning(f"JD embedding failed ({e}); scoring every resume")
+        return paths, stats
+    hits, unindexed = idx.search_within(vec, paths, top_k or len(paths), min_score=min_similarity)
+    added = [p for p in unindexed if _needs_indexing(idx, p)]
+    if added:
+        # Resumes added under resumes/ (e.g. a new folder) the index has not seen: embed just
+        # those into the shared index instead of scoring them all unfiltered (on failure the
+        # index is left as it was and they are kept unfiltered, without a retry on every request)
+        idx = reload_resume_index(added)
+        if idx is not None and idx.index.ntotal:
+            hits, unindexed = idx.search_within(vec, paths, top_k or len(paths), min_score=min_similarity)
+    kept = [path for path, _ in hits] + unindexed
+    stats.update(retrieved=len(hits), unindexed=len(unindexed), pruned=len(paths) - len(kept),
+                 similarity=dict(hits))
+    logger.info(f"Retrieval kept {len(hits)} of {len(paths)} resumes ({len(unindexed)} unindexed kept too)")
+    return kept, stats
+
+
+def jd_query_terms(requirements, qualifications) -> list:
+    """
+    BM25 query terms from the JD's requirements and qualifications, split by the same tokenizer
+    the lexical index uses for resumes (so "Node.js" or "ASP.NET" stay whole on both sides).
+    """
+    return tokenize(normalize_section(requirements)) + tokenize(normalize_section(qualifications))
+
+
+def lexical_prefilter(requirements, qualifications, paths: list, top_k: int = None):
+    """
+    Optional zero-cost first stage: keeps the top_k resumes among `paths` by BM25 score against
+    the JD's requirement and qualification keywords (utils.lexical_index), without any API call.
+    Resumes matching none of the keywords are pruned, unless none match at all; resumes the
+    index cannot read are always kept.
+    Returns (kept_paths, stats) with stats {"top_k", "terms", "candidates", "matched",
+    "unindexed", "pruned"}; scores are in stats["bm25"] as {path: score}.
+    """
+    stats = {"top_k": top_k, "terms": 0, "candidates": len(paths), "matched": 0,
+             "unindexed": 0, "pruned": 0, "bm25": {}}
+    terms = jd_query_terms(requirements, qualifications)
+    stats["terms"] = len(set(terms))
+    if not paths or not top_k or not terms:
+        return paths, stats
+    try:
+        hits, unindexed = get_lexical_index(paths).search(terms, top_k, paths=paths)
+    except Exception as e:
+        logger.warning(f"Lexical prefilter failed ({e}); keeping every resume")
+        return paths, stats
+    if not hits:
+        return paths, stats
+    kept = [path for path, _ in hits] + unindexed
+    stats.update(matched=len(hits), unindexed=len(unindexed), pruned=len(paths) - len(kept), bm25=dict(hits))
+    logger.info(f"Lexical prefilter kept {len(hits)} of {len(paths)} resumes ({len(unindexed)} unindexed kept too)")
+    return kept, stats
+
 
+def rank_folder_lexically(jd_id, resume_folder: str, top_k: int = None) -> dict:
+    """
+    Ranks the folder's resumes by BM25 against the JD's requirement and qualification keywords.
+    Local only (no LLM or embedding calls), so it answers even when the API quota is exhausted.
+    Returns the /recommended/lexical response body; raises LookupError when the JD does not exist.
+    """
+    row = load_job_description(jd_id)
+    if not row:
+        raise LookupError(f"Job description {jd_id} not found")
+    terms = jd_query_terms(row.get('requirements'), row.get('qualifications'))
+    paths = list_resume_files(resume_folder)
+    idx = get_lexical_index(paths)
+    hits, unindexed = idx.search(terms, top_k, paths=paths)
+    results = [{
+        "resume_path": path,
+        "resume_filename": os.path.basename(path),
+        "bm25_score": round(score, 4),
+        "matched_terms": idx.matched_terms(path, terms),
+    } for path, score in hits]
+    return {
+        "job_id": jd_id,
+        "resume_folder": resume_folder,
+        "terms": list(dict.fromkeys(terms)),
+        "results": results,
+        "count": len(results),
+        "candidates": len(paths),
+        "unindexed": [os.path.basename(p) for p in unindexed],
+    }
+
+
+def _annotate(result: dict, similarity: dict, bm25: dict) -> dict:
+    """Adds the resume's retrieval scores (embedding similarity, BM25) to a result dict."""
+    path = result["resume_path"]
+    if path in similarity:
+        result["similarity"] = similarity[path]
+    if path in bm25:
+        result["bm25_score"] = round(bm25[path], 4)
+    return result
 
 
+def iter_recommendation(jd_id, resume_folder: str, incremental: bool = True,
+                        top_k: int = None, min_similarity: float = None, lexical_top_k: int = None):
+    """
+    The whole /recommended pipeline for one JD and folder as a stream of (event, data) pairs:
+      ("start", {...})    once, right away, with how many resumes are in the folder
+      ("stage", {...})    as each planning stage finishes: lexical_prefilter, retrieval and
+                          incremental (resumes kept and pruned, or reused and to be scored)
+      ("plan", {...})     once planning is done, with how many resumes the run reports on and
+                          how many will be scored
+      ("result", dict)    per resume as soon as it is scored (stored results of unchanged resumes first)
+      ("error", {...})    per resume that could not be scored
+      ("summary", dict)   last, after the fresh scores are persisted: the ranked /recommended body
+    Incremental mode (default) only scores resumes that are new or changed since the last run
+    for this JD. With top_k and/or min_similarity (defaults RETRIEVAL_TOP_K,
+    RETRIEVAL_MIN_SIMILARITY) only the resumes retrieve_resume_candidates keeps are considered;
+    with lexical_top_k (default LEXICAL_PREFILTER_TOP_K) lexical_prefilter narrows the folder
+    before that. Resumes either stage drops are reported as pruned. Raises LookupError, before
+    the first event, when the JD does not exist.
+    """
+    row = load_job_description(jd_id)
+    if not row:
+        raise LookupError(f"Job description {jd_id} not found")
+    category = row.get('category_detected', '') or ''
+    qualifications = row.get('qualifications', '') or ''
+    requirements = row.get('requirements', '') or ''
+    files = list_resume_files(resume_folder)
+    # Planning can take a while on a big folder (index refreshes, embeddings), so report it
+    yield "start", {"job_id": jd_id, "resume_folder": resume_folder, "total": len(files)}
+
+    with stage_timer("lexical_prefilter"):
+        paths, lexical = lexical_prefilter(
+            requirements, qualifications, files,
+            top_k=lexical_top_k if lexical_top_k is not None else settings.LEXICAL_PREFILTER_TOP_K,
+        )
+    yield "stage", {"stage": "lexical_prefilter", "kept": len(paths), "pruned": lexical["pruned"]}
+    with stage_timer("retrieval"):
+        paths, retrieval = retrieve_resume_candidates(
+            row.get('jd_text') or '', paths,
+            top_k=top_k if top_k is not None else settings.RETRIEVAL_TOP_K,
+            min_similarity=min_similarity if min_similarity is not None else settings.RETRIEVAL_MIN_SIMILARITY,
+        )
+    yield "stage", {"stage": "retrieval", "kept": len(paths), "pruned": retrieval["pruned"]}
+    similarity = retrieval.pop("similarity")
+    bm25 = lexical.pop("bm25")
+    retrieval["lexical"] = lexical
+    retrieval["pruned"] += lexical["pruned"]
+    if incremental:
+        reused, pending = plan_incremental_scoring(jd_id, paths)
+        yield "stage", {"stage": "incremental", "reused": len(reused), "to_score": len(pending)}
+    else:
+        reused, pending = [], paths
+    yield "plan", {
+        "job_id": jd_id,
+        "resume_folder": resume_folder,
+        "total": len(reused) + len(pending),
+        "to_score": len(pending),
+        "pruned": retrieval["pruned"],
+        "retrieval": retrieval,
+    }
+    for result in reused:
+        yield "result", _annotate(result, similarity, bm25)
+
+    # Each resume is parsed and extracted once; persistence reuses the same artifacts
+    artifacts = []
+    outcomes = iter_scored_resumes(pending, category, qualifications, requirements)
+    try:
+        for abs_path, artifact, error in outcomes:
+            if error is not None:
+                STAGE_ERRORS.inc("resume")
+                yield "error", {"resume_path": abs_path, "resume_filename": os.path.basename(abs_path), "error": str(error)}
+                continue
+            artifacts.append(artifact)
+            yield "result", _annotate(artifact.to_result(), similarity, bm25)
+    finally:
+        # If our consumer went away, stop ingestion and scoring now rather than at garbage collection
+        outcomes.close()
+
+    scored = [a.to_result() for a in artifacts]
+    with stage_timer("persist"):
+        persist_recommendations(jd_id, scored, {a.path: a.details for a in artifacts},
+                                {a.path: a.content_hash for a in artifacts})
+    for result in scored:
+        _annotate(result, similarity, bm25)
+    recommendations = rank_results(scored + reused)
+    save_log("INFO", f"Completed embedding recommendation for jd_id={jd_id}", process="Score_Recommendation")
+    fit_summaries = [r.get('fit_summary', '') for r in recommendations if 'fit_summary' in r][:3]
+    summary = " | ".join(fit_summaries) if fit_summaries else "No resumes scored for this job description."
+    yield "summary", {
+        "job_id": jd_id,
+        "resume_folder": resume_folder,
+        "results": recommendations,
+        "count": len(recommendations),
+        "rescored": len(scored),
+        "pruned": retrieval["pruned"],
+        "retrieval": retrieval,
+        "summary": summary
+    }
+
+
+def run_recommendation(jd_id, resume_folder: str, incremental: bool = True, on_result=None,
+                       top_k: int = None, min_similarity: float = None, on_start=None,
+                       lexical_top_k: int = None) -> dict:
+    """
+    Runs iter_recommendation to the end and returns the /recommended response body.
+    For job progress, on_start(data) receives the "start" event and again the "plan" event (the
+    final total and pruned count), and on_result(path, result, error) is called for every
+    resume event. Raises LookupError when the JD does not exist.
+    """
+    for event, data in iter_recommendation(jd_id, resume_folder, incremental=incremental,
+                                           top_k=top_k, min_similarity=min_similarity,
+                                           lexical_top_k=lexical_top_k):
+        if event == "summary":
+            return data
+        if on_start is not None and event in ("start", "plan"):
+            on_start(data)
+        if on_result is not None and event == "result":
+            on_result(data["resume_path"], data, None)
+        elif on_result is not None and event == "error":
+            on_result(data["resume_path"], None, data["error"])
+
+
+def persist_recommendations(jd_id, recommendations: list, candidates: dict, resume_hashes: dict = None) -> int:
+    """
+    Writes a /recommended result set in a single transaction: all candidates are upserted in bulk,
+    their ids resolved in one query, and all jd_score rows written with multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE statements.
+    `candidates` maps resume_path -> extracted candidate details (ResumeArtifact.details) and
+    `resume_hashes` maps resume_path -> content hash, stored with the score_version() so later
+    runs can skip the resume while neither it nor the scoring setup changed.
+    Returns the number of jd_score rows written.
+    """
+    if not recommendations:
+        return 0
+    resume_hashes = resume_hashes or {}
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        tracking = jd_score_tracking_columns(cursor)
+        version = score_version()
+        candidate_ids = upsert_candidates_bulk(cursor, [
+            (candidates[rec["resume_path"]], rec["resume_path"])
+            for rec in recommendations
+            if rec.get("candidate_email") and rec.get("resume_path") in candidates
+        ])
+        # Fallback: lookup by email for anything we could not upsert
+        unresolved = [
+            rec.get("candidate_email") for rec in recommendations
+            if rec.get("candidate_email") and rec["candidate_email"].lower().strip() not in candidate_ids
+        ]
+        if unresolved:
+            candidate_ids.update(lookup_candidate_ids(cursor, unresolved))
+
+        rows = [(
+            jd_id,
+            candidate_ids.get((rec.get("candidate_email") or "").lower().strip()),
+            rec.get("category_score"),
+            rec.get("qualifications_score"),
+            rec.get("requirements_score"),
+            rec.get("final_score"),
+            rec.get("reason", ""),
+        ) + tuple(resume_hashes.get(rec.get("resume_path")) if column == "resume_hash" else version
+                  for column in tracking) for rec in recommendations]
+        extra_columns = "".join(f", {column}" for column in tracking)
+        extra_updates = "".join(f",\n                    {column}=VALUES({column})" for column in tracking)
+        row_placeholder = "(" + ", ".join(["%s"] * (7 + len(tracking))) + ")"
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            chunk = rows[start:start + BULK_CHUNK_SIZE]
+            placeholders = ", ".join([row_placeholder] * len(chunk))
+            cursor.execute(f"""
+                INSERT INTO jd_score (
+                    jd_id, candidate_id, category_score,
+                    qualifications_score, requirements_score, final_score, reason{extra_columns}
+                )
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE
+                    category_score=VALUES(category_score),
+                    qualifications_score=VALUES(qualifications_score),
+                    requirements_score=VALUES(requirements_score),
+                    final_score=VALUES(final_score),
+                    reason=VALUES(reason){extra_updates}
+            """, [v for row in chunk for v in row])
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
 
 def recommend_resumes_by_embedding(jd_text: str, top_k: int = 5) -> list:
@@ -154,6 +1136,7 @@ def recommend_resumes_by_embedding(jd_text: str, top_k: int = 5) -> list:
          'score': float
        }, ...]
     """
+    from utils.embeddings import embed_text, get_resume_index
     try:
         # Embed the JD text
         vec = embed_text(jd_text)
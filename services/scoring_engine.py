@@ -0,0 +1,90 @@
+# services/scoring_engine.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+    rate is tokens added per second; capacity is the largest burst allowed.
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Blocks until `tokens` are available, then consumes them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the tokens now (possibly going negative) so concurrent callers queue fairly
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class ScoringEngine:
+    """
+    Runs a blocking scoring function for many resumes concurrently on a thread pool.
+
+    At most max_concurrency calls are in flight; when requests_per_minute is set, calls are
+    additionally paced by a TokenBucket so the provider quota is never exceeded. Every task
+    is isolated: an exception is reported for that task only and never aborts the batch.
+    """
+    def __init__(self, score_fn, max_concurrency: int = 8, requests_per_minute: float = 0):
+        self.score_fn = score_fn
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate_limiter = TokenBucket(requests_per_minute / 60.0) if requests_per_minute else None
+
+    def _call(self, kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.score_fn(**kwargs)
+
+    def run(self, tasks):
+        """
+        tasks is an iterable (possibly a lazy generator) of (key, kwargs) pairs, drawn only as
+        capacity frees up: at most max_concurrency tasks are submitted at a time.
+        Yields (key, result, error) in completion order; error is None on success.
+        Closing the generator early (e.g. a streaming client disconnected) cancels the tasks not
+        started yet and returns without waiting for those in flight.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        pending = {}
+        try:
+            for key, kwargs in tasks:
+                if len(pending) >= self.max_concurrency:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._outcome(pending.pop(future), future)
+                pending[pool.submit(self._call, kwargs)] = key
+                # Hand back anything already finished while the producer is still going
+                for future in [f for f in pending if f.done()]:
+                    yield self._outcome(pending.pop(future), future)
+            for future in as_completed(list(pending)):
+                yield self._outcome(pending.pop(future), future)
+        finally:
+            pool.shutdown(wait=not pending, cancel_futures=True)
+            close = getattr(tasks, "close", None)
+            if close is not None:
+                close()  # stop a lazy producer (ingestion) too
+
+    @staticmethod
+    def _outcome(key, future):
+        try:
+            return key, future.result(), None
+        except Exception as e:
+            return key, None, e
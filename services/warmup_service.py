@@ -0,0 +1,135 @@
+# services/warmup_service.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+import time
+from config import settings
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+def _warm_imports():
+    import utils.embeddings  # numpy + faiss
+    from utils.genai_client import get_genai
+    get_genai()
+
+
+def _warm_category_index():
+    from utils.embeddings import get_category_index
+    if get_category_index() is None:
+        raise RuntimeError("category index unavailable")
+
+
+def _warm_resume_index():
+    from utils.embeddings import get_resume_index
+    if get_resume_index() is None:
+        raise RuntimeError("resume index unavailable")
+
+
+def _warm_lexical_index():
+    from utils.lexical_index import get_lexical_index
+    get_lexical_index()
+
+
+# Run in this order; each goes through the same get_x() a request would call, so a request that
+# arrives mid-build waits for the build in progress instead of starting its own
+STEPS = {
+    "imports": _warm_imports,
+    "category_index": _warm_category_index,
+    "resume_index": _warm_resume_index,
+    "lexical_index": _warm_lexical_index,
+}
+
+
+class WarmUp:
+    """
+    Loads the heavy modules and the category, resume and lexical indexes in a daemon thread once
+    the server takes its first request (normally the readiness probe), so the first scoring
+    requests do not pay for them. The locks it holds while building are replaced in forked
+    children (utils/fork_safety.py). Each component is pending,
+    loading, ready or failed; a failed one is built on first use, as without warm-up.
+    """
+    def __init__(self, components: list = None):
+        names = settings.WARMUP_COMPONENTS if components is None else components
+        unknown = [name for name in names if name not in STEPS]
+        if unknown:
+            logger.warning(f"Ignoring unknown warm-up components: {', '.join(unknown)}")
+        self.components = {name: {"state": PENDING, "seconds": None, "error": None}
+                           for name in STEPS if name in names}
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.time()
+                self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        for name in list(self.components):
+            self._set(name, state=LOADING)
+            start = time.perf_counter()
+            try:
+                STEPS[name]()
+            except Exception as e:
+                logger.warning(f"Warm-up of {name} failed: {e}")
+                self._set(name, state=FAILED, seconds=round(time.perf_counter() - start, 3), error=str(e))
+            else:
+                self._set(name, state=READY, seconds=round(time.perf_counter() - start, 3))
+        with self._lock:
+            self.finished_at = time.time()
+        logger.info(f"Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self.components[name].update(fields)
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def status(self) -> dict:
+        """{"ready", "started_at", "finished_at", "components": {name: {"state", "seconds", "error"}}}."""
+        with self._lock:
+            return {
+                "ready": self.finished_at is not None,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "components": {name: dict(c) for name, c in self.components.items()},
+            }
+
+
+_warmup = None
+_warmup_pid = None
+_warmup_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_warmup_lock")
+def start_warmup() -> WarmUp:
+    """
+    Starts this process's warm-up (once, and again in a forked child, which does not inherit the
+    thread). Returns None when WARMUP_ENABLED is off.
+    """
+    global _warmup, _warmup_pid
+    if not settings.WARMUP_ENABLED:
+        return None
+    if _warmup is None or _warmup_pid != os.getpid():
+        with _warmup_lock:
+            if _warmup is None or _warmup_pid != os.getpid():
+                _warmup = WarmUp().start()
+                _warmup_pid = os.getpid()
+    return _warmup
+
+
+def get_warmup_status() -> dict:
+    """Warm-up state of this process; always ready when warm-up is disabled."""
+    warmup = start_warmup()
+    if warmup is None:
+        return {"ready": True, "enabled": False, "components": {}}
+    return dict(warmup.status(), enabled=True)
@@ -0,0 +1,121 @@
+# tests/test_db_pool.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import gc
+import threading
+import time
+
+import mysql.connector
+import pytest
+
+from benchmarks.fakes import FakeConnection, FakeDatabase
+from utils.db_utils import ConnectionPool, PoolTimeout
+
+
+class TrackedConnection(FakeConnection):
+    """FakeConnection that remembers whether it was closed and can fail its health check."""
+    def __init__(self, db):
+        super().__init__(db)
+        self.closed = False
+        self.ping_fails = False
+
+    def ping(self, reconnect: bool = False):
+        if self.ping_fails:
+            raise mysql.connector.errors.OperationalError("MySQL server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDatabase()
+    connections = []
+
+    def connect(**config):
+        fake.connect(**config)
+        connections.append(TrackedConnection(fake))
+        return connections[-1]
+    monkeypatch.setattr(mysql.connector, "connect", connect)
+    fake.opened = connections
+    return fake
+
+
+def test_connections_are_reused(db):
+    pool = ConnectionPool({}, size=2)
+    with pool.get() as conn, conn.cursor() as cursor:
+        cursor.execute("INSERT INTO `logs` (`log_type`, `process`, `message`) VALUES (%s, %s, %s)",
+                       ("INFO", "Test", "hello"))
+        conn.commit()
+    with pool.get():
+        pass
+    stats = pool.stats()
+    assert (stats["created"], stats["checkouts"], stats["idle"], stats["in_use"]) == (1, 2, 1, 0)
+    assert db.stats()["logs"] == 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted(db):
+    pool = ConnectionPool({}, size=1, timeout=0.1)
+    held = pool.get()
+    start = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.get()
+    assert time.monotonic() - start >= 0.1
+    assert pool.stats()["timeouts"] == 1
+    held.close()
+    pool.get().close()
+
+
+def test_waiting_checkout_gets_released_connection(db):
+    pool = ConnectionPool({}, size=1, timeout=5)
+    held = pool.get()
+    threading.Timer(0.05, held.close).start()
+    with pool.get():
+        pass
+    stats = pool.stats()
+    assert (stats["created"], stats["waits"]) == (1, 1)
+    assert stats["wait_seconds_max"] >= 0.04
+
+
+def test_old_connections_are_recycled(db):
+    pool = ConnectionPool({}, size=1, recycle=0.05)
+    pool.get().close()
+    time.sleep(0.1)
+    with pool.get():
+        pass
+    assert pool.stats()["recycled"] == 1
+    assert db.opened[0].closed and len(db.opened) == 2
+
+
+def test_idle_connection_failing_ping_is_replaced(db):
+    pool = ConnectionPool({}, size=1, ping_interval=0.0)
+    pool.get().close()
+    db.opened[0].ping_fails = True
+    with pool.get() as conn:
+        assert conn._raw is db.opened[1]
+    assert db.opened[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_leaked_connection_slot_is_reclaimed(db):
+    pool = ConnectionPool({}, size=1, timeout=0.5)
+    leaked = pool.get()
+    leaked.cursor()
+    del leaked
+    gc.collect()
+    stats = pool.stats()
+    assert (stats["leaked"], stats["open"]) == (1, 0)
+    assert db.opened[0].closed  # not handed out again
+    with pool.get() as conn:
+        assert conn._raw is db.opened[1]
+
+
+def test_close_twice_returns_connection_once(db):
+    pool = ConnectionPool({}, size=2)
+    conn = pool.get()
+    conn.close()
+    conn.close()
+    del conn
+    gc.collect()
+    stats = pool.stats()
+    assert (stats["idle"], stats["open"], stats["leaked"]) == (1, 1, 0)
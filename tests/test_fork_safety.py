@@ -0,0 +1,47 @@
+# tests/test_fork_safety.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import gc
+import threading
+
+import pytest
+
+from utils import fork_safety
+from utils.fork_safety import reset_lock_after_fork
+
+
+class Cache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        reset_lock_after_fork(self)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_child_gets_a_fresh_lock():
+    cache = Cache()
+    cache._lock.acquire()  # held by this thread while forking
+    try:
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if cache._lock.acquire(timeout=1) else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        cache._lock.release()
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_collected_owners_leave_the_registry():
+    before = len(fork_safety._owners)
+    caches = [Cache() for _ in range(50)]
+    assert len(fork_safety._owners) == before + 50
+    del caches
+    gc.collect()
+    assert len(fork_safety._owners) == before
+
+
+def test_registering_twice_keeps_one_entry_per_owner():
+    cache = Cache()
+    reset_lock_after_fork(cache, "_other_lock", factory=threading.RLock)
+    reset_lock_after_fork(cache)
+    _, attrs = fork_safety._owners[id(cache)]
+    assert attrs == {"_lock": threading.Lock, "_other_lock": threading.RLock}
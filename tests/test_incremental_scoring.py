@@ -0,0 +1,57 @@
+# tests/test_incremental_scoring.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import mysql.connector
+import pytest
+
+import services.score_service as score_service
+import utils.db_utils as db_utils
+from benchmarks.fakes import FakeDatabase
+from services.score_service import persist_recommendations, plan_incremental_scoring
+from utils.pdf_cache import content_hash
+
+
+@pytest.fixture
+def resumes(tmp_path, monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setattr(mysql.connector, "connect", db.connect)
+    monkeypatch.setattr(db_utils, "_pool", None)
+    monkeypatch.setattr(score_service, "_tracking_columns", None)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"r{i}.pdf"
+        path.write_bytes(f"resume {i}".encode())
+        paths.append(str(path))
+    results = [{"resume_path": p, "candidate_email": f"c{i}@example.com", "candidate_name": f"C{i}",
+                "category_score": 5, "requirements_score": 6, "qualifications_score": 7, "final_score": 6,
+                "reason": "ok"} for i, p in enumerate(paths)]
+    details = {p: {"name": f"C{i}", "email": f"c{i}@example.com"} for i, p in enumerate(paths)}
+    hashes = {p: content_hash(open(p, "rb").read()) for p in paths}
+    persist_recommendations(1, results, details, hashes)
+    return paths
+
+
+def test_unchanged_resumes_are_reused(resumes):
+    reused, pending = plan_incremental_scoring(1, resumes)
+    assert sorted(r["resume_path"] for r in reused) == sorted(resumes) and pending == []
+    assert reused[0]["final_score"] == 6.0
+
+
+def test_changed_resume_is_rescored(resumes):
+    with open(resumes[0], "ab") as f:
+        f.write(b" and more")
+    reused, pending = plan_incremental_scoring(1, resumes)
+    assert pending == [resumes[0]] and len(reused) == 2
+
+
+@pytest.mark.parametrize("attr, value", [("SCORE_PROMPT_VERSION", "v2"), ("SCORING_MODEL", "gemini-2.5-pro")])
+def test_new_prompt_or_model_rescores_everything(resumes, monkeypatch, attr, value):
+    monkeypatch.setattr(score_service, attr, value)
+    reused, pending = plan_incremental_scoring(1, resumes)
+    assert reused == [] and pending == resumes
+
+
+def test_reuse_needs_both_tracking_columns(resumes, monkeypatch):
+    monkeypatch.setattr(score_service, "_tracking_columns", ("resume_hash",))
+    reused, pending = plan_incremental_scoring(1, resumes)
+    assert reused == [] and pending == resumes
@@ -0,0 +1,96 @@
+# tests/test_job_queue.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+import time
+
+from services.job_service import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+
+
+class GatedRunner:
+    """Stands in for run_recommendation: reports progress, then blocks until released."""
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, jd_id, resume_folder, incremental=True, on_start=None, on_result=None, **options):
+        self.calls += 1
+        on_start({"total": 2, "pruned": 1})
+        on_result("a.pdf", {"filename": "a.pdf", "final_score": 7}, None)
+        self.started.set()
+        assert self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("database went away")
+        on_result("b.pdf", None, ValueError("unreadable"))
+        return [{"filename": "a.pdf", "final_score": 7}]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_identical_pending_jobs_are_coalesced():
+    runner = GatedRunner()
+    queue = JobQueue(runner=runner, workers=1)
+    job, created = queue.submit(1, "/resumes")
+    again, created_again = queue.submit(1, "/resumes")
+    other, created_other = queue.submit(1, "/resumes", top_k=5)
+    assert created and not created_again and created_other
+    assert again is job and other is not job
+    runner.release.set()
+    _wait_for(lambda: job.finished and other.finished)
+    assert runner.calls == 2
+    assert queue.stats()["coalesced"] == 1
+    # a finished job is not reused
+    _, created = queue.submit(1, "/resumes")
+    assert created
+
+
+def test_job_status_transitions_and_progress():
+    runner = GatedRunner()
+    queue = JobQueue(runner=runner, workers=1)
+    blocker, _ = queue.submit(1, "/first")
+    job, _ = queue.submit(2, "/second")
+    assert job.to_dict()["status"] == QUEUED
+    assert runner.started.wait(5)
+    body = blocker.to_dict()
+    assert body["status"] == RUNNING and body["started_at"] is not None
+    assert (body["total"], body["processed"], body["pruned"], body["progress"]) == (2, 1, 1, 0.5)
+    assert body["partial_results"][0]["filename"] == "a.pdf"
+    runner.release.set()
+    _wait_for(lambda: job.finished)
+    body = job.to_dict()
+    assert body["status"] == SUCCEEDED
+    assert (body["processed"], body["failed"], body["progress"]) == (2, 1, 1.0)
+    assert body["result"] == [{"filename": "a.pdf", "final_score": 7}]
+    assert body["finished_at"] >= body["started_at"] >= body["created_at"]
+
+
+def test_failed_job_reports_error():
+    runner = GatedRunner(fail=True)
+    runner.release.set()
+    queue = JobQueue(runner=runner, workers=1)
+    job, _ = queue.submit(1, "/resumes")
+    _wait_for(lambda: job.finished)
+    body = job.to_dict()
+    assert body["status"] == FAILED and body["error"] == "database went away"
+    assert body["finished_at"] is not None
+    assert queue.stats()[FAILED] == 1
+
+
+def test_finished_jobs_are_pruned_by_age_and_count():
+    runner = GatedRunner()
+    runner.release.set()
+    queue = JobQueue(runner=runner, workers=1, retention_seconds=60, max_retained=2)
+    jobs = [queue.submit(jd_id, "/resumes")[0] for jd_id in range(4)]
+    _wait_for(lambda: all(job.finished for job in jobs))
+    jobs[0].finished_at -= 120  # past retention
+    queue.submit(99, "/resumes")  # pruning runs on submit
+    assert queue.get(jobs[0].id) is None  # expired
+    assert queue.get(jobs[1].id) is None  # oldest beyond max_retained
+    assert queue.get(jobs[2].id) is jobs[2] and queue.get(jobs[3].id) is jobs[3]
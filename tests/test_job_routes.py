@@ -0,0 +1,51 @@
+# tests/test_job_routes.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from flask import Flask
+import pytest
+
+import routes.job_routes as job_routes
+from routes.score_routes import retrieval_params
+from services.job_service import JobQueue
+
+
+@pytest.fixture
+def client(monkeypatch):
+    queue = JobQueue(runner=lambda *args, **kwargs: [], workers=1)
+    monkeypatch.setattr(job_routes, "get_job_queue", lambda: queue)
+    monkeypatch.setattr(job_routes, "save_log", lambda *args, **kwargs: None)
+    app = Flask(__name__)
+    app.register_blueprint(job_routes.job_bp)
+    return app.test_client()
+
+
+def test_submit_from_json_object_and_query_string(client):
+    response = client.post("/jobs/recommended", json={"jd_id": 3, "resume_folder": "resumes/a", "top_k": 5.0})
+    assert response.status_code == 202
+    assert (response.json["jd_id"], response.json["top_k"]) == (3, 5)
+    response = client.post("/jobs/recommended?jd_id=4&resume_folder=resumes/a&min_similarity=0.5")
+    assert response.status_code == 202 and response.json["min_similarity"] == 0.5
+
+
+@pytest.mark.parametrize("body", ['[{"jd_id": 1}]', '"jd"', '7', 'null', '{"jd_id": 1,'])
+def test_non_object_json_body_is_rejected(client, body):
+    response = client.post("/jobs/recommended", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.json["error"] == "Request body must be a JSON object"
+
+
+@pytest.mark.parametrize("extra", [
+    {"top_k": 2.5}, {"top_k": "2.5"}, {"top_k": [3]}, {"top_k": True}, {"top_k": -1},
+    {"lexical_top_k": {"n": 1}}, {"min_similarity": [0.5]}, {"min_similarity": "high"},
+    {"min_similarity": "nan"}, {"jd_id": [1]}, {"resume_folder": {"path": "a"}},
+])
+def test_malformed_parameters_are_rejected(client, extra):
+    body = dict({"jd_id": 1, "resume_folder": "resumes/a"}, **extra)
+    assert client.post("/jobs/recommended", json=body).status_code == 400
+
+
+def test_retrieval_params_from_query_strings():
+    assert retrieval_params({"top_k": "10", "min_similarity": "0.25", "lexical_top_k": ""}) == \
+        {"top_k": 10, "min_similarity": 0.25, "lexical_top_k": None}
+    with pytest.raises(ValueError):
+        retrieval_params({"top_k": "ten"})
@@ -0,0 +1,51 @@
+# tests/test_lexical_index.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.lexical_index import LexicalIndex, tokenize
+from services.score_service import jd_query_terms
+
+RESUME = """Senior developer. Built REST APIs in Node.js and ASP.NET, C++ services and C# tooling.
+Set up CI/CD pipelines; 5 years of full-stack work."""
+
+
+def test_tokenize_keeps_dotted_and_symbol_terms_whole():
+    assert tokenize("Node.js, ASP.NET and C++/C#.") == ["node.js", "asp.net", "c++", "c#"]
+
+
+def test_jd_query_terms_match_resume_tokens():
+    requirements = ["Node.js", "ASP.NET", "C++", "CI/CD"]
+    qualifications = "Experience with C#. Full-stack development."
+    terms = jd_query_terms(requirements, qualifications)
+    assert {"node.js", "asp.net", "c++", "c#"} <= set(terms)
+    doc_terms = set(tokenize(RESUME))
+    assert [t for t in terms if t not in doc_terms] == ["experience", "development"]
+
+
+def test_search_ranks_resume_with_dotted_terms():
+    idx = LexicalIndex()
+    idx.add("/resumes/node.pdf", RESUME)
+    idx.add("/resumes/java.pdf", "Java developer with Spring and Kubernetes experience.")
+    results, unindexed = idx.search(jd_query_terms(["Node.js", "ASP.NET"], None))
+    assert [path for path, _ in results] == ["/resumes/node.pdf"]
+    assert unindexed == []
+
+
+def test_replace_keeps_one_document_per_resume():
+    idx = LexicalIndex()
+    idx.replace("/resumes/a.pdf", "Java developer", "a.pdf", {"size": 1})
+    idx.replace("/resumes/a.pdf", "Python developer", "a.pdf", {"size": 2})
+    assert len(idx) == 1 and idx.manifest["a.pdf"]["size"] == 2
+    results, _ = idx.search(["java"])
+    assert results == []
+    assert "java" not in idx.postings
+
+
+def test_save_and_load_round_trip(tmp_path):
+    idx = LexicalIndex()
+    idx.replace(str(tmp_path / "node.pdf"), RESUME, "node.pdf", {"size": 10, "mtime": 1.0, "sha256": "x"})
+    path = str(tmp_path / "lexical.json")
+    idx.save(path)
+    idx.replace(str(tmp_path / "java.pdf"), "Java developer", "java.pdf")  # after the snapshot
+    loaded = LexicalIndex.load(path, str(tmp_path))
+    assert list(loaded.manifest) == ["node.pdf"]
+    assert loaded.search(jd_query_terms(["Node.js"], None))[0][0][0] == str(tmp_path / "node.pdf")
@@ -0,0 +1,110 @@
+# tests/test_log_sink.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+
+import pytest
+
+import Tools.logs as logs
+from config import settings
+from Tools.logs import LogSink, hold_logs, replay_logs, save_log
+
+
+class RecordingWriter:
+    """Replaces Tools.logs._write_logs: records each batch, optionally blocking until released."""
+    def __init__(self, block: bool = False):
+        self.batches = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, rows):
+        self.entered.set()
+        assert self.release.wait(5)
+        self.batches.append(list(rows))
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    recorder = RecordingWriter()
+    monkeypatch.setattr(logs, "_write_logs", recorder)
+    return recorder
+
+
+def _row(i):
+    return ("INFO", "Test", f"message {i}")
+
+
+def test_rows_are_written_in_multi_row_batches(writer):
+    sink = LogSink(batch_size=3, flush_interval=0.2)
+    for i in range(7):
+        assert sink.submit(_row(i))
+    assert sink.flush()
+    assert [len(batch) for batch in writer.batches] == [3, 3, 1]
+    assert [row for batch in writer.batches for row in batch] == [_row(i) for i in range(7)]
+    stats = sink.stats()
+    assert (stats["enqueued"], stats["written"], stats["batches"], stats["queued"]) == (7, 7, 3, 0)
+    sink.shutdown()
+
+
+def test_full_queue_drops_and_counts(monkeypatch):
+    writer = RecordingWriter(block=True)
+    monkeypatch.setattr(logs, "_write_logs", writer)
+    sink = LogSink(max_queue=2, batch_size=1, flush_interval=0.05)
+    assert sink.submit(_row(0))
+    assert writer.entered.wait(5)  # the writer holds row 0; the queue has room for two more
+    assert sink.submit(_row(1)) and sink.submit(_row(2))
+    assert not sink.submit(_row(3))
+    assert not sink.submit(_row(4))
+    stats = sink.stats()
+    assert (stats["enqueued"], stats["dropped"], stats["queued"]) == (3, 2, 2)
+    writer.release.set()
+    assert sink.flush()
+    assert sink.stats()["written"] == 3
+    sink.shutdown()
+
+
+def test_failed_writes_are_counted(monkeypatch):
+    def broken(rows):
+        raise RuntimeError("database went away")
+    monkeypatch.setattr(logs, "_write_logs", broken)
+    sink = LogSink(batch_size=10, flush_interval=0.05)
+    sink.submit(_row(0))
+    sink.submit(_row(1))
+    assert sink.flush()
+    assert (sink.stats()["failed"], sink.stats()["written"]) == (2, 0)
+    sink.shutdown()
+
+
+def test_shutdown_flushes_pending_rows(writer):
+    sink = LogSink(batch_size=100, flush_interval=10.0)
+    for i in range(5):
+        sink.submit(_row(i))
+    sink.shutdown(timeout=5)
+    assert not sink._thread.is_alive()
+    assert [row for batch in writer.batches for row in batch] == [_row(i) for i in range(5)]
+
+
+def test_hold_logs_collects_rows_for_replay(writer, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_SINK_ENABLED", False)  # replay writes synchronously
+    with hold_logs() as rows:
+        save_log("ERROR", "parse failed", process="Candidate_Parsing")
+        save_log("INFO", "done", process="Candidate_Parsing")
+    assert writer.batches == []
+    assert rows == [("ERROR", "Candidate_Parsing", "parse failed"), ("INFO", "Candidate_Parsing", "done")]
+    save_log("INFO", "not held")
+    assert writer.batches == [[("INFO", "JD_Analysis", "not held")]]
+    replay_logs(rows)
+    assert writer.batches[-1] == rows
+    replay_logs([])
+    assert len(writer.batches) == 2
+
+
+def test_hold_logs_writes_rows_when_block_raises(writer):
+    with pytest.raises(ValueError):
+        with hold_logs():
+            save_log("ERROR", "about to fail", process="Candidate_Parsing")
+            raise ValueError("corrupt pdf")
+    assert writer.batches == [[("ERROR", "Candidate_Parsing", "about to fail")]]
+    assert logs._held is None
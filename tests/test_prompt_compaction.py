@@ -0,0 +1,94 @@
+# tests/test_prompt_compaction.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.llm_usage import estimate_tokens
+from utils.prompt_compaction import (compact_jd_text, compact_resume_text, cut_line, extraction_priority,
+                                     fit_blocks, fit_sections, split_blocks)
+
+
+def _tokens(blocks):
+    return sum((estimate_tokens(heading) if heading else 0) + sum(estimate_tokens(line) for line in lines)
+               for _, heading, lines in blocks)
+
+
+def _long_cv(experience_lines=200):
+    return ("Jane Doe\njane@example.com\nEXPERIENCE\n"
+            + "\n".join(f"Built service number {i} for customers in the payments team" for i in range(experience_lines))
+            + "\nEDUCATION\nBSc Computer Science\nSKILLS\nPython, SQL, Go\n")
+
+
+def test_split_blocks_drops_boilerplate_and_repeated_lines():
+    text = "Jane Doe\nPage 1 of 2\nEXPERIENCE\nAcme Corp engineer\nFooter\nFooter\nFooter\nEDUCATION\nBSc\nPage 2 of 2"
+    blocks = split_blocks(text)
+    assert [name for name, _, _ in blocks] == ["header", "experience", "education"]
+    assert blocks[0][2] == ["Jane Doe"]
+    assert blocks[1][2] == ["Acme Corp engineer", "Footer"]
+
+
+def test_fit_blocks_keeps_everything_without_budget():
+    blocks = split_blocks(_long_cv())
+    assert fit_blocks(blocks, 0, ("experience",)) == blocks
+
+
+def test_fit_blocks_cuts_an_oversized_line_at_a_word_boundary():
+    line = " ".join(["requirement"] * 2000)
+    kept = fit_blocks([["header", None, [line]]], 100, ("header",))
+    assert len(kept) == 1
+    cut = kept[0][2][0]
+    assert cut and line.startswith(cut) and not cut.endswith(" ")
+    assert line[len(cut)] == " "
+    assert estimate_tokens(cut) <= 100
+
+
+def test_fit_blocks_carries_on_with_blocks_that_still_fit():
+    blocks = [["experience", "EXPERIENCE", ["x" * 400, "y" * 400]], ["skills", "SKILLS", ["Python"]]]
+    kept = fit_blocks(blocks, 110, ("experience", "skills"))
+    assert [name for name, _, _ in kept] == ["experience", "skills"]
+    assert kept[0][2] == ["x" * 400]
+    assert _tokens(kept) <= 110
+
+
+def test_fit_blocks_reserves_a_share_for_reserved_blocks():
+    blocks = split_blocks(_long_cv())
+    kept = fit_blocks(blocks, 300, ("header", "experience", "education", "skills"), reserve=("education", "skills"))
+    names = [name for name, _, _ in kept]
+    assert "education" in names and "skills" in names and "experience" in names
+    assert _tokens(kept) <= 300
+    assert names == sorted(names, key=["header", "experience", "education", "skills"].index)  # document order
+
+
+def test_compact_jd_text_keeps_a_single_paragraph_jd():
+    jd = " ".join(["We need a senior engineer with Python and Kubernetes experience."] * 250)
+    compacted = compact_jd_text(jd, 3000)
+    assert compacted and jd.startswith(compacted)
+    assert estimate_tokens(compacted) <= 3000
+
+
+def test_compact_resume_text_keeps_sections_of_missing_fields():
+    cv = _long_cv()
+    compacted = compact_resume_text(cv, 1500, missing_fields=["education_level", "skills"])
+    assert "BSc Computer Science" in compacted and "Python, SQL, Go" in compacted
+    assert "Built service number 0 " in compacted
+    assert estimate_tokens(compacted) <= 1500 + 1
+
+
+def test_extraction_priority_moves_wanted_sections_first():
+    priority = extraction_priority(["skills", "email"])
+    assert priority[:2] == ("header", "skills")
+    assert sorted(priority) == sorted(extraction_priority(None))
+
+
+def test_cut_line():
+    assert cut_line("short line", 100) == "short line"
+    assert cut_line("alpha beta gamma", 3) == "alpha"
+    assert cut_line("anything", 1) == ""
+
+
+def test_fit_sections_cuts_sections_and_keeps_priority():
+    sections = {"experience": "Role one\n" + "word " * 2000, "skills": "Python, SQL", "other": "Hobbies: chess"}
+    fitted = fit_sections(sections, 200, max_section_chars=400)
+    assert fitted["skills"] == "Python, SQL"
+    assert len(fitted["experience"]) <= 400
+    assert sum(estimate_tokens(body) for body in fitted.values()) <= 200
+    single = fit_sections({"summary": "word " * 1000}, 1000, max_section_chars=100)
+    assert single["summary"] and len(single["summary"]) <= 100
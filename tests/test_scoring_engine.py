@@ -0,0 +1,119 @@
+# tests/test_scoring_engine.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeGenerativeModel
+from services.scoring_engine import ScoringEngine, TokenBucket
+
+
+class TrackingScorer:
+    """Scores with a FakeGenerativeModel and records how many calls overlap."""
+    def __init__(self, model):
+        self.model = model
+        self.started = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, resume_text):
+        with self._lock:
+            self.started += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if resume_text == "bad":
+                raise ValueError("unreadable resume")
+            return self.model.generate_content(f"Score this resume: {resume_text}").text
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _tasks(n, bad=()):
+    return ((i, {"resume_text": "bad" if i in bad else f"resume {i}"}) for i in range(n))
+
+
+def test_run_never_exceeds_max_concurrency():
+    scorer = TrackingScorer(FakeGenerativeModel(latency=0.02))
+    engine = ScoringEngine(scorer, max_concurrency=3)
+    outcomes = list(engine.run(_tasks(20)))
+    assert sorted(key for key, _, _ in outcomes) == list(range(20))
+    assert all(error is None for _, _, error in outcomes)
+    assert scorer.peak == 3
+
+
+def test_run_isolates_task_errors():
+    scorer = TrackingScorer(FakeGenerativeModel(latency=0.0))
+    engine = ScoringEngine(scorer, max_concurrency=4)
+    outcomes = {key: (result, error) for key, result, error in engine.run(_tasks(10, bad={2, 7}))}
+    assert len(outcomes) == 10
+    assert isinstance(outcomes[2][1], ValueError) and outcomes[2][0] is None
+    assert isinstance(outcomes[7][1], ValueError)
+    assert all(outcomes[key][1] is None and outcomes[key][0] for key in outcomes if key not in (2, 7))
+
+
+def test_run_closes_lazy_task_producer():
+    closed = []
+
+    def producer():
+        try:
+            yield from _tasks(10)
+        finally:
+            closed.append(True)
+
+    engine = ScoringEngine(TrackingScorer(FakeGenerativeModel(latency=0.0)), max_concurrency=2)
+    outcomes = engine.run(producer())
+    next(outcomes)
+    outcomes.close()
+    assert closed == [True]
+
+
+def test_closing_run_early_cancels_queued_tasks():
+    scorer = TrackingScorer(FakeGenerativeModel(latency=0.05))
+    engine = ScoringEngine(scorer, max_concurrency=2)
+    outcomes = engine.run(_tasks(100))
+    next(outcomes)
+    start = time.monotonic()
+    outcomes.close()
+    assert time.monotonic() - start < 0.05  # does not wait for the calls in flight
+    time.sleep(0.2)
+    assert scorer.started <= 4
+    assert scorer.model.calls <= 4
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 2 tokens up front, the other 4 refill at 20/s
+    assert 0.18 <= elapsed < 0.4
+
+
+def test_token_bucket_paces_concurrent_callers():
+    bucket = TokenBucket(rate=50, capacity=1)
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(11)]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert 0.18 <= time.monotonic() - start < 0.5
+
+
+def test_engine_rate_limit_paces_calls():
+    scorer = TrackingScorer(FakeGenerativeModel(latency=0.0))
+    engine = ScoringEngine(scorer, max_concurrency=8, requests_per_minute=600)  # 10/s, burst of 10
+    start = time.monotonic()
+    assert len(list(engine.run(_tasks(15)))) == 15
+    assert time.monotonic() - start >= 0.45
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
@@ -0,0 +1,49 @@
+# tests/test_sqlite_cache.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import time
+
+from utils.sqlite_cache import SqliteCache
+
+
+def _last_access(cache, key):
+    return cache._connection().execute("SELECT last_access FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_recent_hits_do_not_write(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite3"), touch_interval=60)
+    cache.put("a", b"1")
+    conn = cache._connection()
+    writes = conn.total_changes
+    for _ in range(5):
+        assert cache.get("a") == b"1"
+    assert conn.total_changes == writes
+    assert cache.stats()["hits"] == 5
+
+
+def test_stale_hit_refreshes_access_time(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite3"), touch_interval=60)
+    cache.put("a", b"1")
+    cache._connection().execute("UPDATE cache SET last_access = ?", (time.time() - 120,))
+    before = _last_access(cache, "a")
+    assert cache.get("a") == b"1"
+    assert _last_access(cache, "a") > before + 100
+
+
+def test_eviction_keeps_recently_read_entries(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite3"), max_entries=2, touch_interval=0)
+    cache.put("old", b"1")
+    cache.put("new", b"2")
+    time.sleep(0.01)
+    cache.get("old")
+    cache.put("third", b"3")  # evicts the least recently read: "new"
+    assert cache.get_many(["old", "new", "third"]) == {"old": b"1", "third": b"3"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses_and_deleted(tmp_path):
+    cache = SqliteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60)
+    cache.put("a", b"1")
+    cache._connection().execute("UPDATE cache SET created_at = ?", (time.time() - 120,))
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["misses"] == 1
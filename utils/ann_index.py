@@ -0,0 +1,282 @@
+# utils/ann_index.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_KINDS = ("flat", "ivf", "ivfpq", "hnsw")
+DEFAULT_PARAMS = {
+    "nlist": 256,           # IVF: number of clusters
+    "nprobe": 16,           # IVF: clusters visited per query
+    "pq_m": 16,             # IVF-PQ: sub-quantizers per vector (must divide the dimension)
+    "pq_nbits": 8,          # IVF-PQ: bits per sub-quantizer code
+    "hnsw_m": 32,           # HNSW: graph neighbours per node
+    "ef_construction": 200, # HNSW: build-time search depth
+    "ef_search": 128,       # HNSW: query-time search depth
+}
+# HNSW graphs cannot delete; rebuild once this share of stored vectors is tombstoned
+HNSW_COMPACT_RATIO = 0.2
+# Filtered searches over at most this many ids score the stored vectors directly: an ANN scan
+# restricted to a tiny subset finds few of its members (HNSW especially)
+FILTER_EXACT_MAX = 2048
+
+
+def _pq_subquantizers(dimension: int, wanted: int) -> int:
+    """Largest divisor of dimension that is <= wanted (IVF-PQ needs one)."""
+    for m in range(min(wanted, dimension), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+class AnnIndex:
+    """
+    Inner-product nearest-neighbour index over stable int64 ids with a configurable FAISS backend:
+      flat   exact scan (IndexFlatIP) - the default and the recall baseline
+      ivf    inverted lists (IndexIVFFlat); each query visits nprobe of nlist clusters
+      ivfpq  inverted lists of product-quantized codes (IndexIVFPQ); much smaller than flat
+      hnsw   navigable small-world graph (IndexHNSWFlat); ef_search trades recall for speed
+
+    IVF kinds must be trained. Until train_size vectors (default 39 per centroid) have been added they
+    are kept in an exact buffer that is searched alongside the index, so small indexes stay exact;
+    then the index is trained on the buffer and takes it over. HNSW cannot delete, so removed ids
+    are tombstoned and filtered out of results until compact() rebuilds the graph.
+
+    search() can be restricted to a subset of ids. Small subsets are scored exactly from their
+    stored vectors; larger ones are searched with an ID selector, so FAISS skips every other vector.
+    """
+    def __init__(self, dimension: int, kind: str = "flat", train_size: int = None, **params):
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind '{kind}'; expected one of {', '.join(INDEX_KINDS)}")
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown index parameters: {', '.join(sorted(unknown))}")
+        self.dimension = dimension
+        self.kind = kind
+        self.params = dict(DEFAULT_PARAMS, **params)
+        # FAISS wants ~39 training points per centroid (and per PQ codebook entry for ivfpq)
+        min_train = 39 * self.params["nlist"]
+        if kind == "ivfpq":
+            min_train = max(min_train, 39 * 2 ** self.params["pq_nbits"])
+        self.train_size = train_size or min_train
+        self.index = self._build()
+        self._buffer_ids = np.empty(0, dtype='int64')
+        self._buffer = np.empty((0, dimension), dtype='float32')
+        self._deleted = set()
+
+    def _build(self):
+        d, p = self.dimension, self.params
+        if self.kind == "flat":
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(d))
+        if self.kind == "hnsw":
+            graph = faiss.IndexHNSWFlat(d, p["hnsw_m"], faiss.METRIC_INNER_PRODUCT)
+            graph.hnsw.efConstruction = p["ef_construction"]
+            graph.hnsw.efSearch = p["ef_search"]
+            return faiss.IndexIDMap2(graph)
+        quantizer = faiss.IndexFlatIP(d)
+        if self.kind == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, d, p["nlist"], faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, d, p["nlist"], _pq_subquantizers(d, p["pq_m"]),
+                                     p["pq_nbits"], faiss.METRIC_INNER_PRODUCT)
+        index.nprobe = p["nprobe"]
+        # Lets filtered searches reconstruct stored vectors by id
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal + len(self._buffer_ids) - len(self._deleted)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.index.is_trained
+
+    @property
+    def tombstones(self) -> list:
+        """Ids removed from an HNSW graph but still stored in it (persist these with the index)."""
+        return sorted(self._deleted)
+
+    def config(self) -> dict:
+        """Kind and parameters, as persisted next to the index."""
+        return {"kind": self.kind, "train_size": self.train_size, **self.params}
+
+    def set_search_params(self, nprobe: int = None, ef_search: int = None):
+        if nprobe is not None:
+            self.params["nprobe"] = nprobe
+            if self.kind in ("ivf", "ivfpq"):
+                self.index.nprobe = nprobe
+        if ef_search is not None:
+            self.params["ef_search"] = ef_search
+            if self.kind == "hnsw":
+                faiss.downcast_index(self.index.index).hnsw.efSearch = ef_search
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype='float32')
+        ids = np.asarray(ids, dtype='int64')
+        if self.index.is_trained:
+            self.index.add_with_ids(vectors, ids)
+            return
+        self._buffer = np.vstack([self._buffer, vectors])
+        self._buffer_ids = np.concatenate([self._buffer_ids, ids])
+        if len(self._buffer_ids) >= self.train_size:
+            self.train()
+
+    def train(self):
+        """Trains an IVF index on the buffered vectors and moves them into it."""
+        if self.index.is_trained or len(self._buffer_ids) < self.params["nlist"]:
+            return
+        logger.info(f"Training {self.kind} index on {len(self._buffer_ids)} vectors")
+        self.index.train(self._buffer)
+        self.index.add_with_ids(self._buffer, self._buffer_ids)
+        self._buffer_ids = np.empty(0, dtype='int64')
+        self._buffer = np.empty((0, self.dimension), dtype='float32')
+
+    def remove_ids(self, ids):
+        ids = np.asarray(ids, dtype='int64')
+        if len(self._buffer_ids):
+            keep = ~np.isin(self._buffer_ids, ids)
+            self._buffer, self._buffer_ids = self._buffer[keep], self._buffer_ids[keep]
+        if self.kind != "hnsw":
+            self.index.remove_ids(ids)
+            return
+        stored = set(faiss.vector_to_array(self.index.id_map).tolist())
+        self._deleted.update(i for i in ids.tolist() if i in stored)
+        if self._deleted and len(self._deleted) >= HNSW_COMPACT_RATIO * self.index.ntotal:
+            self.compact()
+
+    def compact(self):
+        """Rebuilds an HNSW graph without its tombstoned vectors."""
+        if self.kind != "hnsw" or not self._deleted:
+            return
+        all_ids = faiss.vector_to_array(self.index.id_map)
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+        keep = ~np.isin(all_ids, np.fromiter(self._deleted, dtype='int64'))
+        self.index = self._build()
+        self._deleted = set()
+        if keep.any():
+            self.index.add_with_ids(vectors[keep], all_ids[keep])
+
+    def _search_params(self, selector, k: int, widen: bool = False):
+        if self.kind in ("ivf", "ivfpq"):
+            nprobe = self.params["nlist"] if widen else self.params["nprobe"]
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+        if self.kind == "hnsw":
+            ef = max(self.params["ef_search"], k) * (4 if widen else 1)
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=ef)
+        return faiss.SearchParameters(sel=selector)
+
+    def _filtered_search(self, queries: np.ndarray, k: int, allowed: np.ndarray):
+        selector = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed))
+        scores, ids = self.index.search(queries, k, params=self._search_params(selector, k))
+        # The clusters (or graph neighbourhood) nearest the query may hold fewer than k allowed
+        # ids; retry those queries once with every cluster probed / a deeper graph search.
+        short = (ids >= 0).sum(axis=1) < k
+        if short.any() and self.kind != "flat":
+            retry = self.index.search(queries[short], k, params=self._search_params(selector, k, widen=True))
+            scores[short], ids[short] = retry
+        return scores, ids
+
+    def _exact_subset_search(self, queries: np.ndarray, k: int, allowed: np.ndarray):
+        stored = allowed[~np.isin(allowed, self._buffer_ids)] if len(self._buffer_ids) else allowed
+        if not len(stored):
+            return None
+        try:
+            vectors = self.index.reconstruct_batch(stored)
+        except RuntimeError:
+            # Some id is not in the index after all; let the selector skip it
+            return self._filtered_search(queries, min(k, len(stored)), stored)
+        exact = queries @ vectors.T
+        top = np.argsort(-exact, axis=1)[:, :k]
+        return np.take_along_axis(exact, top, axis=1), stored[top]
+
+    def search(self, queries: np.ndarray, k: int, allowed_ids=None):
+        """
+        Batched search: queries is (n, dimension). Returns (scores, ids), both (n, k), best first;
+        missing results are padded with id -1 and score -inf. With allowed_ids, only those ids
+        (which should be ids added to this index) can be returned.
+        """
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype='float32')
+        n = queries.shape[0]
+        scores = np.full((n, k), -np.inf, dtype='float32')
+        ids = np.full((n, k), -1, dtype='int64')
+        if k <= 0 or self.ntotal == 0:
+            return scores, ids
+        allowed = None
+        if allowed_ids is not None:
+            allowed = np.unique(np.asarray(allowed_ids, dtype='int64'))
+            if self._deleted:
+                allowed = allowed[~np.isin(allowed, np.fromiter(self._deleted, dtype='int64'))]
+            if not len(allowed):
+                return scores, ids
+        parts = []
+        if self.index.ntotal:
+            if allowed is None:
+                k_index = min(self.index.ntotal, k + len(self._deleted))
+                parts.append(self.index.search(queries, k_index))
+            elif len(allowed) <= FILTER_EXACT_MAX:
+                part = self._exact_subset_search(queries, k, allowed)
+                if part is not None:
+                    parts.append(part)
+            else:
+                parts.append(self._filtered_search(queries, min(k, len(allowed)), allowed))
+        buffer, buffer_ids = self._buffer, self._buffer_ids
+        if allowed is not None and len(buffer_ids):
+            keep = np.isin(buffer_ids, allowed)
+            buffer, buffer_ids = buffer[keep], buffer_ids[keep]
+        if len(buffer_ids):
+            exact = queries @ buffer.T
+            top = np.argsort(-exact, axis=1)[:, :k]
+            parts.append((np.take_along_axis(exact, top, axis=1), buffer_ids[top]))
+        if not parts:
+            return scores, ids
+        # Tombstones were already dropped from allowed, so a filtered search never returns them
+        if len(parts) == 1 and (allowed is not None or not self._deleted):
+            part_scores, part_ids = parts[0]
+            width = min(k, part_ids.shape[1])
+            scores[:, :width], ids[:, :width] = part_scores[:, :width], part_ids[:, :width]
+            return scores, ids
+        all_scores = np.hstack([p[0] for p in parts])
+        all_ids = np.hstack([p[1] for p in parts])
+        for row in range(n):
+            order = np.argsort(-all_scores[row])
+            hits = [(all_scores[row, j], all_ids[row, j]) for j in order
+                    if all_ids[row, j] >= 0 and int(all_ids[row, j]) not in self._deleted][:k]
+            for col, (score, vec_id) in enumerate(hits):
+                scores[row, col], ids[row, col] = score, vec_id
+        return scores, ids
+
+    def memory_bytes(self) -> int:
+        """Approximate in-memory size: the serialized index plus the training buffer."""
+        return int(faiss.serialize_index(self.index).size) + self._buffer.nbytes + self._buffer_ids.nbytes
+
+    def save(self, index_path: str):
+        """Atomically writes the index (and its training buffer, if any) next to index_path."""
+        faiss.write_index(self.index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
+        buffer_path = index_path + ".buffer.npz"
+        if len(self._buffer_ids):
+            with open(buffer_path + ".tmp", "wb") as f:
+                np.savez(f, ids=self._buffer_ids, vectors=self._buffer)
+            os.replace(buffer_path + ".tmp", buffer_path)
+        elif os.path.exists(buffer_path):
+            os.remove(buffer_path)
+
+    @classmethod
+    def load(cls, index_path: str, dimension: int, config: dict, deleted: list = None):
+        config = dict(config)
+        idx = cls(dimension, kind=config.pop("kind", "flat"), train_size=config.pop("train_size", None), **config)
+        idx.index = faiss.read_index(index_path)
+        buffer_path = index_path + ".buffer.npz"
+        if os.path.exists(buffer_path):
+            with np.load(buffer_path) as data:
+                idx._buffer_ids, idx._buffer = data["ids"], data["vectors"]
+        idx._deleted = set(deleted or [])
+        if idx.kind in ("ivf", "ivfpq") and idx.index.direct_map.type != faiss.DirectMap.Hashtable:
+            idx.index.set_direct_map_type(faiss.DirectMap.Hashtable)  # saved before filtering existed
+        # Search-time knobs come from the current configuration, not from the saved file
+        idx.set_search_params(nprobe=idx.params["nprobe"], ef_search=idx.params["ef_search"])
+        return idx
@@ -2,160 +2,75 @@
 
 import os
 import sys
-import re
 import json
 import logging
-import requests
-import pymysql
-import mysql.connector
-import google.generativeai as genai
-
-# Set your Gemini API key from environment variable
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-genai.configure(api_key=GEMINI_API_KEY)
 
 # Ensure project root is on sys.path so Tools.logs can be imported
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from Tools.logs import save_log   # save_log(log_type, message, process="Candidate_Parsing")
+from utils.db_utils import get_connection
+from utils.genai_client import get_genai
+from utils.resume_sections import segment_resume
+from utils.prompt_compaction import compact_resume_text
+from utils.llm_usage import record_llm_call
+from utils.metrics import LLM_CALLS, LLM_FAILURES, STAGE_ERRORS, stage_timer
+from config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Database configuration (expects environment variables)
-db_config = {
-    "host":     os.getenv("MYSQL_HOST", "localhost"),
-    "user":     os.getenv("MYSQL_USER", "root"),
-    "password": os.getenv("MYSQL_PASSWORD", ""),
-    "database": os.getenv("MYSQL_DATABASE", "LLM_Resume")
-}
-
 
 def _regex_extract_basic(resume_text: str) -> dict:
     """
     First-pass extraction using regex. Returns a dict with any fields found; missing fields remain None or empty.
+    Also returns "sections" (see utils.resume_sections.segment_resume) and "absent", the fields
+    the text cannot contain at all.
     """
-    details = {
-        "name": None,
-        "email": None,
-        "phone": None,
-        "linkedin_url": None,
-        "current_location": None,
-        "years_of_experience": None,
-        "education_level": None,
-        "last_position_title": None,
-        "skills": []
-    }
-
-    # 1) Email
-    m_email = re.search(r"[\w.+-]+@[\w-]+\.[\w.-]+", resume_text)
-    if m_email:
-        details["email"] = m_email.group(0).lower()
-
-    # 2) Phone (US‐style)
-    m_phone = re.search(
-        r"(\+?1[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}", resume_text
-    )
-    if m_phone:
-        details["phone"] = m_phone.group(0)
-
-    # 3) LinkedIn URL (plain) or href="..."
-    m_link = re.search(r"https?://(www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+", resume_text)
-    if m_link:
-        details["linkedin_url"] = m_link.group(0)
-    else:
-        # Try to catch href variants: <a href="https://linkedin.com/in/...">
-        m_href = re.search(r'href=["\'](https?://(www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+)["\']', resume_text, flags=re.IGNORECASE)
-        if m_href:
-            details["linkedin_url"] = m_href.group(1)
-
-    # 4) Name: look for first non‐empty line in Title Case
-    for line in resume_text.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        words = line.split()
-        if len(words) >= 2 and all(w[0].isupper() for w in words if w[0].isalpha()):
-            details["name"] = line
-            break
-
-    # 5) Years of Experience: e.g. “X years experience” or “X+ years”
-    m_yoe = re.search(r"(\d{1,2})\+?\s+years? (of )?experience", resume_text, flags=re.IGNORECASE)
-    if m_yoe:
-        try:
-            details["years_of_experience"] = int(m_yoe.group(1))
-        except:
-            pass
-
-    # 6) Education Level: look for common degree abbreviations
-    m_edu = re.search(
-        r"(Ph\.?D\.?|Doctorate|M\.?S\.?|MSc|MBA|B\.?S\.?|BA|BSc|"
-        r"M\.?A\.?|Master of Science|Master of Arts|Bachelor of Science|Bachelor of Arts)",
-        resume_text, flags=re.IGNORECASE
-    )
-    if m_edu:
-        details["education_level"] = m_edu.group(0)
-
-    # 7) Last Position Title: look for lines containing “Experience” then next non‐empty line
-    sections = resume_text.splitlines()
-    for idx, line in enumerate(sections):
-        if re.search(r"\bExperience\b|\bWork History\b|\bProfessional Experience\b", line, flags=re.IGNORECASE):
-            for next_line in sections[idx+1:]:
-                nl = next_line.strip()
-                if nl:
-                    details["last_position_title"] = nl
-                    break
-            break
-
-    # 8) Current Location: look for “City, State” pattern near top 10 lines
-    for line in sections[:10]:
-        m_loc = re.search(r"[A-Za-z]+,\s*[A-Z]{2}", line)
-        if m_loc:
-            details["current_location"] = m_loc.group(0)
-            break
-
-    # 9) Skills: look for a “Skills” section, then comma‐separated keywords
-    skills = []
-    for idx, line in enumerate(sections):
-        if re.search(r"\bSkills\b|\bTechnical Skills\b", line, flags=re.IGNORECASE):
-            for sub_line in sections[idx+1:]:
-                if not sub_line.strip():
-                    break
-                if re.search(r"\bExperience\b|\bWork History\b", sub_line, flags=re.IGNORECASE):
-                    break
-                parts = re.split(r"[,;]", sub_line)
-                for p in parts:
-                    p = p.strip()
-                    if p and len(p) < 40:
-                        skills.append(p)
-            break
-    details["skills"] = list(dict.fromkeys(skills))  # dedupe
-
-    return details
+    return segment_resume(resume_text)
 
 
 def extract_candidate_details(resume_text: str) -> dict:
     """
     Combined extraction: first try regex (_regex_extract_basic). If any of the nine fields
-    is still None (or empty list for skills), fall back to Gemini LLM for those missing pieces.
+    is still None (or empty list for skills), fall back to Gemini LLM for those missing pieces,
+    unless the text cannot contain them (e.g. no "@" anywhere means no email to find).
+    """
+    parsed, missing_fields = extract_regex_details(resume_text)
+    return fill_missing_details(resume_text, parsed, missing_fields)
+
+
+def extract_regex_details(resume_text: str):
+    """
+    The regex half of extract_candidate_details: returns (parsed, missing_fields), the fields
+    the LLM fallback still has to look for. Needs no API client, so it can run in a worker process.
     """
     # 1) First‐pass regex extraction
-    parsed = _regex_extract_basic(resume_text)
+    with stage_timer("regex_extract"):
+        parsed = _regex_extract_basic(resume_text)
+    absent = parsed.pop("absent", set())
 
-    # Build a list of fields that remain missing
+    # Build a list of fields that remain missing (skipping ones the text cannot contain)
     missing_fields = []
     for key in ("name", "email", "phone", "linkedin_url",
                 "current_location", "years_of_experience",
                 "education_level", "last_position_title", "skills"):
         val = parsed.get(key)
-        if val is None or (key == "skills" and not val):
+        if key not in absent and (val is None or (key == "skills" and not val)):
             missing_fields.append(key)
+    return parsed, missing_fields
+
 
+def fill_missing_details(resume_text: str, parsed: dict, missing_fields: list) -> dict:
+    """The Gemini half of extract_candidate_details: fills missing_fields of parsed in place."""
     if not missing_fields:
         # All fields found by regex, return immediately
         return parsed
 
-    # 2) Build a Gemini prompt asking only for missing fields
+    # 2) Build a Gemini prompt asking only for missing fields, over a cleaned and budgeted copy
+    # of the resume (the sections behind the missing fields first; long CVs are cut well before the end)
+    prompt_resume_text = compact_resume_text(resume_text, settings.PROMPT_BUDGET_EXTRACTION_TOKENS,
+                                             missing_fields=missing_fields)
     ask_fields = ", ".join(f'"{f}"' for f in missing_fields)
     prompt = f"""
 You are an AI assistant specialized in parsing resumes. Extract only the following fields (if present) in valid JSON format: {ask_fields}
@@ -176,7 +91,7 @@ Each missing field should be one of:
 
 Resume Text:
 \"\"\"
-{resume_text}
+{prompt_resume_text}
 \"\"\"
 
 Respond with only a JSON object containing exactly those keys (no extra commentary).
@@ -184,9 +99,12 @@ Respond with only a JSON object containing exactly those keys (no extra commenta
 
     try:
         # Use Gemini 2.0 Flash model for fast and cheap inference
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
+        model = get_genai().GenerativeModel("gemini-2.0-flash")
+        LLM_CALLS.inc("extraction")
+        with stage_timer("llm_extract"):
+            response = model.generate_content(prompt)
         raw = response.text.strip()
+        record_llm_call("extraction", prompt, response, raw)
         if raw.startswith("```json"):
             raw = raw[7:].strip("` \n")
         elif raw.startswith("```"):
@@ -204,6 +122,8 @@ Respond with only a JSON object containing exactly those keys (no extra commenta
             parsed["skills"] = []
 
     except Exception as e:
+        LLM_FAILURES.inc("extraction")
+        STAGE_ERRORS.inc("llm_extract")
         msg = f"Gemini request failed while extracting missing fields: {e}"
         logger.error(msg)
         save_log("ERROR", msg, process="Candidate_Parsing")
@@ -228,7 +148,7 @@ def upsert_candidate(cand_info: dict, resume_path: str) -> int:
     candidate_resume = resume_path
     candidate_company = cand_info.get("company", None)
 
-    conn = mysql.connector.connect(**db_config)
+    conn = get_connection()
     cursor = conn.cursor()
     try:
         sql = """
@@ -275,6 +195,76 @@ def upsert_candidate(cand_info: dict, resume_path: str) -> int:
         conn.close()
 
 
+BULK_CHUNK_SIZE = 500
+
+
+def upsert_candidates_bulk(cursor, candidates: list) -> dict:
+    """
+    Upserts many candidates on the caller's cursor (the caller owns the transaction).
+    `candidates` is a list of (cand_info, resume_path); entries without an email are skipped.
+    Uses one multi-row INSERT ... ON DUPLICATE KEY UPDATE per BULK_CHUNK_SIZE candidates and
+    resolves all candidate ids with one SELECT per chunk.
+    Returns {email: candidate_id}.
+    """
+    rows = {}
+    for cand_info, resume_path in candidates:
+        email = (cand_info.get("email") or "").lower().strip()
+        if not email:
+            continue
+        rows[email] = (
+            cand_info.get("name"),
+            email,
+            cand_info.get("phone"),
+            cand_info.get("current_location"),
+            cand_info.get("years_of_experience"),
+            cand_info.get("last_position_title"),
+            resume_path,
+            cand_info.get("company", None),
+        )
+    if not rows:
+        return {}
+
+    values = list(rows.values())
+    for start in range(0, len(values), BULK_CHUNK_SIZE):
+        chunk = values[start:start + BULK_CHUNK_SIZE]
+        placeholders = ", ".join(
+            ["(%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, NOW(), %s)"] * len(chunk)
+        )
+        cursor.execute(f"""
+        INSERT INTO `candidate`
+            (`candidate_name`, `candidate_email`, `candidate_phone`, `candidate_location`,
+             `candidate_year`, `candidate_job`, `candidate_resume`, `created_at`, `candidate_updated_time`, `candidate_company`)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            `candidate_name` = VALUES(`candidate_name`),
+            `candidate_phone` = VALUES(`candidate_phone`),
+            `candidate_location` = VALUES(`candidate_location`),
+            `candidate_year` = VALUES(`candidate_year`),
+            `candidate_job` = VALUES(`candidate_job`),
+            `candidate_resume` = VALUES(`candidate_resume`),
+            `candidate_updated_time` = NOW(),
+            `candidate_company` = VALUES(`candidate_company`)
+        """, [v for row in chunk for v in row])
+
+    return lookup_candidate_ids(cursor, list(rows.keys()))
+
+
+def lookup_candidate_ids(cursor, emails: list) -> dict:
+    """Returns {email: candidate_id} for the given emails, one SELECT per BULK_CHUNK_SIZE emails."""
+    emails = list(dict.fromkeys(e.lower().strip() for e in emails if e))
+    ids = {}
+    for start in range(0, len(emails), BULK_CHUNK_SIZE):
+        chunk = emails[start:start + BULK_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"SELECT candidate_email, candidate_id FROM candidate WHERE candidate_email IN ({placeholders})",
+            chunk
+        )
+        for email, candidate_id in cursor.fetchall():
+            ids[email.lower()] = candidate_id
+    return ids
+
+
 def save_score_to_jd_score(
     db_connection,
     jd_id,
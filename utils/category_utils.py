@@ -1,23 +1,16 @@
-import mysql.connector
-import os
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.db_utils import get_connection
 
 def get_or_create_category_id(name: str, type_field: str):
-    conn = mysql.connector.connect(
-        host=os.getenv('MYSQL_HOST', 'localhost'),
-        user=os.getenv('MYSQL_USER', 'root'),
-        password=os.getenv('MYSQL_PASSWORD', ''),
-        database=os.getenv('MYSQL_DATABASE', 'LLM_Resume')
-    )
-    cursor = conn.cursor()
-    # Try to find category
-    cursor.execute("SELECT category_id FROM category WHERE name=%s", (name,))
-    row = cursor.fetchone()
-    if row:
-        cat_id = row[0]
-    else:
-        cursor.execute("INSERT INTO category (name, type_field) VALUES (%s, %s)", (name, type_field))
-        conn.commit()
-        cat_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
+    with get_connection() as conn, conn.cursor() as cursor:
+        # Try to find category
+        cursor.execute("SELECT category_id FROM category WHERE name=%s", (name,))
+        row = cursor.fetchone()
+        if row:
+            cat_id = row[0]
+        else:
+            cursor.execute("INSERT INTO category (name, type_field) VALUES (%s, %s)", (name, type_field))
+            conn.commit()
+            cat_id = cursor.lastrowid
     return cat_id
\ No newline at end of file
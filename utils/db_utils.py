@@ -1,18 +1,274 @@
 # utils/db_utils.py
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+import time
+import weakref
 import mysql.connector
 from mysql.connector import Error
-from config import db_config
+from config import db_config, settings
+from utils.fork_safety import reset_lock_after_fork
+from utils.metrics import DB_ROUND_TRIPS, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Error):
+    """Raised when no pooled connection becomes available within the pool timeout."""
+
+
+READ_OPERATIONS = ("select", "show", "describe", "explain")
+
+
+def _operation(statement) -> str:
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    words = str(statement).split(None, 1)
+    return words[0].lower() if words else "unknown"
+
+
+class CountingCursor:
+    """
+    Cursor proxy that counts every statement sent (ats_db_round_trips_total) and times it as the
+    db_read or db_write stage. Everything else is forwarded to the real cursor.
+    """
+    def __init__(self, raw, connection=None):
+        self._raw = raw
+        self._connection = connection  # keeps the pooled connection alive while the cursor is in use
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._raw.close()
+
+    def _timed(self, method, operation, *args, **kwargs):
+        op = _operation(operation)
+        DB_ROUND_TRIPS.inc(op)
+        with STAGE_SECONDS.time("db_read" if op in READ_OPERATIONS else "db_write"):
+            return method(operation, *args, **kwargs)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._raw.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._raw.executemany, operation, *args, **kwargs)
+
+
+class PooledConnection:
+    """
+    Thin proxy around a mysql.connector connection checked out of a ConnectionPool.
+    close() hands the connection back to the pool instead of closing the socket; cursors and
+    commits are counted in the metrics registry; every other attribute is forwarded to the
+    real connection. A proxy garbage-collected without close() (an exception skipped it) gives
+    its slot back through a finalizer, closing the real connection rather than reusing it.
+    """
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._finalizer = weakref.finalize(self, pool._reclaim, raw)
+        self._finalizer.atexit = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return CountingCursor(self._raw.cursor(*args, **kwargs), self)
+
+    def commit(self):
+        DB_ROUND_TRIPS.inc("commit")
+        with STAGE_SECONDS.time("db_write"):
+            return self._raw.commit()
+
+    def close(self):
+        if self._finalizer.detach() is not None:  # only the first close() returns the connection
+            self._pool._release(self._raw, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections shared by every module in the process.
+
+    - At most `size` connections exist; callers wait up to `timeout` seconds for one to free up.
+    - Idle connections are pinged before reuse when they have been idle longer than `ping_interval`.
+    - Connections older than `recycle` seconds are closed and replaced instead of reused.
+    - Returned connections are rolled back if a transaction is still open.
+    """
+    def __init__(self, config: dict, size: int = 10, timeout: float = 30.0,
+                 recycle: float = 3600.0, ping_interval: float = 30.0):
+        self.config = config
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._idle = []  # (raw connection, created_at, returned_at)
+        self._open = 0
+        self._cond = threading.Condition()
+        # metrics
+        self.checkouts = 0
+        self.created = 0
+        self.recycled = 0
+        self.leaked = 0
+        self.health_check_failures = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.config)
+        with self._cond:
+            self.created += 1
+        return raw, time.monotonic()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def get(self) -> PooledConnection:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No MySQL connection available within {self.timeout}s (pool size {self.size})")
+                self._cond.wait(remaining)
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._open += 1  # reserve a slot for a new connection
+            self.checkouts += 1
+            if waited:
+                wait = time.monotonic() - start
+                self.waits += 1
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+        try:
+            if entry is not None:
+                raw, created_at, returned_at = entry
+                now = time.monotonic()
+                if now - created_at > self.recycle:
+                    self._discard(raw)
+                    with self._cond:
+                        self.recycled += 1
+                    raw, created_at = self._connect()
+                elif now - returned_at > self.ping_interval:
+                    try:
+                        raw.ping(reconnect=False)
+                    except Exception:
+                        self._discard(raw)
+                        with self._cond:
+                            self.health_check_failures += 1
+                        raw, created_at = self._connect()
+            else:
+                raw, created_at = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        healthy = True
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            healthy = False
+        with self._cond:
+            if healthy and time.monotonic() - created_at <= self.recycle:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+                self._discard(raw)
+            self._cond.notify()
+
+    def _reclaim(self, raw):
+        """Finalizer of a PooledConnection that was never closed: frees its slot."""
+        logger.warning("MySQL connection was not closed; reclaiming its pool slot")
+        with self._cond:
+            self.leaked += 1
+            self._open -= 1
+            self._cond.notify()
+        self._discard(raw)
+
+    def stats(self) -> dict:
+        with self._cond:
+            in_use = self._open - len(self._idle)
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": in_use,
+                "utilization": in_use / self.size,
+                "checkouts": self.checkouts,
+                "created": self.created,
+                "recycled": self.recycled,
+                "leaked": self.leaked,
+                "health_check_failures": self.health_check_failures,
+                "timeouts": self.timeouts,
+                "waits": self.waits,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_pool_lock")
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide pool, creating it on first use (and again after a fork)."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool(
+                    db_config,
+                    size=settings.DB_POOL_SIZE,
+                    timeout=settings.DB_POOL_TIMEOUT,
+                    recycle=settings.DB_POOL_RECYCLE_SECONDS,
+                    ping_interval=settings.DB_POOL_PING_INTERVAL,
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def get_pool_stats() -> dict:
+    return get_pool().stats()
+
 
 def get_connection():
     """
-    Returns a new MySQL connection using parameters from config.db_config.
-    Caller is responsible for closing the connection.
+    Returns a MySQL connection checked out of the shared pool (parameters from config.db_config).
+    Caller is responsible for closing the connection, which returns it to the pool.
     """
-    try:
-        conn = mysql.connector.connect(**db_config)
-        return conn
-    except Error as e:
-        # In a production system, log this error
-        raise
\ No newline at end of file
+    return get_pool().get()
@@ -1,57 +1,144 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import hashlib
+import json
+import logging
+import threading
+import time
 import numpy as np
 import faiss
-import mysql.connector
 from config import settings
-import google.generativeai as genai
-from google.genai import types
-from dotenv import load_dotenv
-load_dotenv()
 
 from utils.pdf_utils import read_pdf_content
+from utils.pdf_cache import content_hash
+from utils.sqlite_cache import SqliteCache
+from utils.ann_index import AnnIndex
+from utils.genai_client import get_genai
+from utils.resume_files import RESUMES_DIR, scan_resume_files
+from utils.db_utils import get_connection
+from utils.fork_safety import reset_lock_after_fork
+from utils.metrics import STAGE_ERRORS, count_cache, stage_timer
+
+logger = logging.getLogger(__name__)
 
 # Configure embedding model
 EMBEDDING_MODEL = os.getenv('GEMINI_EMBED_MODEL', 'embed-gecko')
 
 # Utility to call Gemini embeddings
 
+_embedding_cache = None
+def get_embedding_cache():
+    """Returns the process-wide embedding store, or None when disabled."""
+    global _embedding_cache
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    if _embedding_cache is None:
+        _embedding_cache = SqliteCache(settings.EMBEDDING_CACHE_PATH, max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES)
+    return _embedding_cache
+
+def embedding_cache_key(text: str, model: str = None) -> str:
+    """Cache key for an embedding. It includes the model so vectors from different models never mix."""
+    return f"{model or EMBEDDING_MODEL}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+def _embed_uncached(texts: list) -> np.ndarray:
+    rows = []
+    batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+    for start in range(0, len(texts), batch_size):
+        chunk = list(texts[start:start + batch_size])
+        try:
+            with stage_timer("embedding"):
+                resp = get_genai().embed_content(
+                    model=EMBEDDING_MODEL,
+                    content=chunk,
+                    task_type="semantic_similarity"
+                )
+        except Exception:
+            STAGE_ERRORS.inc("embedding")
+            raise
+        embeddings = resp.get('embedding')
+        if not embeddings or len(embeddings) != len(chunk):
+            raise ValueError(
+                f"Expected {len(chunk)} embeddings, got {len(embeddings) if embeddings else 0}"
+            )
+        rows.extend(embeddings)
+    matrix = np.array(rows, dtype='float32')
+    if matrix.ndim != 2 or matrix.shape[1] == 0:
+        raise ValueError(f"Empty embedding returned for {len(texts)} input(s)")
+    # Normalize for cosine similarity
+    faiss.normalize_L2(matrix)
+    return matrix
+
+def embed_texts(texts: list) -> np.ndarray:
+    """
+    Returns an (n, dim) float32 matrix of L2-normalized embeddings, one row per input text.
+    Vectors are looked up in the embedding cache first; only unseen texts are sent to the
+    API, in chunks of EMBEDDING_BATCH_SIZE texts per request.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype='float32')
+    cache = get_embedding_cache()
+    if cache is None:
+        return _embed_uncached(texts)
+
+    keys = [embedding_cache_key(t) for t in texts]
+    vectors = {k: np.frombuffer(v, dtype='float32') for k, v in cache.get_many(keys).items()}
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    count_cache("embedding", len(keys) - len(missing), len(missing))
+    if missing:
+        fresh = _embed_uncached(list(missing.values()))
+        fresh_by_key = dict(zip(missing.keys(), fresh))
+        cache.put_many({k: v.tobytes() for k, v in fresh_by_key.items()})
+        vectors.update(fresh_by_key)
+    return np.vstack([vectors[k] for k in keys]).astype('float32', copy=False)
+
 def embed_text(text: str) -> np.ndarray:
     """
     Returns an L2-normalized embedding vector for the given text.
     """
-    resp = genai.embed_content(
-        model=EMBEDDING_MODEL,
-        content=text,
-        task_type="semantic_similarity"
-    )
-    print(f"Embedding response: {resp}")
-    embedding = resp.get('embedding')
-    print(f"Vector shape: {np.array(embedding).shape}")
-    if embedding is None or not embedding:
-        raise ValueError(f"Failed to get embedding for: {text}\nResponse: {resp}")
-    vector = np.array(embedding, dtype='float32')
-    if vector.shape == () or vector.shape[0] == 0:
-        raise ValueError(f"Empty embedding returned for input: '{text}'")
-    # Normalize for cosine similarity
-    vector_2d = vector.reshape(1, -1)
-    faiss.normalize_L2(vector_2d)
-    vector = vector_2d.flatten()
-    return vector
+    return embed_texts([text])[0]
+
+def ann_index_options(kind: str) -> dict:
+    """AnnIndex kind and build/search parameters from settings."""
+    return {
+        "kind": kind,
+        "nlist": settings.ANN_NLIST,
+        "nprobe": settings.ANN_NPROBE,
+        "pq_m": settings.ANN_PQ_M,
+        "hnsw_m": settings.ANN_HNSW_M,
+        "ef_construction": settings.ANN_EF_CONSTRUCTION,
+        "ef_search": settings.ANN_EF_SEARCH,
+    }
+
 
 class CategoryIndex:
     """
-    FAISS index for category name embeddings.
+    FAISS index for category name embeddings (backend from CATEGORY_INDEX_TYPE).
     """
-    def __init__(self, dimension: int):
+    def __init__(self, dimension: int, index_options: dict = None):
         self.dimension = dimension
-        self.index = faiss.IndexFlatIP(dimension)
+        options = index_options or ann_index_options(settings.CATEGORY_INDEX_TYPE if dimension else "flat")
+        self.index = AnnIndex(dimension, **options)
         self.id_map = []  # maps index positions to category_id
+        self.names = {}  # category_id -> category name
 
-    def add(self, category_id: int, vector: np.ndarray):
-        self.index.add(vector[np.newaxis, :])
+    def add(self, category_id: int, vector: np.ndarray, name: str = None):
+        self.index.add_with_ids(vector[np.newaxis, :], np.array([len(self.id_map)], dtype='int64'))
         self.id_map.append(category_id)
+        if name is not None:
+            self.names[category_id] = name
+
+    def add_batch(self, category_ids: list, vectors: np.ndarray, names: list = None):
+        start = len(self.id_map)
+        self.index.add_with_ids(vectors, np.arange(start, start + len(category_ids), dtype='int64'))
+        self.id_map.extend(category_ids)
+        if names is not None:
+            self.names.update(zip(category_ids, names))
+        # Category sets are small and loaded in one go: train IVF kinds now rather than waiting
+        self.index.train()
 
     def search(self, vector: np.ndarray, k: int = 2):
         """
@@ -59,112 +146,360 @@ class CategoryIndex:
         """
         if self.index.ntotal == 0:
             return []
-        scores, idxs = self.index.search(vector[np.newaxis, :], k)
+        with stage_timer("faiss_search"):
+            scores, idxs = self.index.search(vector, k)
         results = []
         for score, idx in zip(scores[0], idxs[0]):
-            if idx < len(self.id_map):
+            if 0 <= idx < len(self.id_map):
                 results.append((self.id_map[idx], float(score)))
         return results
 
 # Load CategoryIndex from DB
 
 def load_category_index() -> CategoryIndex:
-    conn = mysql.connector.connect(**{
-        'host': os.getenv('MYSQL_HOST', 'localhost'),
-        'user': os.getenv('MYSQL_USER', 'root'),
-        'password': os.getenv('MYSQL_PASSWORD', ''),
-        'database': os.getenv('MYSQL_DATABASE', 'LLM_Resume')
-    })
-    cursor = conn.cursor()
-    cursor.execute("SELECT category_id, name FROM category")
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT category_id, name FROM category")
+        rows = cursor.fetchall()
 
     if not rows:
         return CategoryIndex(dimension=0)
-    # Embed first name to set dimension
-    first_vec = embed_text(rows[0][1])
-    dim = first_vec.shape[0]
-    idx = CategoryIndex(dim)
-    for cid, name in rows:
-        vec = embed_text(name)
-        idx.add(cid, vec)
+    vectors = embed_texts([name for _, name in rows])
+    idx = CategoryIndex(vectors.shape[1])
+    idx.add_batch([cid for cid, _ in rows], vectors, names=[name for _, name in rows])
     return idx
 
 _category_index = None
+_category_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_category_lock")
 def get_category_index():
     global _category_index
     if _category_index is None:
-        try:
-            _category_index = load_category_index()
-        except Exception:
-            _category_index = None
+        with _category_lock:  # the warm-up thread and a first request must not both build it
+            if _category_index is None:
+                try:
+                    _category_index = load_category_index()
+                except Exception:
+                    _category_index = None
     return _category_index
 
 # --------- Resume Index ----------
 class ResumeIndex:
     """
     FAISS index for resume embeddings.
+
+    Vectors are stored under stable int64 ids in an AnnIndex (backend from RESUME_INDEX_TYPE), so
+    single resumes can be removed or replaced without rebuilding. `manifest` records, per resume path relative to the
+    resumes directory, its id, size, mtime and content hash; it is saved next to the index so a
+    restart can load both and only re-embed resumes that changed. `skipped` records the resumes
+    a refresh tried but could not index (unreadable, no text, embedding failed) with their size
+    and mtime, so they are not read again until they change (see attempted()).
+
+    All resumes share one index; a query limited to some folder or set of files (search_within)
+    is answered from it with an ID filter, so a folder never needs an index of its own. Index
+    changes and searches are serialised by a lock, so the live index can be refreshed in place.
     """
-    def __init__(self, dimension: int):
+    INDEX_FILE = "resume.index"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, dimension: int, index_options: dict = None):
         self.dimension = dimension
-        self.index = faiss.IndexFlatIP(dimension)
-        self.id_map = []  # maps index positions to resume file paths
+        options = index_options or ann_index_options(settings.RESUME_INDEX_TYPE if dimension else "flat")
+        self.index = AnnIndex(dimension, **options)
+        self.id_map = {}  # maps faiss ids to resume file paths
+        self.path_ids = {}  # resume file path -> faiss id
+        self.manifest = {}  # relative path -> {"id", "size", "mtime", "sha256"}
+        self.skipped = {}  # relative path -> {"size", "mtime", "reason"[, "retry_at"]}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        reset_lock_after_fork(self, factory=threading.RLock)
+
+    def add(self, file_path: str, vector: np.ndarray, rel_path: str = None, file_meta: dict = None):
+        with self._lock:
+            vec_id = self._next_id
+            self._next_id += 1
+            self.index.add_with_ids(vector[np.newaxis, :], np.array([vec_id], dtype='int64'))
+            self._track(vec_id, file_path)
+            if rel_path is not None:
+                self.manifest[rel_path] = dict(file_meta or {}, id=vec_id)
+            return vec_id
+
+    def add_batch(self, file_paths: list, vectors: np.ndarray, rel_paths: list = None, file_metas: list = None):
+        """Adds many resumes with a single index.add call."""
+        with self._lock:
+            ids = np.arange(self._next_id, self._next_id + len(file_paths), dtype='int64')
+            self._next_id += len(file_paths)
+            self.index.add_with_ids(vectors, ids)
+            for i, (vec_id, file_path) in enumerate(zip(ids.tolist(), file_paths)):
+                self._track(vec_id, file_path)
+                if rel_paths is not None:
+                    meta = file_metas[i] if file_metas else {}
+                    self.manifest[rel_paths[i]] = dict(meta, id=vec_id)
+            return ids
+
+    def remove(self, rel_path: str):
+        with self._lock:
+            entry = self.manifest.pop(rel_path, None)
+            if entry is None:
+                return
+            self.index.remove_ids(np.array([entry["id"]], dtype='int64'))
+            path = self.id_map.pop(entry["id"], None)
+            if path is not None and self.path_ids.get(os.path.abspath(path)) == entry["id"]:
+                del self.path_ids[os.path.abspath(path)]
 
-    def add(self, file_path: str, vector: np.ndarray):
-        self.index.add(vector[np.newaxis, :])
-        self.id_map.append(file_path)
+    def attempted(self, rel_path: str, st: os.stat_result) -> bool:
+        """True when the resume, at this size and mtime, could not be indexed and is not due for a retry."""
+        entry = self.skipped.get(rel_path)
+        return (entry is not None and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime
+                and entry.get("retry_at", float("inf")) > time.time())
+
+    def _track(self, vec_id: int, file_path: str):
+        self.id_map[vec_id] = file_path
+        self.path_ids[os.path.abspath(file_path)] = vec_id
 
     def search(self, vector: np.ndarray, k: int = 5):
         """
-        Returns list of (file_path, score) for top k resumes.
+        Returns list of (file_path, score) for top k resumes. Given a 2-D array of several query
+        vectors, searches them in one batch and returns one such list per query.
         """
+        batched = vector.ndim == 2
+        queries = vector if batched else vector[np.newaxis, :]
         if self.index.ntotal == 0:
-            return []
-        scores, idxs = self.index.search(vector[np.newaxis, :], k)
-        results = []
-        for score, idx in zip(scores[0], idxs[0]):
-            if idx < len(self.id_map):
-                results.append((self.id_map[idx], float(score)))
-        return results
+            return [[] for _ in queries] if batched else []
+        with self._lock, stage_timer("faiss_search"):
+            scores, idxs = self.index.search(queries, k)
+            results = [
+                [(self.id_map[idx], float(score)) for score, idx in zip(row_scores, row_idxs) if idx in self.id_map]
+                for row_scores, row_idxs in zip(scores, idxs)
+            ]
+        return results if batched else results[0]
+
+    def search_within(self, vector: np.ndarray, paths: list, k: int, min_score: float = None):
+        """
+        Top k resumes among the given absolute paths (e.g. one resume folder), as (file_path, score)
+        best first, keeping only scores >= min_score when set. The shared index is searched with
+        an ID filter, so only those resumes are scored.
+        Returns (results, unindexed) where unindexed lists the paths the index does not know.
+        """
+        with self._lock:
+            allowed, unindexed = [], []
+            for p in paths:
+                vec_id = self.path_ids.get(os.path.abspath(p))
+                if vec_id is None:
+                    unindexed.append(p)
+                else:
+                    allowed.append(vec_id)
+            if not allowed or k <= 0:
+                return [], unindexed
+            with stage_timer("faiss_search"):
+                scores, idxs = self.index.search(vector, k, allowed_ids=allowed)
+            results = [
+                (self.id_map[idx], float(score)) for score, idx in zip(scores[0], idxs[0].tolist())
+                if idx in self.id_map and (min_score is None or score >= min_score)
+            ]
+            return results, unindexed
+
+    def save(self, directory: str):
+        """Atomically writes the FAISS index and its manifest into directory."""
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, self.INDEX_FILE)
+        manifest_path = os.path.join(directory, self.MANIFEST_FILE)
+        with self._lock, open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            self.index.save(index_path)
+            json.dump({
+                "dimension": self.dimension,
+                "next_id": self._next_id,
+                "index": self.index.config(),
+                "deleted": self.index.tombstones,
+                "files": self.manifest,
+                "skipped": self.skipped,
+            }, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    @classmethod
+    def load(cls, directory: str, resumes_dir: str):
+        """
+        Loads an index saved by save(). Returns None when nothing usable is on disk, including
+        when the index and manifest disagree (e.g. a crash between the two writes).
+        """
+        index_path = os.path.join(directory, cls.INDEX_FILE)
+        manifest_path = os.path.join(directory, cls.MANIFEST_FILE)
+        if not (os.path.exists(index_path) and os.path.exists(manifest_path)):
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        idx = cls(data["dimension"])
+        saved = data.get("index", {"kind": "flat"})
+        wanted = idx.index.config()
+        build_keys = ("kind", "nlist", "pq_m", "pq_nbits", "hnsw_m", "ef_construction")
+        if any(saved.get(key, wanted[key]) != wanted[key] for key in build_keys):
+            logger.warning(f"Resume index was built as {saved.get('kind')} with other parameters; rebuilding")
+            return None
+        idx.index = AnnIndex.load(index_path, data["dimension"], dict(wanted, train_size=saved.get("train_size")),
+                                  deleted=data.get("deleted"))
+        if idx.index.ntotal != len(data["files"]):
+            logger.warning("Resume index and manifest disagree; rebuilding")
+            return None
+        idx.manifest = data["files"]
+        idx.skipped = data.get("skipped", {})
+        idx._next_id = data["next_id"]
+        for rel_path, entry in idx.manifest.items():
+            idx._track(entry["id"], os.path.abspath(os.path.join(resumes_dir, rel_path)))
+        return idx
+
+
+def refresh_resume_index(idx: ResumeIndex, resumes_dir: str, rel_paths: list = None):
+    """
+    Brings idx in line with the PDFs under resumes_dir: embeds added or changed resumes and
+    removes deleted ones. A resume whose size and mtime match the manifest is not even read;
+    one whose bytes hash to the recorded sha256 is not re-embedded. A resume that cannot be
+    indexed is recorded in idx.skipped and left alone until it changes (or, after an embedding
+    failure, for RESUME_INDEX_RETRY_SECONDS). With rel_paths, only those resumes are checked.
+    Texts are embedded before idx is touched, so a failed embedding call leaves it as it was.
+    Returns (idx, changed) - idx may be a new object if it had no dimension yet.
+    """
+    if rel_paths is None:
+        files = scan_resume_files(resumes_dir)
+        gone = [p for p in list(idx.manifest) + list(idx.skipped) if p not in files]
+    else:
+        files, gone = {}, []
+        for rel_path in rel_paths:
+            try:
+                files[rel_path] = os.stat(os.path.join(resumes_dir, rel_path))
+            except OSError:
+                gone.append(rel_path)
+    changed = False
+
+    for rel_path in gone:
+        if idx.skipped.pop(rel_path, None) is not None:
+            changed = True
+        if rel_path in idx.manifest:
+            idx.remove(rel_path)
+            changed = True
+
+    def skip(rel_path, st, reason, retry=False):
+        idx.skipped[rel_path] = {"size": st.st_size, "mtime": st.st_mtime, "reason": reason}
+        if retry:
+            idx.skipped[rel_path]["retry_at"] = time.time() + settings.RESUME_INDEX_RETRY_SECONDS
+
+    pending = []  # (rel_path, abs_path, meta, text, stat) still to embed
+    for rel_path, st in sorted(files.items()):
+        entry = idx.manifest.get(rel_path)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            continue
+        if idx.attempted(rel_path, st):
+            continue
+        abs_path = os.path.abspath(os.path.join(resumes_dir, rel_path))
+        try:
+            with open(abs_path, 'rb') as f:
+                file_bytes = f.read()
+            meta = {"size": st.st_size, "mtime": st.st_mtime, "sha256": content_hash(file_bytes)}
+            if entry and entry.get("sha256") == meta["sha256"]:
+                entry.update(meta)  # touched but unchanged
+                changed = True
+                continue
+            text = read_pdf_content(file_bytes)
+        except Exception as e:
+            logger.warning(f"Skipping resume '{abs_path}' in index refresh: {e}")
+            skip(rel_path, st, "unreadable")
+            changed = True
+            continue
+        if not text.strip():
+            logger.warning(f"Skipping resume '{abs_path}' in index refresh: no text")
+            skip(rel_path, st, "no text")
+            changed = True
+            continue
+        pending.append((rel_path, abs_path, meta, text, st))
+
+    if not pending:
+        return idx, changed
+    try:
+        vectors = embed_texts([text for _, _, _, text, _ in pending])
+    except Exception as e:
+        logger.warning(f"Embedding {len(pending)} resumes for index refresh failed: {e}")
+        for rel_path, _, _, _, st in pending:
+            skip(rel_path, st, "embedding failed", retry=True)
+        return idx, True
+    if idx.dimension == 0:
+        fresh = ResumeIndex(vectors.shape[1])
+        fresh.skipped = idx.skipped
+        idx = fresh
+    for rel_path, _, _, _, _ in pending:
+        idx.remove(rel_path)
+        idx.skipped.pop(rel_path, None)
+    idx.add_batch(
+        [abs_path for _, abs_path, _, _, _ in pending],
+        vectors,
+        rel_paths=[rel_path for rel_path, _, _, _, _ in pending],
+        file_metas=[meta for _, _, meta, _, _ in pending],
+    )
+    return idx, True
 
-# Load ResumeIndex from local resumes directory
+
+# Load ResumeIndex from local resumes directory (RESUMES_DIR)
 
 def load_resume_index() -> ResumeIndex:
-    resumes_dir = os.path.join(os.path.dirname(__file__), '../resumes')
-    pdf_paths = []
-    for root, _, files in os.walk(resumes_dir):
-        for f in files:
-            if f.lower().endswith('.pdf'):
-                pdf_paths.append(os.path.join(root, f))
-    if not pdf_paths:
-        return ResumeIndex(dimension=0)
-    # Embed first resume to set dimension
+    """
+    Loads the persisted resume index (if any) and incrementally refreshes it against the
+    resumes directory, saving it back when anything changed.
+    """
+    resumes_dir = RESUMES_DIR
+    idx = None
     try:
-        with open(pdf_paths[0], 'rb') as f:
-            text = read_pdf_content(f.read())
-        first_vec = embed_text(text)
-        dim = first_vec.shape[0]
-    except Exception:
-        return ResumeIndex(dimension=0)
-    idx = ResumeIndex(dim)
-    for path in pdf_paths:
+        idx = ResumeIndex.load(settings.RESUME_INDEX_DIR, resumes_dir)
+    except Exception as e:
+        logger.warning(f"Could not load persisted resume index: {e}")
+    if idx is None:
+        idx = ResumeIndex(dimension=0)
+    idx, changed = refresh_resume_index(idx, resumes_dir)
+    if changed and idx.dimension:
         try:
-            with open(path, 'rb') as f:
-                text = read_pdf_content(f.read())
-            vec = embed_text(text)
-            idx.add(path, vec)
-        except Exception:
-            continue
+            idx.save(settings.RESUME_INDEX_DIR)
+        except Exception as e:
+            logger.warning(f"Could not persist resume index: {e}")
     return idx
 
 _resume_index = None
+_resume_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_resume_lock")
 def get_resume_index():
     global _resume_index
     if _resume_index is None:
-        try:
-            _resume_index = load_resume_index()
-        except Exception:
-            _resume_index = None
+        with _resume_lock:
+            if _resume_index is None:
+                try:
+                    _resume_index = load_resume_index()
+                except Exception:
+                    _resume_index = None
     return _resume_index
+
+def reload_resume_index(paths: list = None):
+    """
+    Re-syncs the in-memory resume index with the resumes directory, or with just the given
+    resume paths (absolute, under RESUMES_DIR): new or changed files are embedded into the live
+    index, deleted ones removed, and the result is saved. If anything fails the current index is
+    kept as it was.
+    """
+    global _resume_index
+    idx = get_resume_index()
+    if idx is None:
+        return None
+    rel_paths = None
+    if paths is not None:
+        rel_paths = [os.path.relpath(os.path.abspath(p), RESUMES_DIR) for p in paths
+                     if os.path.abspath(p).startswith(RESUMES_DIR + os.sep)]
+        if not rel_paths:
+            return idx
+    with _resume_lock:
+        idx = _resume_index or idx
+        try:
+            refreshed, changed = refresh_resume_index(idx, RESUMES_DIR, rel_paths)
+        except Exception as e:
+            logger.warning(f"Resume index refresh failed; keeping the current index: {e}")
+            return idx
+        if changed and refreshed.dimension:
+            try:
+                refreshed.save(settings.RESUME_INDEX_DIR)
+            except Exception as e:
+                logger.warning(f"Could not persist resume index: {e}")
+        _resume_index = refreshed
+    return refreshed
@@ -0,0 +1,50 @@
+# utils/fork_safety.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+_owners = {}  # id(owner) -> (weak reference to owner, {attr: lock factory})
+_owners_lock = threading.RLock()  # RLock: a weakref callback may run while this thread holds it
+
+
+def _forget(ref, key):
+    with _owners_lock:
+        entry = _owners.get(key)
+        if entry is not None and entry[0] is ref:
+            del _owners[key]
+
+
+def _reset_all():
+    global _owners_lock
+    _owners_lock = threading.RLock()
+    for ref, attrs in list(_owners.values()):
+        target = ref()
+        if target is not None:
+            for attr, factory in attrs.items():
+                setattr(target, attr, factory())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_all)
+
+
+def reset_lock_after_fork(owner, attr: str = "_lock", factory=threading.Lock):
+    """
+    Gives owner (an object, or a module for a module-level lock) a fresh lock named attr in every
+    forked child. fork() copies a lock another thread holds at that moment (the warm-up thread
+    building an index, a request writing a cache) as locked with no owner, so the child would
+    block on it forever; gunicorn --preload workers are forked children.
+    Owners are held weakly in one registry served by a single fork hook, so registering
+    short-lived objects (caches, indexes) does not pile up hooks.
+    """
+    key = id(owner)
+    with _owners_lock:
+        entry = _owners.get(key)
+        if entry is None or entry[0]() is not owner:
+            entry = _owners[key] = (weakref.ref(owner, lambda ref, key=key: _forget(ref, key)), {})
+        entry[1][attr] = factory
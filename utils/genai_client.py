@@ -0,0 +1,27 @@
+# utils/genai_client.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+from config import settings
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+_genai = None
+_genai_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_genai_lock")
+def get_genai():
+    """
+    Returns the google.generativeai module, importing it and configuring it with GEMINI_API_KEY
+    on first use. This is the only place the SDK is set up; its import takes most of a second,
+    so nothing loads it at startup.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _genai = genai
+    return _genai
@@ -0,0 +1,289 @@
+# utils/lexical_index.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from config import settings
+from utils.resume_files import RESUMES_DIR, scan_resume_files
+from utils.fork_safety import reset_lock_after_fork
+from utils.metrics import stage_timer
+from utils.pdf_cache import content_hash
+from utils.pdf_utils import read_pdf_content
+
+logger = logging.getLogger(__name__)
+
+# Keeps "c++", "c#" and "node.js"-style terms whole; trailing dots are sentence punctuation
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our that the their this to
+was were will with you your we they he she i my me who what which while within across per via
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lowercased terms of text, without stopwords."""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over extracted resume text.
+
+    Each resume is a document of term frequencies (`docs`, the forward index) under a stable int
+    id; `postings` maps term -> {doc id: tf} and is rebuilt from `docs` on load. `manifest` has
+    the same shape as ResumeIndex's (relative path -> id, size, mtime, sha256), so refreshes only
+    re-read resumes that changed. Needs no API calls, so it keeps ranking when the LLM and
+    embedding quotas are exhausted.
+    """
+    FILE_VERSION = 1
+
+    def __init__(self, k1: float = None, b: float = None):
+        self.k1 = settings.BM25_K1 if k1 is None else k1
+        self.b = settings.BM25_B if b is None else b
+        self.docs = {}  # doc id -> {term: tf}
+        self.doc_len = {}  # doc id -> number of terms
+        self.postings = {}  # term -> {doc id: tf}
+        self.id_map = {}  # doc id -> resume file path
+        self.path_ids = {}  # resume file path -> doc id
+        self.manifest = {}  # relative path -> {"id", "size", "mtime", "sha256"}
+        self.total_len = 0
+        self._next_id = 0
+        self._lock = threading.RLock()  # refreshes may run while another request ranks
+        reset_lock_after_fork(self, factory=threading.RLock)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, file_path: str, text: str, rel_path: str = None, file_meta: dict = None) -> int:
+        tf = Counter(tokenize(text))
+        with self._lock:
+            return self._insert(self._next_id, file_path, tf, rel_path, file_meta)
+
+    def _insert(self, doc_id: int, file_path: str, tf: dict, rel_path: str = None, file_meta: dict = None) -> int:
+        self._next_id = max(self._next_id, doc_id + 1)
+        self.docs[doc_id] = dict(tf)
+        self.doc_len[doc_id] = sum(tf.values())
+        self.total_len += self.doc_len[doc_id]
+        for term, count in tf.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        self.id_map[doc_id] = file_path
+        self.path_ids[os.path.abspath(file_path)] = doc_id
+        if rel_path is not None:
+            self.manifest[rel_path] = dict(file_meta or {}, id=doc_id)
+        return doc_id
+
+    def remove(self, rel_path: str):
+        with self._lock:
+            self._delete(rel_path)
+
+    def replace(self, file_path: str, text: str, rel_path: str, file_meta: dict = None) -> int:
+        """Removes the resume's previous document (if any) and adds text in its place, atomically."""
+        tf = Counter(tokenize(text))
+        with self._lock:
+            self._delete(rel_path)
+            return self._insert(self._next_id, file_path, tf, rel_path, file_meta)
+
+    def _delete(self, rel_path: str):
+        entry = self.manifest.pop(rel_path, None)
+        if entry is None:
+            return
+        doc_id = entry["id"]
+        for term in self.docs.pop(doc_id, {}):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(doc_id, 0)
+        path = self.id_map.pop(doc_id, None)
+        if path is not None and self.path_ids.get(os.path.abspath(path)) == doc_id:
+            del self.path_ids[os.path.abspath(path)]
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def search(self, terms: list, k: int = None, paths: list = None):
+        """
+        BM25 top k documents for the query terms (repeats weigh a term more), best first, as
+        (file_path, score); documents matching no term are left out. With paths, only those
+        resumes are ranked. Returns (results, unindexed) where unindexed lists the given paths
+        the index does not know.
+        """
+        with self._lock:
+            return self._search(terms, k, paths)
+
+    def _search(self, terms, k, paths):
+        query = Counter(t for t in terms if t in self.postings)
+        unindexed, allowed = [], None
+        if paths is not None:
+            allowed = set()
+            for p in paths:
+                doc_id = self.path_ids.get(os.path.abspath(p))
+                if doc_id is None:
+                    unindexed.append(p)
+                else:
+                    allowed.add(doc_id)
+        if not query or not self.docs or (allowed is not None and not allowed):
+            return [], unindexed
+        with stage_timer("bm25_search"):
+            scores = self._scores(query, allowed)
+            best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            if k:
+                best = best[:k]
+        return [(self.id_map[doc_id], score) for doc_id, score in best], unindexed
+
+    def _scores(self, query: Counter, allowed: set = None) -> dict:
+        avgdl = self.total_len / len(self.docs) or 1.0
+        k1, b = self.k1, self.b
+        doc_len = self.doc_len
+        norms = {}  # doc id -> BM25 length normalisation, computed once per query
+        scores = {}
+        # Walk whichever is shorter: the query terms' postings, or the allowed documents' terms
+        posting_cost = sum(len(self.postings[term]) for term in query)
+        if allowed is not None and len(allowed) * len(query) < posting_cost:
+            pairs = ((term, ((doc_id, self.docs[doc_id].get(term)) for doc_id in allowed)) for term in query)
+        else:
+            pairs = ((term, self.postings[term].items()) for term in query)
+        for term, postings in pairs:
+            weight = query[term] * self.idf(term) * (k1 + 1)
+            for doc_id, tf in postings:
+                if not tf or (allowed is not None and doc_id not in allowed):
+                    continue
+                norm = norms.get(doc_id)
+                if norm is None:
+                    norm = norms[doc_id] = k1 * (1 - b + b * doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf / (tf + norm)
+        return scores
+
+    def matched_terms(self, file_path: str, terms: list) -> list:
+        """The query terms that occur in the given resume, in query order."""
+        with self._lock:
+            doc = self.docs.get(self.path_ids.get(os.path.abspath(file_path)), {})
+            return [t for t in dict.fromkeys(terms) if t in doc]
+
+    def save(self, path: str):
+        """
+        Atomically writes the forward index and manifest to one JSON file. Only taking the
+        snapshot holds the lock (term-frequency dicts are never changed in place), so searches
+        and refreshes are not blocked while it is written.
+        """
+        with self._lock:
+            snapshot = {
+                "version": self.FILE_VERSION,
+                "next_id": self._next_id,
+                "files": {rel_path: dict(entry) for rel_path, entry in self.manifest.items()},
+                "docs": dict(self.docs),
+            }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str, resumes_dir: str):
+        """Loads an index saved by save(); None when nothing usable is on disk."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != cls.FILE_VERSION:
+            return None
+        idx = cls()
+        docs = {int(doc_id): tf for doc_id, tf in data["docs"].items()}
+        for rel_path, entry in data["files"].items():
+            tf = docs.get(entry["id"])
+            if tf is None:
+                logger.warning("Lexical index and manifest disagree; rebuilding")
+                return None
+            idx._insert(entry["id"], os.path.abspath(os.path.join(resumes_dir, rel_path)), tf, rel_path, entry)
+        idx._next_id = max(idx._next_id, data.get("next_id", 0))
+        return idx
+
+
+def refresh_lexical_index(idx: LexicalIndex, resumes_dir: str, rel_paths: list = None):
+    """
+    Brings idx in line with the PDFs under resumes_dir, the way refresh_resume_index does: only
+    added or changed resumes are read (through the PDF text cache) and deleted ones are removed.
+    With rel_paths, only those resumes are checked. Returns True when anything changed.
+    """
+    if rel_paths is None:
+        files = scan_resume_files(resumes_dir)
+        gone = [p for p in idx.manifest if p not in files]
+    else:
+        files, gone = {}, []
+        for rel_path in rel_paths:
+            try:
+                files[rel_path] = os.stat(os.path.join(resumes_dir, rel_path))
+            except OSError:
+                gone.append(rel_path)
+    changed = False
+    for rel_path in gone:
+        if rel_path in idx.manifest:
+            idx.remove(rel_path)
+            changed = True
+
+    for rel_path, st in sorted(files.items()):
+        entry = idx.manifest.get(rel_path)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime:
+            continue
+        abs_path = os.path.abspath(os.path.join(resumes_dir, rel_path))
+        try:
+            with open(abs_path, 'rb') as f:
+                file_bytes = f.read()
+            meta = {"size": st.st_size, "mtime": st.st_mtime, "sha256": content_hash(file_bytes)}
+            if entry and entry.get("sha256") == meta["sha256"]:
+                entry.update(meta)  # touched but unchanged
+                changed = True
+                continue
+            text = read_pdf_content(file_bytes)
+        except Exception as e:
+            logger.warning(f"Skipping resume '{abs_path}' in lexical index refresh: {e}")
+            continue
+        idx.replace(abs_path, text, rel_path, file_meta=meta)
+        changed = True
+    return changed
+
+
+_lexical_index = None
+_lexical_lock = threading.Lock()
+_save_lock = threading.Lock()  # one writer of LEXICAL_INDEX_PATH at a time
+reset_lock_after_fork(sys.modules[__name__], "_lexical_lock")
+reset_lock_after_fork(sys.modules[__name__], "_save_lock")
+def get_lexical_index(paths: list = None) -> LexicalIndex:
+    """
+    Returns the process-wide lexical index over RESUMES_DIR, loading (and refreshing) it on
+    first use. Given resume paths, first brings just those up to date, so a ranking request
+    sees resumes added or changed since the last call. Changes are saved to LEXICAL_INDEX_PATH.
+    Only the first load holds the module lock; refreshes go through the index's own lock, and
+    saving writes a snapshot without holding either.
+    """
+    global _lexical_index
+    idx, changed = _lexical_index, False
+    if idx is None:
+        with _lexical_lock:
+            idx = _lexical_index
+            if idx is None:
+                try:
+                    idx = LexicalIndex.load(settings.LEXICAL_INDEX_PATH, RESUMES_DIR)
+                except Exception as e:
+                    logger.warning(f"Could not load persisted lexical index: {e}")
+                idx = idx or LexicalIndex()
+                changed = refresh_lexical_index(idx, RESUMES_DIR)
+                _lexical_index = idx
+                paths = None  # just refreshed in full
+    rel_paths = [os.path.relpath(os.path.abspath(p), RESUMES_DIR) for p in paths or ()
+                 if os.path.abspath(p).startswith(RESUMES_DIR + os.sep)]
+    if rel_paths:
+        changed = refresh_lexical_index(idx, RESUMES_DIR, rel_paths) or changed
+    if changed:
+        try:
+            with _save_lock:
+                idx.save(settings.LEXICAL_INDEX_PATH)
+        except Exception as e:
+            logger.warning(f"Could not persist lexical index: {e}")
+    return idx
@@ -0,0 +1,125 @@
+# utils/llm_usage.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import threading
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Counters kept per prompt type
+USAGE_FIELDS = ("calls", "input_tokens", "output_tokens", "estimated_calls",
+                "compacted", "tokens_before_compaction", "tokens_after_compaction")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts (~4 characters per token)."""
+    return len(text or "") // 4 + 1
+
+
+def _provider_counts(response):
+    """(input, output) token counts reported by a Gemini response, or None when it has none."""
+    meta = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(meta, "prompt_token_count", None) if meta is not None else None
+    output_tokens = getattr(meta, "candidates_token_count", None) if meta is not None else None
+    if not isinstance(prompt_tokens, int) or not isinstance(output_tokens, int):
+        return None
+    return prompt_tokens, output_tokens
+
+
+class LlmUsage:
+    """
+    Token accounting for LLM calls, per prompt type ("extraction", "jd_analysis", "scoring",
+    "scoring_batch"). Input/output tokens are the provider's counts when the response carries
+    usage metadata and ~4-characters-per-token estimates otherwise (counted in estimated_calls).
+    Prompt compaction savings are recorded alongside.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _bucket(self, prompt_type: str) -> dict:
+        return self._counters.setdefault(prompt_type, dict.fromkeys(USAGE_FIELDS, 0))
+
+    def record_call(self, prompt_type: str, prompt: str, response=None, response_text: str = None):
+        """Records one LLM request; returns (input_tokens, output_tokens)."""
+        counts = _provider_counts(response) if response is not None else None
+        estimated = counts is None
+        if estimated:
+            if response_text is None and response is not None:
+                try:
+                    response_text = response.text
+                except Exception:
+                    response_text = ""
+            counts = (estimate_tokens(prompt), estimate_tokens(response_text) if response_text else 0)
+        with self._lock:
+            bucket = self._bucket(prompt_type)
+            bucket["calls"] += 1
+            bucket["input_tokens"] += counts[0]
+            bucket["output_tokens"] += counts[1]
+            bucket["estimated_calls"] += int(estimated)
+        return counts
+
+    def record_compaction(self, prompt_type: str, tokens_before: int, tokens_after: int):
+        with self._lock:
+            bucket = self._bucket(prompt_type)
+            bucket["compacted"] += 1
+            bucket["tokens_before_compaction"] += tokens_before
+            bucket["tokens_after_compaction"] += tokens_after
+
+    def snapshot(self) -> dict:
+        """{prompt type: {counter: value}}."""
+        with self._lock:
+            return {name: dict(bucket) for name, bucket in self._counters.items()}
+
+    def since(self, before: dict) -> dict:
+        """Counters accumulated since an earlier snapshot()."""
+        delta = {}
+        for name, bucket in self.snapshot().items():
+            old = before.get(name, {})
+            diff = {field: value - old.get(field, 0) for field, value in bucket.items()}
+            if any(diff.values()):
+                delta[name] = diff
+        return delta
+
+    def merge(self, usage: dict):
+        """Adds counters collected elsewhere (e.g. by an ingestion worker process)."""
+        with self._lock:
+            for name, bucket in (usage or {}).items():
+                mine = self._bucket(name)
+                for field, value in bucket.items():
+                    mine[field] = mine.get(field, 0) + value
+
+    def stats(self) -> dict:
+        """Per-prompt-type counters plus a "total" row."""
+        usage = self.snapshot()
+        total = dict.fromkeys(USAGE_FIELDS, 0)
+        for bucket in usage.values():
+            for field, value in bucket.items():
+                total[field] += value
+        usage["total"] = total
+        return usage
+
+
+_usage = None
+_usage_pid = None
+_usage_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_usage_lock")
+def get_llm_usage() -> LlmUsage:
+    """Returns this process's LlmUsage (a fresh one after a fork, so workers count only their own calls)."""
+    global _usage, _usage_pid
+    if _usage is None or _usage_pid != os.getpid():
+        with _usage_lock:
+            if _usage is None or _usage_pid != os.getpid():
+                _usage = LlmUsage()
+                _usage_pid = os.getpid()
+    return _usage
+
+
+def record_llm_call(prompt_type: str, prompt: str, response=None, response_text: str = None):
+    """Shorthand for get_llm_usage().record_call(...)."""
+    return get_llm_usage().record_call(prompt_type, prompt, response=response, response_text=response_text)
+
+
+def get_llm_usage_stats() -> dict:
+    return get_llm_usage().stats()
@@ -0,0 +1,297 @@
+# utils/metrics.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import bisect
+import logging
+import math
+import threading
+import time
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans a cache hit (~1ms) to a slow LLM call or a large folder (minutes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels; inc("label value", ..., amount=n)."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        if not settings.METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, delta: dict):
+        with self._lock:
+            for labels, value in delta.items():
+                self._values[labels] = self._values.get(labels, 0) + value
+
+    @staticmethod
+    def diff(now, before):
+        return now - before if before is not None else now
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self):
+        for labelvalues, value in sorted(self.snapshot().items()):
+            yield self.name, dict(zip(self.labelnames, labelvalues)), value
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (Prometheus semantics) with optional labels.
+    observe(seconds, "label value", ...) or `with hist.time("label value"):`.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}  # label values -> [per-bucket counts (last is +Inf), sum]
+
+    def observe(self, value: float, *labelvalues):
+        if not settings.METRICS_ENABLED:
+            return
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][slot] += 1
+            entry[1] += value
+
+    def time(self, *labelvalues):
+        """Context manager observing the elapsed seconds of its block (a shared no-op when disabled)."""
+        if not settings.METRICS_ENABLED:
+            return _NOOP_TIMER
+        return _Timer(self, labelvalues)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+
+    def merge(self, delta: dict):
+        with self._lock:
+            for labels, (counts, total) in delta.items():
+                entry = self._values.get(labels)
+                if entry is None:
+                    entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+
+    @staticmethod
+    def diff(now, before):
+        if before is None:
+            return now
+        return [a - b for a, b in zip(now[0], before[0])], now[1] - before[1]
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self):
+        for labelvalues, (counts, total) in sorted(self.snapshot().items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield self.name + "_bucket", dict(labels, le=format_value(float(bound))), cumulative
+            yield self.name + "_sum", labels, total
+            yield self.name + "_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Metrics of this process, rendered in the Prometheus text exposition format.
+
+    Counters and histograms are updated in place by the instrumented code; collectors are
+    callables run at scrape time that turn existing stats() dicts (pool, caches, jobs, ...) into
+    samples, so those subsystems need no extra bookkeeping. snapshot()/since()/merge() carry
+    the metrics of an ingestion worker process back to the parent.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector):
+        """collector() returns [(name, "gauge" or "counter", documentation, [(labels dict, value)])]."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+    def since(self, before: dict) -> dict:
+        """Changes since an earlier snapshot(), in the shape merge() accepts."""
+        delta = {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            old = before.get(m.name, {})
+            changed = {labels: m.diff(value, old.get(labels)) for labels, value in m.snapshot().items()
+                       if value != old.get(labels)}
+            if changed:
+                delta[m.name] = changed
+        return delta
+
+    def merge(self, delta: dict):
+        for name, values in (delta or {}).items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def reset(self):
+        """Forgets every recorded value (the parent's counts must not be re-reported by a forked child)."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+            collectors = list(self._collectors)
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.documentation}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for name, labels, value in m.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY.reset)
+
+# Shared instruments. Stages: pdf_parse, regex_extract, llm_extract, llm_scoring, llm_scoring_batch,
+# llm_jd_analysis, embedding, faiss_search, bm25_search, lexical_prefilter, retrieval (JD embedding +
+# filtered search), persist (all /recommended writes), db_read / db_write (single statements); errors
+# also count "resume" (a resume that could not be scored).
+STAGE_SECONDS = REGISTRY.histogram(
+    "ats_stage_duration_seconds", "Wall time of one pipeline stage call", ("stage",))
+STAGE_ERRORS = REGISTRY.counter(
+    "ats_stage_errors_total", "Pipeline stage calls that raised or returned a failure", ("stage",))
+LLM_CALLS = REGISTRY.counter(
+    "ats_llm_calls_total", "LLM requests sent, by prompt type", ("prompt_type",))
+LLM_FAILURES = REGISTRY.counter(
+    "ats_llm_failures_total", "LLM requests that failed or returned unparseable output", ("prompt_type",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "ats_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result"))
+DB_ROUND_TRIPS = REGISTRY.counter(
+    "ats_db_round_trips_total", "MySQL statements and commits sent, by operation", ("operation",))
+HTTP_SECONDS = REGISTRY.histogram(
+    "ats_http_request_duration_seconds", "Time to produce an HTTP response (streams: until the first byte)",
+    ("endpoint", "method", "status"))
+
+
+def stage_timer(stage: str):
+    """`with stage_timer("pdf_parse"):` records the block in ats_stage_duration_seconds."""
+    return STAGE_SECONDS.time(stage)
+
+
+def count_cache(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_REQUESTS.inc(cache, "hit", amount=hits)
+    if misses:
+        CACHE_REQUESTS.inc(cache, "miss", amount=misses)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return REGISTRY
@@ -0,0 +1,193 @@
+# utils/pdf_cache.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import hashlib
+import logging
+import threading
+import uuid
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever read_pdf_content changes how text is extracted, so stale entries are never served.
+PDF_EXTRACTOR_VERSION = "pymupdf-text-v1"
+
+
+def content_hash(file_bytes: bytes) -> str:
+    """Returns the hex SHA-256 digest of the given bytes."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class PdfTextCache:
+    """
+    Content-addressed on-disk cache of extracted PDF text.
+
+    Entries live under <cache_dir>/<extractor_version>/<sha256>.txt. The total size is bounded by
+    max_bytes; when exceeded, least recently used entries (by file mtime, refreshed on every hit)
+    are evicted first. Writes are atomic, so several processes may share one cache directory.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int, version: str = PDF_EXTRACTOR_VERSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        reset_lock_after_fork(self)
+        self._version_dir = os.path.join(cache_dir, version)
+        os.makedirs(self._version_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._version_dir, f"{key}.txt")
+
+    def _entries(self):
+        """Yields (path, size, mtime) for every cached entry of the current version."""
+        try:
+            names = os.listdir(self._version_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if not name.endswith(".txt"):
+                continue
+            path = os.path.join(self._version_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            yield path, st.st_size, st.st_mtime
+
+    def key_for(self, file_bytes: bytes) -> str:
+        return content_hash(file_bytes)
+
+    def get(self, key: str):
+        """Returns cached text for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (FileNotFoundError, OSError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path, None)  # mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        data = text.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            existed = os.path.exists(path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write PDF text cache entry {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            if not existed:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits in max_bytes. Caller holds the lock."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except FileNotFoundError:
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def invalidate(self, key: str = None):
+        """Removes one entry, or every entry of the current extractor version when key is None."""
+        with self._lock:
+            if key is not None:
+                path = self._path(key)
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    self._total_bytes -= size
+                except FileNotFoundError:
+                    pass
+                return
+            for path, _, _ in list(self._entries()):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "version": self.version,
+            }
+
+
+_pdf_cache = None
+_pdf_cache_lock = threading.Lock()
+reset_lock_after_fork(sys.modules[__name__], "_pdf_cache_lock")
+def get_pdf_cache():
+    """Returns the process-wide PdfTextCache, or None when caching is disabled or unavailable."""
+    global _pdf_cache
+    from config import settings
+    if not settings.PDF_CACHE_ENABLED:
+        return None
+    if _pdf_cache is None:
+        with _pdf_cache_lock:
+            if _pdf_cache is None:
+                try:
+                    _pdf_cache = PdfTextCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
+                except OSError as e:
+                    logger.warning(f"PDF text cache disabled: {e}")
+                    return None
+    return _pdf_cache
+
+
+def invalidate_pdf_cache(file_bytes: bytes = None):
+    """Drops the cached text for one PDF, or the whole cache when no bytes are given."""
+    cache = get_pdf_cache()
+    if cache is None:
+        return
+    cache.invalidate(cache.key_for(file_bytes) if file_bytes is not None else None)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Inspect or clear the PDF text cache.")
+    parser.add_argument("--clear", action="store_true", help="remove all cached entries")
+    args = parser.parse_args()
+    if args.clear:
+        invalidate_pdf_cache()
+    cache = get_pdf_cache()
+    print(json.dumps(cache.stats() if cache else {"enabled": False}, indent=2))
@@ -4,21 +4,36 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import logging
 import fitz  # PyMuPDF
 from Tools.logs import save_log
+from utils.pdf_cache import get_pdf_cache
+from utils.metrics import STAGE_ERRORS, count_cache, stage_timer
 
 logger = logging.getLogger(__name__)
 
-def read_pdf_content(file_bytes: bytes) -> str:
+def read_pdf_content(file_bytes: bytes, use_cache: bool = True) -> str:
     """
     Given raw PDF bytes, return the concatenated text of all pages.
+    Extracted text is cached on disk by content hash, so each distinct PDF is parsed once.
     """
+    cache = get_pdf_cache() if use_cache else None
+    key = None
+    if cache is not None:
+        key = cache.key_for(file_bytes)
+        cached = cache.get(key)
+        count_cache("pdf_text", cached is not None, cached is None)
+        if cached is not None:
+            return cached
     try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text() or ""
-        return text
+        with stage_timer("pdf_parse"):
+            doc = fitz.open(stream=file_bytes, filetype="pdf")
+            text = ""
+            for page in doc:
+                text += page.get_text() or ""
     except Exception as e:
+        STAGE_ERRORS.inc("pdf_parse")
         msg = f"PDF parsing failed: {str(e)}"
         logger.exception(msg)
         save_log("ERROR", msg, process="JD_Analysis")
-        return ""
\ No newline at end of file
+        return ""
+    if cache is not None:
+        cache.put(key, text)
+    return text
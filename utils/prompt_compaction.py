@@ -0,0 +1,227 @@
+# utils/prompt_compaction.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import re
+from collections import Counter
+from utils.llm_usage import estimate_tokens, get_llm_usage
+from utils.resume_sections import classify_heading, WHITESPACE_RE
+
+logger = logging.getLogger(__name__)
+
+# Whole lines that carry nothing for any prompt: page markers, document titles, stock phrases
+BOILERPLATE_LINE_RE = re.compile(
+    r"[\W_]*(?:(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?|curriculum vitae|r[eé]sum[eé]|cv"
+    r"|references(?: are)?(?: available)? (?:up)?on request|confidential)[\W_]*",
+    re.IGNORECASE,
+)
+# JD lines that are legal or application boilerplate rather than part of the role
+JD_BOILERPLATE_RE = re.compile(
+    r"equal (?:employment )?opportunity employer|without regard to (?:race|age|sex|religion|color)"
+    r"|reasonable accommodations?|e-verify|click (?:here|apply)|apply now",
+    re.IGNORECASE,
+)
+JD_HEADING_RE = re.compile(
+    r"(?P<core>requirements?|qualifications?|responsibilit(?:y|ies)|duties|skills|experience|education"
+    r"|what you(?:'ll| will) do|what we(?:'re| are) looking for|must have|nice to have|preferred)"
+    r"|(?P<context>about (?:us|the (?:company|team|role))|who we are|overview|summary|the role|position)"
+    r"|(?P<low>benefits|perks|compensation|salary|what we offer|why join|equal opportunity|eeo|how to apply)",
+    re.IGNORECASE,
+)
+
+# Which parts of a document survive a tight budget first. "header" is the text before the
+# first recognised heading (a resume's name and contact lines, a JD's title and intro).
+EXTRACTION_PRIORITY = ("header", "experience", "education", "skills", "summary", "certifications",
+                       "projects", "other")
+SCORING_PRIORITY = ("experience", "skills", "education", "certifications", "summary", "projects", "other")
+JD_PRIORITY = ("core", "header", "context", "low")
+
+# Where in a resume each extraction field is found; the sections behind the fields an extraction
+# prompt asks for go first and get a guaranteed share of the budget (see extraction_priority)
+FIELD_SECTIONS = {
+    "name": "header", "email": "header", "phone": "header", "linkedin_url": "header",
+    "current_location": "header", "years_of_experience": "experience", "last_position_title": "experience",
+    "education_level": "education", "skills": "skills",
+}
+
+# Short lines repeated this often are page headers/footers; longer repeated lines are always dropped
+REPEATED_SHORT_LINE = 3
+SHORT_LINE_CHARS = 25
+
+
+def _classify_jd_heading(line: str):
+    if len(line) > 60 or line.endswith(".") or not (line.endswith(":") or line.isupper() or line.istitle()):
+        return None
+    m = JD_HEADING_RE.search(line)
+    return m.lastgroup if m else None
+
+
+def split_blocks(text: str, classify=classify_heading, boilerplate_re=None) -> list:
+    """
+    Cleans text and splits it at headings into [name, heading line, lines] blocks, in document
+    order. Whitespace is collapsed; empty and boilerplate lines, repeated long lines and short
+    lines repeated REPEATED_SHORT_LINE+ times (page headers/footers) are dropped.
+    """
+    lines = [WHITESPACE_RE.sub(" ", raw).strip() for raw in (text or "").splitlines()]
+    counts = Counter(line.lower() for line in lines if line)
+    blocks = [["header", None, []]]
+    seen = set()
+    for line in lines:
+        if not line or BOILERPLATE_LINE_RE.fullmatch(line):
+            continue
+        name = classify(line)
+        if name is not None:
+            blocks.append([name, line, []])
+            continue
+        key = line.lower()
+        if key in seen and (len(line) >= SHORT_LINE_CHARS or counts[key] >= REPEATED_SHORT_LINE):
+            continue
+        if boilerplate_re is not None and boilerplate_re.search(line):
+            continue
+        seen.add(key)
+        blocks[-1][2].append(line)
+    return [block for block in blocks if block[2]]
+
+
+def extraction_priority(missing_fields) -> tuple:
+    """EXTRACTION_PRIORITY with the sections behind missing_fields moved to the front."""
+    wanted = {FIELD_SECTIONS[f] for f in missing_fields or () if f in FIELD_SECTIONS}
+    return tuple(n for n in EXTRACTION_PRIORITY if n in wanted) + tuple(n for n in EXTRACTION_PRIORITY if n not in wanted)
+
+
+def cut_line(line: str, max_tokens: int) -> str:
+    """The longest prefix of line that fits in max_tokens estimated tokens, ending at a word boundary."""
+    chars = (max_tokens - 1) * 4
+    if chars <= 0:
+        return ""
+    if len(line) <= chars:
+        return line
+    cut = line[:chars]
+    if line[chars] != " " and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip()
+
+
+def fit_blocks(blocks: list, max_tokens: int, priority: tuple, reserve: tuple = ()) -> list:
+    """
+    Keeps lines of blocks in priority order (document order within a rank) while they fit in
+    max_tokens estimated tokens. A block stops at its first line that does not fit and the
+    lower-priority blocks still get the rest of the budget; a block's first line that alone does not
+    fit is cut at a word boundary rather than dropped. Blocks named in reserve are first filled up to
+    an equal share of the budget each, so a long high-priority block cannot crowd them out.
+    Returns the kept blocks in document order. max_tokens <= 0 keeps everything.
+    """
+    if max_tokens <= 0:
+        return blocks
+    rank = {name: i for i, name in enumerate(priority)}
+    order = sorted(range(len(blocks)), key=lambda i: (rank.get(blocks[i][0], len(priority)), i))
+    budget = max_tokens
+    kept = {}  # block index -> lines taken so far (a prefix of the block's lines)
+
+    def fill(i, allowance):
+        name, heading, lines = blocks[i]
+        take = kept.get(i)
+        cost = 0
+        if take is None:
+            take = []
+            cost = estimate_tokens(heading) if heading else 0
+            if cost >= allowance:
+                return 0
+        for line in lines[len(take):]:
+            line_cost = estimate_tokens(line)
+            if cost + line_cost > allowance:
+                if not take:
+                    line = cut_line(line, allowance - cost)
+                    if line:
+                        take.append(line)
+                        cost += estimate_tokens(line)
+                break
+            take.append(line)
+            cost += line_cost
+        if not take:
+            return 0
+        kept[i] = take
+        return cost
+
+    reserved = [i for i in order if blocks[i][0] in reserve]
+    for i in reserved:
+        budget -= fill(i, min(budget, max_tokens // len(reserved)))
+    for i in order:
+        if budget <= 0:
+            break
+        if len(kept.get(i, ())) < len(blocks[i][2]):
+            budget -= fill(i, budget)
+    return [[blocks[i][0], blocks[i][1], kept[i]] for i in sorted(kept)]
+
+
+def _join(blocks: list) -> str:
+    out = []
+    for _, heading, lines in blocks:
+        if heading:
+            out.append(heading)
+        out.extend(lines)
+    return "\n".join(out)
+
+
+def _compact(text: str, max_tokens: int, priority: tuple, prompt_type: str, reserve: tuple = (),
+             **split_options) -> str:
+    compacted = _join(fit_blocks(split_blocks(text, **split_options), max_tokens, priority, reserve))
+    before, after = estimate_tokens(text), estimate_tokens(compacted)
+    get_llm_usage().record_compaction(prompt_type, before, after)
+    if after < before:
+        logger.debug(f"Compacted {prompt_type} text from ~{before} to ~{after} tokens")
+    return compacted
+
+
+def compact_resume_text(text: str, max_tokens: int, priority: tuple = EXTRACTION_PRIORITY,
+                        prompt_type: str = "extraction", missing_fields: list = None) -> str:
+    """
+    Deterministically cleans a resume and keeps its highest-value sections within max_tokens.
+    With missing_fields, the sections those fields come from go first and each get a share of
+    the budget (see FIELD_SECTIONS).
+    """
+    reserve = ()
+    if missing_fields:
+        priority = extraction_priority(missing_fields)
+        reserve = tuple(dict.fromkeys(FIELD_SECTIONS[f] for f in missing_fields if f in FIELD_SECTIONS))
+    return _compact(text, max_tokens, priority, prompt_type, reserve)
+
+
+def compact_jd_text(text: str, max_tokens: int, prompt_type: str = "jd_analysis") -> str:
+    """
+    Same for a job description: drops EEO/application boilerplate and, when over budget, gives up
+    benefits and company blurbs before requirements, qualifications and responsibilities.
+    """
+    return _compact(text, max_tokens, JD_PRIORITY, prompt_type,
+                    classify=_classify_jd_heading, boilerplate_re=JD_BOILERPLATE_RE)
+
+
+def fit_sections(sections: dict, max_tokens: int, priority: tuple = SCORING_PRIORITY,
+                 max_section_chars: int = None, prompt_type: str = "scoring") -> dict:
+    """
+    Budgets already-segmented resume sections ({name: text}, see utils.resume_sections): each is
+    cut at the last whole line within max_section_chars (a first line longer than that at a word
+    boundary), then sections are kept by priority within max_tokens. Returns {name: text} for the
+    kept sections.
+    """
+    blocks = []
+    for name, body in sections.items():
+        lines, size = [], 0
+        for line in body.splitlines():
+            line = WHITESPACE_RE.sub(" ", line).strip()
+            if not line:
+                continue
+            if max_section_chars and size + len(line) > max_section_chars:
+                line = "" if lines else cut_line(line, max_section_chars // 4 + 1)
+                if line:
+                    lines.append(line)
+                break
+            lines.append(line)
+            size += len(line) + 1
+        if lines:
+            blocks.append([name, None, lines])
+    kept = fit_blocks(blocks, max_tokens, priority)
+    before = sum(estimate_tokens(body) for body in sections.values())
+    after = sum(estimate_tokens("\n".join(lines)) for _, _, lines in kept)
+    get_llm_usage().record_compaction(prompt_type, before, after)
+    return {name: "\n".join(lines) for name, _, lines in kept}
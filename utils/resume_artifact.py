@@ -0,0 +1,46 @@
+# utils/resume_artifact.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class ResumeArtifact:
+    """
+    Everything the /recommended pipeline learns about one resume, produced once and passed along:
+    ingestion fills path, content_hash, text and details; scoring fills score (the raw scorer
+    result); persistence reads details and score. Instances are picklable so they can come
+    back from ingestion worker processes, carrying the stage metrics and 'logs' table rows of
+    their parsing (metrics, log_rows; see utils.metrics and Tools.logs.hold_logs) and the
+    details the parent still has to extract with the LLM (missing_fields).
+    """
+    def __init__(self, path: str, content_hash: str, text: str, details: dict):
+        self.path = path
+        self.content_hash = content_hash
+        self.text = text
+        self.details = details or {}
+        self.score = None
+        self.metrics = {}
+        self.log_rows = []
+        self.missing_fields = []
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def email(self):
+        return self.details.get('email')
+
+    def to_result(self) -> dict:
+        """The per-resume dict returned by /recommended."""
+        score = self.score or {}
+        return {
+            'candidate_email': self.details.get('email'),
+            'candidate_name': self.details.get('name') or self.details.get('email'),
+            'resume_path': self.path,
+            'resume_filename': self.filename,
+            'category_score': score.get('category_score'),
+            'requirements_score': score.get('requirements_score'),
+            'qualifications_score': score.get('qualifications_score'),
+            'final_score': score.get('final_score'),
+            'reason': score.get('reason')
+        }
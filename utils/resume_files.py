@@ -0,0 +1,17 @@
+# utils/resume_files.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Every PDF under this directory (any subfolder) goes into the shared resume indexes
+RESUMES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../resumes'))
+
+
+def scan_resume_files(resumes_dir: str) -> dict:
+    """Returns {relative path: os.stat_result} for every PDF under resumes_dir."""
+    found = {}
+    for root, _, files in os.walk(resumes_dir):
+        for f in files:
+            if f.lower().endswith('.pdf'):
+                path = os.path.join(root, f)
+                found[os.path.relpath(path, resumes_dir)] = os.stat(path)
+    return found
@@ -0,0 +1,225 @@
+# utils/resume_sections.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import re
+
+# Section names, in the order they are rendered for scoring.
+SECTION_ORDER = ("summary", "experience", "projects", "skills", "education", "certifications", "other")
+
+_SECTION_KEYWORDS = {
+    "summary": r"summary|profile|objective|about me|overview",
+    "experience": r"experience|employment|work history|career history|positions|appointments",
+    "projects": r"projects?",
+    "skills": r"skills|competencies|technologies|proficiencies|expertise",
+    "education": r"education|academic background|degrees",
+    "certifications": r"licensures?|licenses?|certifications?|certificates?",
+    "other": (r"publications|awards|honou?rs|grants|funding|presentations|service|memberships|affiliations"
+              r"|activities|volunteer|languages|interests|references|research|teaching|patents|consulting|mentoring"),
+}
+_KEYWORDS = "|".join(f"(?P<{name}>{pattern})" for name, pattern in _SECTION_KEYWORDS.items())
+_QUALIFIERS = (r"(?:(?:professional|work|academic|clinical|teaching|research|technical|relevant|selected"
+               r"|core|key|personal|additional|leadership|administrative|other)\s+){0,3}")
+
+# Title-case headings must be the keyword (after optional qualifiers), optionally joined to more
+# words ("Skills & Tools"), so job titles like "Research Scientist" are not taken for headings.
+# ALL-CAPS or colon-terminated headings may carry the keyword anywhere ("PROFESSIONAL WORK EXPERIENCE").
+HEADING_ANCHORED_RE = re.compile(rf"{_QUALIFIERS}(?:{_KEYWORDS})(?:\s*(?:&|and\b|/|,)\s*\S.*)?$", re.IGNORECASE)
+HEADING_ANYWHERE_RE = re.compile(rf"\b(?:{_KEYWORDS})\b", re.IGNORECASE)
+
+# Free-text fields. Each pattern only runs near a cheap literal anchor ("@", "linkedin.com/in/",
+# "experience"), so a resume without that field costs one substring search rather than a full
+# regex scan with backtracking.
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+LINKEDIN_HINT_RE = re.compile(r"linkedin\.com/in/", re.IGNORECASE)
+LINKEDIN_RE = re.compile(r"https?://(?:www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+")
+LINKEDIN_HREF_RE = re.compile(r'href=["\'](https?://(?:www\.)?linkedin\.com/in/[A-Za-z0-9\-_]+)["\']', re.IGNORECASE)
+EXPERIENCE_WORD_RE = re.compile(r"experience", re.IGNORECASE)
+YOE_TAIL_RE = re.compile(r"(\d{1,2})\+?\s+years? (?:of )?$", re.IGNORECASE)
+PHONE_RE = re.compile(r"(\+?1[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}")
+# The lookahead lets the engine skip words that cannot start a degree before trying the alternation
+EDUCATION_RE = re.compile(
+    r"\b(?=[bdmp])(Ph\.?D\.?|Doctorate|M\.?S\.?|MSc|MBA|B\.?S\.?|BA|BSc|"
+    r"M\.?A\.?|Master of Science|Master of Arts|Bachelor of Science|Bachelor of Arts|BSN|MSN|DNP)(?![A-Za-z])",
+    re.IGNORECASE,
+)
+LOCATION_RE = re.compile(r"[A-Za-z]+,\s*[A-Z]{2}")
+SKILL_SPLIT_RE = re.compile(r"[,;•|]")
+WHITESPACE_RE = re.compile(r"\s+")
+NON_HEADING_CHARS_RE = re.compile(r"[@,\d]")
+
+MAX_HEADING_CHARS = 60
+MAX_HEADING_WORDS = 7
+
+
+def classify_heading(line: str):
+    """Returns the section name if the stripped line looks like a section heading, else None."""
+    if not line or len(line) > MAX_HEADING_CHARS or not line[0].isalpha():
+        return None
+    if line.isupper() or line.endswith(":"):
+        m = HEADING_ANYWHERE_RE.search(line)
+    elif line[0].isupper():
+        m = HEADING_ANCHORED_RE.match(line)
+    else:
+        return None
+    # Keyword first: most lines fail there, so the shape checks below rarely run
+    if m is None or line[-1] == "." or NON_HEADING_CHARS_RE.search(line) or line.count(" ") >= MAX_HEADING_WORDS:
+        return None
+    return m.lastgroup
+
+
+def _find_linkedin(line: str):
+    m = LINKEDIN_RE.search(line)
+    if m:
+        return m.group(0)
+    m = LINKEDIN_HREF_RE.search(line)
+    return m.group(1) if m else None
+
+
+def _find_years_of_experience(line: str):
+    for word in EXPERIENCE_WORD_RE.finditer(line):
+        m = YOE_TAIL_RE.search(line, max(0, word.start() - 24), word.start())
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def segment_resume(text: str) -> dict:
+    """
+    Single pass over the resume lines: classifies headings, splits it into sections and fills
+    the fields on the way. Contact fields are looked for line by line until all are found, each
+    pattern only on lines holding its cheap literal anchor ("@", "nked", "xperience"); the
+    degree comes from the education section's lines. The only whole-text scan left is the
+    degree search of a resume whose education section names none.
+
+    Returns the same keys as the regex extractor (name, email, phone, linkedin_url,
+    current_location, years_of_experience, education_level, last_position_title, skills),
+    plus "sections" ({section name: text} for every non-empty section in SECTION_ORDER) and
+    "absent" (fields that cannot be in the text at all, e.g. no "@" means no email).
+    """
+    details = {
+        "name": None,
+        "email": None,
+        "phone": None,
+        "linkedin_url": None,
+        "current_location": None,
+        "years_of_experience": None,
+        "education_level": None,
+        "last_position_title": None,
+        "skills": []
+    }
+
+    sections = {}
+    current = None
+    bucket = None  # lines of the current section
+    name = None
+    skills = []
+    email = phone = linkedin = years = location = None
+    has_at = linkedin_hint = False
+    degree = None  # first degree in the education section
+    contacts_pending = True  # until email, phone, LinkedIn URL and years of experience are all found
+    for number, raw in enumerate(text.splitlines()):
+        if number < 10 and location is None:
+            m = LOCATION_RE.search(raw)
+            if m:
+                location = m.group(0)
+        line = raw.strip()
+        if not line:
+            continue
+        if contacts_pending:
+            if "@" in line:
+                has_at = True
+                if email is None:
+                    m = EMAIL_RE.search(line)
+                    if m:
+                        email = m.group(0).lower()
+            # Case-sensitive substring probes are much cheaper than an IGNORECASE scan of the line
+            if linkedin is None and ("nked" in line or "NKED" in line) and LINKEDIN_HINT_RE.search(line):
+                linkedin_hint = True
+                linkedin = _find_linkedin(line)
+            if years is None and ("xperience" in line or "XPERIENCE" in line):
+                years = _find_years_of_experience(line)
+            if phone is None:
+                m = PHONE_RE.search(line)
+                if m:
+                    phone = m.group(0)
+            contacts_pending = None in (email, phone, linkedin, years)
+        # Most lines are too long to be headings; skip the call for them
+        heading = classify_heading(line) if len(line) <= MAX_HEADING_CHARS else None
+        if heading is not None:
+            current = heading
+            bucket = sections.setdefault(current, [])
+            continue
+        if name is None:
+            words = line.split()
+            if len(words) >= 2 and all(w[0].isupper() for w in words if w[0].isalpha()):
+                name = line
+        if bucket is None:
+            continue
+        bucket.append(line)
+        if current == "education":
+            if degree is None:
+                m = EDUCATION_RE.search(line)
+                if m:
+                    degree = m.group(0)
+        elif current == "experience" and details["last_position_title"] is None:
+            details["last_position_title"] = line
+        elif current == "skills":
+            # "Languages: Python, SQL" -> drop the label before splitting
+            for p in SKILL_SPLIT_RE.split(line.split(":", 1)[-1]):
+                p = p.strip()
+                if p and len(p) < 40:
+                    skills.append(p)
+    details.update(email=email, phone=phone, linkedin_url=linkedin, years_of_experience=years,
+                   current_location=location)
+    details["name"] = name
+    details["skills"] = list(dict.fromkeys(skills))  # dedupe
+
+    details["sections"] = {
+        name: "\n".join(sections[name]) for name in SECTION_ORDER if sections.get(name)
+    }
+    # Prefer the education section; long CVs mention degrees all over the place. Only without a
+    # degree there is the rest of the text searched.
+    if degree is None:
+        m = EDUCATION_RE.search(text)
+        degree = m.group(0) if m else None
+    details["education_level"] = degree
+    # A field still missing was looked for on every line, so its anchor flag covers the whole text
+    absent = set()
+    if not has_at:
+        absent.add("email")
+    if linkedin is None and not linkedin_hint:
+        absent.add("linkedin_url")
+    details["absent"] = absent
+    return details
+
+
+def render_sections(sections: dict, fallback_text: str = "", max_section_chars: int = None) -> str:
+    """
+    Compact, section-structured resume text for the scorer: one "SECTION:" block per non-empty
+    section with whitespace collapsed, repeated lines dropped and, when max_section_chars is set,
+    each section cut at the last whole line within that many characters. Falls back to the
+    collapsed full text (same cap) when no section headings were recognised.
+    """
+    blocks = []
+    for name in SECTION_ORDER:
+        body = sections.get(name)
+        if not body:
+            continue
+        lines = []
+        seen = set()
+        size = 0
+        for line in body.splitlines():
+            line = WHITESPACE_RE.sub(" ", line).strip()
+            if not line or line in seen:
+                continue
+            if max_section_chars and size + len(line) > max_section_chars:
+                break
+            seen.add(line)
+            lines.append(line)
+            size += len(line) + 1
+        if lines:
+            blocks.append(f"{name.upper()}:\n" + "\n".join(lines))
+    if blocks:
+        return "\n\n".join(blocks)
+    text = WHITESPACE_RE.sub(" ", fallback_text).strip()
+    return text[:max_section_chars] if max_section_chars else text
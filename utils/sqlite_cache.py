@@ -0,0 +1,147 @@
+# utils/sqlite_cache.py
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import logging
+import sqlite3
+import threading
+import time
+from utils.fork_safety import reset_lock_after_fork
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteCache:
+    """
+    Small persistent key/value store on SQLite with LRU eviction and optional TTL.
+
+    Values are raw bytes; callers encode/decode them. The number of entries is capped at
+    max_entries (least recently accessed are evicted first) and, when ttl_seconds is set,
+    entries older than that are treated as misses. A hit only rewrites an entry's access time
+    when the stored one is more than touch_interval seconds old, so hot keys are read without
+    a write or commit; LRU order is kept to that granularity. The database runs in WAL mode so
+    several worker processes can share one file; each process opens its own connection.
+    """
+    def __init__(self, path: str, max_entries: int = 100000, ttl_seconds: float = None,
+                 touch_interval: float = 60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        reset_lock_after_fork(self)
+        self._conn = None
+        self._pid = None
+        self._puts_since_evict = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connection(self):
+        # Never reuse a connection inherited across fork()
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get_many(self, keys: list) -> dict:
+        """Returns {key: value} for the keys present and not expired."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        expired, stale = [], []  # keys to delete / whose access time to refresh
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, value, created_at, last_access in conn.execute(
+                    f"SELECT key, value, created_at, last_access FROM cache WHERE key IN ({placeholders})", chunk
+                ):
+                    if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                        expired.append(key)
+                        continue
+                    found[key] = value
+                    if now - last_access > self.touch_interval:
+                        stale.append(key)
+            if expired:
+                conn.executemany(
+                    "DELETE FROM cache WHERE key = ? AND created_at < ?",
+                    [(k, now - self.ttl_seconds) for k in expired],
+                )
+            if stale:
+                conn.executemany("UPDATE cache SET last_access = ? WHERE key = ?", [(now, k) for k in stale])
+            if expired or stale:
+                conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: dict):
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                [(k, sqlite3.Binary(v), now, now) for k, v in items.items()],
+            )
+            self._puts_since_evict += len(items)
+            # Counting rows is cheap but not free; only check every so often
+            if self._puts_since_evict >= max(1, self.max_entries // 100):
+                self._evict(conn)
+            conn.commit()
+
+    def put(self, key: str, value: bytes):
+        self.put_many({key: value})
+
+    def _evict(self, conn):
+        self._puts_since_evict = 0
+        count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def invalidate(self, key: str = None):
+        """Removes one entry, or all entries when key is None."""
+        with self._lock:
+            conn = self._connection()
+            if key is None:
+                conn.execute("DELETE FROM cache")
+            else:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "max_entries": self.max_entries,
+            }